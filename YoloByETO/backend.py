@@ -0,0 +1,85 @@
+import os
+import ast
+import shutil
+import hashlib
+import tempfile
+from pathlib import Path
+
+from ultralytics import YOLO
+
+BACKENDS = ["torch", "onnx", "openvino"]
+
+_SUFFIX = {"onnx": ".onnx", "openvino": "_openvino_model"}
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def exported_path(path, backend, imgsz, cache_dir):
+    """ 导出缓存按 模型文件哈希 + 输入尺寸 + 动态 batch 区分，早先导出的固定 batch 模型不会被沿用 """
+    key = f"{file_hash(path)[:16]}_{imgsz}_dynamic"
+    return Path(cache_dir) / key / (Path(path).stem + _SUFFIX[backend])
+
+
+def export_model(path, backend, imgsz=640, cache_dir="./cache/export"):
+    """
+    首次使用时把 .pt 导出为 ONNX / OpenVINO 并放入缓存，之后直接返回缓存路径。
+    在私有临时目录中导出再 os.replace 到位，多个进程同时首次导出时不会互相覆盖。
+    """
+    target = exported_path(path, backend, imgsz, cache_dir)
+    if target.exists():
+        return str(target)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=".export_", dir=target.parent)
+    try:
+        local = shutil.copy2(path, work_dir)
+        # 批量、切块和视频都会一次传入多张图，导出动态 batch 维度，而不是固定为 1
+        exported = YOLO(local).export(format=backend, imgsz=imgsz, dynamic=True)
+        try:
+            os.replace(exported, target)
+        except OSError:
+            if not target.exists():
+                raise
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return str(target)
+
+
+def model_info(path):
+    """
+    只读取模型文件自带的元数据（类别名、输入尺寸、参数量、任务类型），不导出、也不进入模型缓存。
+    .onnx 读 ultralytics 导出时写入的 metadata_props，取不到的字段为 None。
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"模型文件不存在：{path}")
+
+    if Path(path).suffix.lower() == ".onnx":
+        import onnxruntime
+        session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        meta = session.get_modelmeta().custom_metadata_map
+        names = ast.literal_eval(meta["names"]) if "names" in meta else None
+        imgsz = ast.literal_eval(meta["imgsz"]) if "imgsz" in meta else None
+        task, params = meta.get("task"), None
+    else:
+        model = YOLO(path)
+        names, task = model.names, model.task
+        params = sum(p.numel() for p in model.model.parameters())
+        imgsz = (getattr(model, "ckpt", None) or {}).get("train_args", {}).get("imgsz") or model.overrides.get("imgsz")
+
+    if isinstance(names, dict):
+        names = [names[k] for k in sorted(names)]
+    return {"names": names, "imgsz": imgsz, "params": params, "task": task}
+
+
+def resolve_model(path, backend="torch", imgsz=640, cache_dir="./cache/export"):
+    if backend == "torch" or Path(path).suffix.lower() != ".pt":
+        return path
+    if backend not in _SUFFIX:
+        raise ValueError(f"未知推理后端：{backend}")
+    return export_model(path, backend, imgsz, cache_dir)
@@ -0,0 +1,107 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+# 只依赖标准库：GUI 通过 YoloByETO.labels 导入同一份代码，打包时只带上这一个文件
+LABEL_FORMATS = ["yolo", "coco", "jsonl"]
+
+
+class YoloWriter:
+    """ 每张图一个 <主干名>.txt：类别 中心x 中心y 宽 高（归一化），结束时写 classes.txt """
+
+    def __init__(self, opener):
+        self.opener = opener
+        self.names = {}
+
+    def add(self, file_name, width, height, record):
+        lines = []
+        for (x1, y1, x2, y2), cid in zip(record.get("xyxy", []), record.get("class_id", [])):
+            lines.append(
+                f"{cid} {(x1 + x2) / 2 / width:.6f} {(y1 + y2) / 2 / height:.6f} "
+                f"{(x2 - x1) / width:.6f} {(y2 - y1) / height:.6f}"
+            )
+        self.names.update(zip(record.get("class_id", []), record.get("class_name", [])))
+        with self.opener(Path(file_name).stem + ".txt") as f:
+            f.write("\n".join(lines) + ("\n" if lines else ""))
+
+    def close(self):
+        if not self.names:
+            return
+        with self.opener("classes.txt") as f:
+            for cid in range(max(self.names) + 1):
+                f.write(f"{self.names.get(cid, cid)}\n")
+
+
+class CocoWriter:
+    """
+    流式写出 COCO JSON：images 数组边处理边写，annotations 先落到临时文件，
+    结束时再拷贝进同一个文档，内存占用与图片数量无关。
+    """
+
+    def __init__(self, opener, name="annotations.json"):
+        self.stream = opener(name)
+        self.pending = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self.names = {}
+        self.image_id = 0
+        self.annotation_id = 0
+        self.stream.write('{"info": {"description": "SuperVisionByETO"}, "images": [')
+
+    def add(self, file_name, width, height, record):
+        self.image_id += 1
+        image = {"id": self.image_id, "file_name": Path(file_name).name, "width": width, "height": height}
+        self.stream.write(("" if self.image_id == 1 else ", ") + json.dumps(image, ensure_ascii=False))
+
+        for (x1, y1, x2, y2), cid, score in zip(
+            record.get("xyxy", []), record.get("class_id", []), record.get("confidence", [])
+        ):
+            self.annotation_id += 1
+            w, h = round(x2 - x1, 2), round(y2 - y1, 2)
+            annotation = {
+                "id": self.annotation_id, "image_id": self.image_id, "category_id": cid + 1,
+                "bbox": [round(x1, 2), round(y1, 2), w, h], "area": round(w * h, 2), "iscrowd": 0,
+                "score": round(score, 4),
+            }
+            self.pending.write(("" if self.annotation_id == 1 else ", ") + json.dumps(annotation))
+        self.names.update(zip(record.get("class_id", []), record.get("class_name", [])))
+
+    def close(self):
+        self.stream.write('], "annotations": [')
+        self.pending.seek(0)
+        shutil.copyfileobj(self.pending, self.stream, 1 << 20)
+        self.pending.close()
+
+        categories = [{"id": cid + 1, "name": str(name)} for cid, name in sorted(self.names.items())]
+        self.stream.write('], "categories": ' + json.dumps(categories, ensure_ascii=False) + "}\n")
+        self.stream.close()
+
+
+class JsonlWriter:
+    """ 每张图一行 JSON """
+
+    def __init__(self, opener, name="detections.jsonl"):
+        self.stream = opener(name)
+
+    def add(self, file_name, width, height, record):
+        line = dict(file_name=Path(file_name).name, width=width, height=height, **record)
+        self.stream.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.stream.close()
+
+
+def label_writer(fmt, opener):
+    """ opener(name) 返回可写的文本流，如磁盘上的文件或 ZIP 中的条目 """
+    if fmt == "yolo":
+        return YoloWriter(opener)
+    if fmt == "coco":
+        return CocoWriter(opener)
+    if fmt == "jsonl":
+        return JsonlWriter(opener)
+    raise ValueError(f"未知标注格式：{fmt}")
+
+
+def folder_opener(folder):
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    return lambda name: open(folder / name, "w", encoding="utf-8")
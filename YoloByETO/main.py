@@ -1,36 +1,363 @@
 import os
 import cv2
+import glob
+import json
+import socket
 import argparse
+from pathlib import Path
 import supervision as sv
 from ultralytics import YOLO
 
+from registry import ModelRegistry
+from backend import BACKENDS, resolve_model, model_info
+from tiling import MERGE_MODES, detect_tiled
+from video import is_video, run_video
+from pipeline import Pipeline
+from records import detections_record, detections_from_record, annotate_styled
+from labels import LABEL_FORMATS, label_writer, folder_opener
+from quantize import QUANT_MODES, quantize_model, benchmark, write_report
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description="YOLO检测并保存结果图")
-    parser.add_argument("-m", "--model", required=True, help="YOLO 模型路径（*.pt）")
-    parser.add_argument("-i", "--input", required=True, help="输入图片路径")
-    parser.add_argument("-o", "--output", required=True, help="输出图片保存路径")
-    return parser.parse_args()
+    parser.add_argument("-m", "--model", help="YOLO 模型路径（*.pt）")
+    parser.add_argument("-i", "--input", help="输入图片路径，也可以是目录、通配符或 @列表文件")
+    parser.add_argument("-o", "--output", help="输出图片保存路径（批量模式下为输出目录）")
+    parser.add_argument("-b", "--batch", type=int, default=8, help="批量模式下每次前向推理的图片数")
+    parser.add_argument("--io-threads", type=int, default=2, help="批量模式下读图/写图的线程数")
+    parser.add_argument("-j", "--json", default=None, help="额外推理参数（JSON，如 {\"conf\": 0.3}）")
+    parser.add_argument("--serve", metavar="HOST:PORT", default=None, help="常驻模式：连接到 GUI 并循环接收任务")
+    parser.add_argument("--token", default="", help="常驻模式握手令牌")
+    parser.add_argument("--model-budget", type=int, default=2048, help="常驻模式下模型缓存的内存上限（MB）")
+    parser.add_argument("--backend", choices=BACKENDS, default="torch", help="推理后端，onnx/openvino 首次使用时自动导出并缓存")
+    parser.add_argument("--imgsz", type=int, default=640, help="导出 ONNX/OpenVINO 时的输入尺寸")
+    parser.add_argument("--cache-dir", default="./cache/export", help="导出模型的缓存目录")
+    parser.add_argument("--stride", type=int, default=1, help="视频每隔多少帧推理一帧")
+    parser.add_argument("--skip", type=int, default=0, help="视频跳过开头的帧数")
+    parser.add_argument("--jsonl", default=None, help="视频逐帧检测结果（JSON lines），默认与输出视频同名")
+    parser.add_argument("--preview", type=int, default=9, help="视频预览图抽取的帧数，0 表示不生成")
+    parser.add_argument("--tile", type=int, default=0, help="切块推理的块边长（像素），0 表示整图推理")
+    parser.add_argument("--overlap", type=float, default=0.2, help="相邻块的重叠比例")
+    parser.add_argument("--merge", choices=MERGE_MODES, default="nms", help="跨块合并方式")
+    parser.add_argument("--merge-iou", type=float, default=0.5, help="跨块合并的 IoU 阈值")
+    parser.add_argument("--quantize", choices=QUANT_MODES, default=None, help="把 -m 指定的模型量化为 INT8 ONNX")
+    parser.add_argument("--calib", default=None, help="量化校准图片（目录、通配符或 @列表文件）")
+    parser.add_argument("--info", default=None, help="读取模型元数据（模型路径或 @列表文件），每个模型输出一行 JSON")
+    parser.add_argument("--format", choices=LABEL_FORMATS, default=None, help="同时导出标注文件：yolo / coco / jsonl")
+    parser.add_argument("--labels", default=None, help="标注文件目录，默认为输出目录下的 labels（单张图为输出图片所在目录）")
+    parser.add_argument("--threads", type=int, default=0, help="推理线程数（intra-op），默认由 torch 决定")
+    parser.add_argument("--cpus", default="", help="绑定到指定 CPU 核心，如 0,1,2,3")
+    args = parser.parse_args()
+
+    if args.quantize is not None:
+        if not args.model:
+            parser.error("缺少参数：--model")
+    elif args.serve is None and args.info is None:
+        missing = [name for name in ("model", "input", "output") if not getattr(args, name)]
+        if missing:
+            parser.error("缺少参数：" + ", ".join(f"--{name}" for name in missing))
+    return args
+
+
+def apply_cpu_limits(threads, cpus):
+    """ 限制本进程的线程数并可选绑定核心，多个进程并行时避免互相抢占 """
+    if threads > 0:
+        import torch
+        torch.set_num_threads(threads)
+        cv2.setNumThreads(threads)
+
+    if not cpus:
+        return
+    cores = [int(c) for c in cpus.split(",") if c.strip()]
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+        return
+    try:
+        import psutil
+    except ImportError:
+        print("未安装 psutil，忽略 --cpus")
+        return
+    psutil.Process().cpu_affinity(cores)
+
+
+def load_model(path, backend="torch", imgsz=640, cache_dir="./cache/export"):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"模型文件不存在：{path}")
+    return YOLO(resolve_model(path, backend, imgsz, cache_dir))
+
+
+def parse_extra(extra):
+    if not extra:
+        return {}
+    if isinstance(extra, dict):
+        return extra
+    return json.loads(extra)
+
+
+def expand_inputs(spec):
+    """ 单个文件、目录、通配符或 @列表文件（每行一个路径） """
+    if spec.startswith("@"):
+        with open(spec[1:], encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    if os.path.isdir(spec):
+        return sorted(str(p) for p in Path(spec).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    if glob.has_magic(spec):
+        return sorted(p for p in glob.glob(spec, recursive=True) if Path(p).suffix.lower() in IMAGE_SUFFIXES)
+    return [spec]
+
+
+def is_batch_input(spec):
+    return spec.startswith("@") or os.path.isdir(spec) or glob.has_magic(spec)
+
+
+def output_names(paths, out_dir):
+    """ 同名文件来自不同目录时追加序号，避免互相覆盖 """
+    seen = {}
+    outputs = []
+    for p in paths:
+        name = Path(p).name
+        count = seen.get(name.lower(), 0)
+        seen[name.lower()] = count + 1
+        if count:
+            name = f"{Path(p).stem}_{count}{Path(p).suffix}"
+        outputs.append(str(Path(out_dir) / name))
+    return outputs
+
+
+def tiling_options(args):
+    if args.tile <= 0:
+        return None
+    return {"tile": args.tile, "overlap": args.overlap, "batch": args.batch, "merge": args.merge, "iou": args.merge_iou}
+
+
+def detect_images(model, images, extra=None, tiling=None):
+    if tiling:
+        return [detect_tiled(model, image, extra=parse_extra(extra), **tiling) for image in images]
+    results = model(images, verbose=False, **parse_extra(extra))
+    return [sv.Detections.from_ultralytics(result) for result in results]
+
+
+def annotate(image, detections):
+    box_annotator = sv.BoxAnnotator()
+    return box_annotator.annotate(scene=image, detections=detections)
+
+
+def read_image(input_path):
+    image = cv2.imread(input_path)
+    if image is None:
+        raise FileNotFoundError(f"无法读取图片：{input_path}")
+    return image
+
+
+def write_image(output_path, image):
+    if not cv2.imwrite(output_path, image):
+        raise IOError(f"无法写入图片：{output_path}")
+
+
+def detect_file(model, input_path, output_path, extra=None, tiling=None):
+    image = read_image(input_path)
+    detections = detect_images(model, [image], extra, tiling)[0]
+    write_image(output_path, annotate(image, detections))
+    return detections
+
+
+def render_file(input_path, output_path, record, style="box", conf=0.0, classes=None):
+    """ 用已保存的检测结果重新标注，不经过模型 """
+    image = read_image(input_path)
+    detections = detections_from_record(record, conf, classes)
+    write_image(output_path, annotate_styled(image, detections, style))
+
+
+def detect_video(model, input_path, output_path, args, extra=None):
+    tiling = tiling_options(args)
+    frames, preview = run_video(
+        lambda frames: detect_images(model, frames, extra, tiling), annotate, input_path, output_path,
+        batch=args.batch, stride=args.stride, skip=args.skip, jsonl=args.jsonl, preview=args.preview
+    )
+    return frames, preview
+
+
+def run_batch(model, inputs, out_dir, batch_size=8, extra=None, tiling=None, io_threads=2, labels=None):
+    """
+    一个进程、一次模型加载，按批调用 model([...])；读图和写图在 I/O 线程中与推理重叠。
+    labels 为标注写入器时按输入顺序逐张写出标注，只暂存尚未轮到的几张图的检测结果。
+    输出文件名和暂存的结果按任务序号对应，同一输入出现多次时各自输出一份。
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    targets = output_names(inputs, out_dir)
+    records = {}
+    progress = {"count": 0}
+
+    def encode(job, image, detections):
+        index, _ = job
+        write_image(targets[index], annotate(image, detections))
+        if labels is not None:
+            records[index] = (image.shape[1], image.shape[0], detections_record(detections))
+
+    def on_result(job, error):
+        index, _ = job
+        progress["count"] += 1
+        if error is not None:
+            print(error)
+        elif labels is not None:
+            width, height, record = records.pop(index)
+            labels.add(targets[index], width, height, record)
+        if progress["count"] % max(1, batch_size) == 0 or progress["count"] == len(inputs):
+            print(f"进度：{progress['count']}/{len(inputs)}")
+
+    pipeline = Pipeline(
+        decode=lambda job: read_image(job[1]),
+        infer=lambda images: detect_images(model, images, extra, tiling),
+        encode=encode,
+        batch=1 if tiling else batch_size, readers=io_threads, writers=io_threads
+    )
+    return pipeline.run(list(enumerate(inputs)), on_result)
+
+
+def serve(args):
+    """ 常驻模式：每行一个 JSON 任务，模型由 ModelRegistry 按 LRU 缓存 """
+    host, port = args.serve.rsplit(":", 1)
+    sock = socket.create_connection((host, int(port)))
+    stream = sock.makefile("rwb")
+
+    def send(message):
+        stream.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        stream.flush()
+
+    registry = ModelRegistry(
+        lambda path: load_model(path, args.backend, args.imgsz, args.cache_dir), args.model_budget * 1024 * 1024
+    )
+    try:
+        if args.model:
+            registry.get(args.model)
+        send({"token": args.token, "ok": True, "stats": registry.stats()})
+    except Exception as e:
+        send({"token": args.token, "ok": False, "error": str(e)})
+        return
+
+    for line in stream:
+        try:
+            job = json.loads(line)
+        except ValueError:
+            continue
+
+        op = job.get("op", "infer")
+        if op == "exit":
+            break
+
+        try:
+            if op == "stats":
+                send({"id": job.get("id"), "ok": True, "stats": registry.stats()})
+                continue
+            if op == "render":
+                render_file(job["input"], job["output"], job["detections"], **(job.get("style") or {}))
+                send({"id": job.get("id"), "ok": True, "output": job["output"]})
+                continue
+            if op != "infer":
+                raise ValueError(f"未知操作：{op}")
+
+            model_path = job.get("model") or args.model
+            if not model_path:
+                raise ValueError("未指定模型")
+            model = registry.get(model_path)
+
+            if is_video(job["input"]):
+                frames, preview = detect_video(model, job["input"], job["output"], args, job.get("args"))
+                send({
+                    "id": job.get("id"), "ok": True, "output": job["output"], "frames": frames, "preview": preview,
+                    "stats": registry.stats()
+                })
+                continue
+
+            detections = detect_file(model, job["input"], job["output"], job.get("args"), tiling_options(args))
+            send({
+                "id": job.get("id"), "ok": True, "output": job["output"],
+                "count": len(detections), "detections": detections_record(detections), "stats": registry.stats()
+            })
+        except Exception as e:
+            send({"id": job.get("id"), "ok": False, "error": str(e)})
+
+    sock.close()
+
+
+def run_quantize(args):
+    calib = expand_inputs(args.calib) if args.calib else []
+    output = quantize_model(args.model, args.quantize, calib, args.output, args.imgsz, args.cache_dir)
+
+    report = {"source": os.path.basename(args.model), "mode": args.quantize, "calibration": len(calib)}
+    if calib:
+        report.update(benchmark(args.model, output, calib, args.imgsz))
+    write_report(output, report)
+    print(f"量化模型已保存至：{output}")
+    print(json.dumps(report, ensure_ascii=False))
+
+
+def run_info(spec):
+    """ 每个模型一行 {"model", "ok", "info" / "error"}，读完一个输出一个，调用方可以边读边显示 """
+    if spec.startswith("@"):
+        with open(spec[1:], encoding="utf-8") as f:
+            models = [line.strip() for line in f if line.strip()]
+    else:
+        models = [spec]
+
+    for path in models:
+        try:
+            reply = {"model": path, "ok": True, "info": model_info(path)}
+        except Exception as e:
+            reply = {"model": path, "ok": False, "error": str(e)}
+        # 转义非 ASCII 字符，中文路径不受控制台代码页影响
+        print(json.dumps(reply), flush=True)
 
 
 def main():
     args = parse_args()
+    apply_cpu_limits(args.threads, args.cpus)
 
-    image = cv2.imread(args.input)
-    if image is None:
-        raise FileNotFoundError(f"无法读取图片：{args.input}")
+    if args.serve is not None:
+        serve(args)
+        return
 
-    if not os.path.isfile(args.model):
-        raise FileNotFoundError(f"模型文件不存在：{args.model}")
-    model = YOLO(args.model)
+    if args.info is not None:
+        run_info(args.info)
+        return
 
-    result = model(image)[0]
-    detections = sv.Detections.from_ultralytics(result)
+    if args.quantize is not None:
+        run_quantize(args)
+        return
 
-    box_annotator = sv.BoxAnnotator()
-    annotated = box_annotator.annotate(scene=image, detections=detections)
+    model = load_model(args.model, args.backend, args.imgsz, args.cache_dir)
+
+    if is_video(args.input):
+        frames, preview = detect_video(model, args.input, args.output, args, args.json)
+        print(f"已处理 {frames} 帧，结果已保存至：{args.output}")
+        return
+
+    if is_batch_input(args.input):
+        inputs = expand_inputs(args.input)
+        if not inputs:
+            raise FileNotFoundError(f"没有找到输入图片：{args.input}")
+        labels_dir = args.labels or os.path.join(args.output, "labels")
+        labels = label_writer(args.format, folder_opener(labels_dir)) if args.format else None
+        try:
+            done, failed = run_batch(
+                model, inputs, args.output, args.batch, args.json, tiling_options(args), args.io_threads, labels
+            )
+        finally:
+            if labels is not None:
+                labels.close()
+        print(f"完成 {done} 张，失败 {failed} 张，结果已保存至：{args.output}")
+        if labels is not None:
+            print(f"标注文件已保存至：{labels_dir}")
+        return
 
-    cv2.imwrite(args.output, annotated)
+    detections = detect_file(model, args.input, args.output, args.json, tiling_options(args))
+    if args.format:
+        height, width = read_image(args.input).shape[:2]
+        labels = label_writer(args.format, folder_opener(args.labels or Path(args.output).parent))
+        labels.add(args.output, width, height, detections_record(detections))
+        labels.close()
     print(f"结果已保存至：{args.output}")
 
 
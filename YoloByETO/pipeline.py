@@ -0,0 +1,115 @@
+import threading
+from queue import Queue, Empty
+
+_DONE = object()
+
+
+class Pipeline:
+    """
+    解码 → 推理 → 编码 三段流水线。
+    读取/解码、编码/写入在 I/O 线程中进行，通过有界队列与推理阶段相连：
+    队列满时上游阻塞（背压），结果按输入顺序回调。
+    """
+
+    def __init__(self, decode, infer, encode, batch=8, readers=2, writers=2, depth=16):
+        self.decode = decode
+        self.infer = infer
+        self.encode = encode
+        self.batch = max(1, batch)
+        self.readers = max(1, readers)
+        self.writers = max(1, writers)
+        self.decoded = Queue(maxsize=max(self.batch, depth))
+        self.encoded = Queue(maxsize=max(self.batch, depth))
+        self.results = Queue()
+
+    def _read(self, source, lock):
+        while True:
+            with lock:
+                try:
+                    seq, item = next(source)
+                except StopIteration:
+                    break
+            try:
+                self.decoded.put((seq, item, self.decode(item), None))
+            except Exception as e:
+                self.decoded.put((seq, item, None, e))
+        self.decoded.put(_DONE)
+
+    def _write(self):
+        while True:
+            job = self.encoded.get()
+            if job is _DONE:
+                break
+            seq, item, data, result, error = job
+            if error is None:
+                try:
+                    self.encode(item, data, result)
+                except Exception as e:
+                    error = e
+            self.results.put((seq, item, error))
+
+    def _next_batch(self, pending_readers):
+        batch = []
+        while len(batch) < self.batch and pending_readers[0]:
+            try:
+                job = self.decoded.get() if not batch else self.decoded.get_nowait()
+            except Empty:
+                break
+            if job is _DONE:
+                pending_readers[0] -= 1
+                continue
+            batch.append(job)
+        return batch
+
+    def run(self, items, on_result=None):
+        """ 返回 (成功数, 失败数)；on_result(item, error) 按输入顺序调用 """
+        source = iter(enumerate(items))
+        lock = threading.Lock()
+        readers = [threading.Thread(target=self._read, args=(source, lock), daemon=True) for _ in range(self.readers)]
+        writers = [threading.Thread(target=self._write, daemon=True) for _ in range(self.writers)]
+        for t in readers + writers:
+            t.start()
+
+        reorder, state = {}, {"next": 0, "done": 0, "failed": 0}
+
+        def drain():
+            while True:
+                try:
+                    seq, item, error = self.results.get_nowait()
+                except Empty:
+                    return
+                reorder[seq] = (item, error)
+                while state["next"] in reorder:
+                    item, error = reorder.pop(state["next"])
+                    state["failed" if error else "done"] += 1
+                    if on_result:
+                        on_result(item, error)
+                    state["next"] += 1
+
+        pending_readers = [self.readers]
+        while pending_readers[0]:
+            batch = self._next_batch(pending_readers)
+            if not batch:
+                continue
+
+            ready = [job for job in batch if job[3] is None]
+            try:
+                outputs = self.infer([job[2] for job in ready]) if ready else []
+                error = None
+            except Exception as e:
+                outputs, error = [None] * len(ready), e
+
+            results = iter(outputs)
+            for seq, item, data, decode_error in batch:
+                if decode_error is not None:
+                    self.encoded.put((seq, item, None, None, decode_error))
+                else:
+                    self.encoded.put((seq, item, data, next(results), error))
+            drain()
+
+        for _ in writers:
+            self.encoded.put(_DONE)
+        for t in writers:
+            t.join()
+        drain()
+        return state["done"], state["failed"]
@@ -0,0 +1,116 @@
+import json
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import supervision as sv
+from ultralytics import YOLO
+
+from backend import export_model
+
+QUANT_MODES = ["dynamic", "static"]
+
+
+def letterbox(image, imgsz):
+    """ 与 ultralytics 预处理一致：等比缩放、灰边填充、BGR→RGB、NCHW float32 """
+    h, w = image.shape[:2]
+    scale = min(imgsz / h, imgsz / w)
+    nh, nw = round(h * scale), round(w * scale)
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+    canvas[top:top + nh, left:left + nw] = cv2.resize(image, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return canvas[:, :, ::-1].transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+
+
+class ImageCalibrationReader:
+    """ onnxruntime 静态量化的校准数据源，逐张读取，不把整个校准集留在内存里 """
+
+    def __init__(self, images, input_name, imgsz):
+        self.images = iter(images)
+        self.input_name = input_name
+        self.imgsz = imgsz
+
+    def get_next(self):
+        for path in self.images:
+            image = cv2.imread(path)
+            if image is not None:
+                return {self.input_name: letterbox(image, self.imgsz)}
+        return None
+
+
+def quantize_model(path, mode, calib_images, output=None, imgsz=640, cache_dir="./cache/export"):
+    from onnx import load as load_onnx, save as save_onnx
+    from onnxruntime import InferenceSession
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+
+    fp32 = export_model(path, "onnx", imgsz, cache_dir)
+    output = output or str(Path(path).with_name(Path(path).stem + "_int8.onnx"))
+
+    if mode == "dynamic":
+        quantize_dynamic(fp32, output, weight_type=QuantType.QUInt8)
+    elif mode == "static":
+        if not calib_images:
+            raise ValueError("静态量化需要校准图片")
+        input_name = InferenceSession(fp32, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+        quantize_static(
+            fp32, output, ImageCalibrationReader(calib_images, input_name, imgsz),
+            quant_format=QuantFormat.QDQ, activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8
+        )
+    else:
+        raise ValueError(f"未知量化方式：{mode}")
+
+    # 保留 ultralytics 写入的 names/imgsz/task 等元数据，YOLO() 才能直接加载量化模型
+    source, quantized = load_onnx(fp32), load_onnx(output)
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(source.metadata_props)
+    save_onnx(quantized, output)
+    return output
+
+
+def _match_rate(a, b, iou_threshold=0.5):
+    """ 同类别且 IoU 达标的一一匹配数占两侧检测数均值的比例 """
+    if len(a) == 0 and len(b) == 0:
+        return 1.0
+    if len(a) == 0 or len(b) == 0:
+        return 0.0
+
+    iou = sv.box_iou_batch(a.xyxy, b.xyxy)
+    iou[a.class_id[:, None] != b.class_id[None, :]] = 0
+    matches = 0
+    while True:
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        if iou[i, j] < iou_threshold:
+            break
+        matches += 1
+        iou[i, :] = 0
+        iou[:, j] = 0
+    return 2 * matches / (len(a) + len(b))
+
+
+def _timed_detections(model, images, imgsz):
+    model(images[0], imgsz=imgsz, verbose=False)
+    start = time.perf_counter()
+    detections = [sv.Detections.from_ultralytics(model(image, imgsz=imgsz, verbose=False)[0]) for image in images]
+    return detections, (time.perf_counter() - start) / len(images)
+
+
+def benchmark(reference, quantized, images, imgsz=640, limit=16):
+    """ 对比 FP32 原模型与 INT8 模型的单张耗时和检测一致率 """
+    frames = [image for image in (cv2.imread(p) for p in images[:limit]) if image is not None]
+    if not frames:
+        return {}
+
+    ref_dets, ref_time = _timed_detections(YOLO(reference), frames, imgsz)
+    q_dets, q_time = _timed_detections(YOLO(quantized), frames, imgsz)
+    return {
+        "speedup": round(ref_time / q_time, 2) if q_time > 0 else None,
+        "agreement": round(float(np.mean([_match_rate(a, b) for a, b in zip(ref_dets, q_dets)])), 3),
+        "fp32_ms": round(ref_time * 1000, 1),
+        "int8_ms": round(q_time * 1000, 1),
+    }
+
+
+def write_report(output, report):
+    with open(Path(output).with_suffix(".json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,46 @@
+import numpy as np
+import supervision as sv
+
+ANNOTATE_STYLES = ["box", "round_box", "corner", "box_label"]
+
+
+def detections_record(detections):
+    """ 单帧/单图检测结果的 JSON 表示 """
+    record = {
+        "xyxy": np.round(detections.xyxy, 2).tolist(),
+        "class_id": detections.class_id.tolist() if detections.class_id is not None else [],
+        "confidence": np.round(detections.confidence, 4).tolist() if detections.confidence is not None else [],
+    }
+    if "class_name" in detections.data:
+        record["class_name"] = [str(n) for n in detections.data["class_name"]]
+    return record
+
+
+def detections_from_record(record, conf=0.0, classes=None):
+    """ 从保存的检测结果重建 sv.Detections，并按置信度下限和类别名过滤 """
+    xyxy = np.asarray(record.get("xyxy") or [], dtype=np.float32).reshape(-1, 4)
+    class_id = np.asarray(record.get("class_id") or [], dtype=int)
+    confidence = np.asarray(record.get("confidence") or [], dtype=np.float32)
+    names = np.asarray(record.get("class_name") or [str(c) for c in class_id])
+
+    keep = confidence >= conf
+    if classes:
+        keep &= np.isin(names, list(classes))
+
+    return sv.Detections(
+        xyxy=xyxy[keep], class_id=class_id[keep], confidence=confidence[keep],
+        data={"class_name": names[keep]}
+    )
+
+
+def annotate_styled(image, detections, style="box"):
+    if style == "round_box":
+        return sv.RoundBoxAnnotator().annotate(scene=image, detections=detections)
+    if style == "corner":
+        return sv.BoxCornerAnnotator().annotate(scene=image, detections=detections)
+
+    annotated = sv.BoxAnnotator().annotate(scene=image, detections=detections)
+    if style == "box_label" and len(detections):
+        labels = [f"{n} {c:.2f}" for n, c in zip(detections.data["class_name"], detections.confidence)]
+        annotated = sv.LabelAnnotator().annotate(scene=annotated, detections=detections, labels=labels)
+    return annotated
@@ -0,0 +1,66 @@
+import gc
+import os
+from collections import OrderedDict
+
+
+def estimate_size(model, path):
+    """ 按参数占用估算模型常驻内存，取不到时退回文件大小 """
+    try:
+        return sum(p.numel() * p.element_size() for p in model.model.parameters())
+    except Exception:
+        return os.path.getsize(path)
+
+
+class ModelRegistry:
+    """ 按 路径+mtime 缓存已加载的模型，超出内存预算时淘汰最久未用的模型 """
+
+    def __init__(self, loader, budget=2048 * 1024 * 1024):
+        self.loader = loader
+        self.budget = budget
+        self._models = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def used(self):
+        return sum(size for _, size in self._models.values())
+
+    def get(self, path):
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"模型文件不存在：{path}")
+        key = (path, os.path.getmtime(path))
+
+        if key in self._models:
+            self.hits += 1
+            self._models.move_to_end(key)
+            return self._models[key][0]
+
+        self.misses += 1
+        for stale in [k for k in self._models if k[0] == path]:
+            del self._models[stale]
+
+        self._evict(os.path.getsize(path))
+        model = self.loader(path)
+        self._models[key] = (model, estimate_size(model, path))
+        return model
+
+    def _evict(self, incoming):
+        evicted = False
+        while self._models and self.used + incoming > self.budget:
+            self._models.popitem(last=False)
+            self.evictions += 1
+            evicted = True
+        if evicted:
+            gc.collect()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "models": len(self._models),
+            "bytes": self.used,
+            "budget": self.budget,
+        }
@@ -0,0 +1,105 @@
+import numpy as np
+import supervision as sv
+
+MERGE_MODES = ["nms", "wbf"]
+
+
+def tile_origins(length, tile, step):
+    """ 以 step 为步长覆盖 [0, length)，最后一块贴齐边缘 """
+    if length <= tile:
+        return [0]
+    origins = list(range(0, length - tile, step))
+    origins.append(length - tile)
+    return origins
+
+
+def iter_tiles(image, tile=1024, overlap=0.2):
+    """ 逐块产出 (x0, y0, 视图)，切片是原图的视图，不复制整幅大图 """
+    h, w = image.shape[:2]
+    step = max(1, int(tile * (1 - overlap)))
+    for y0 in tile_origins(h, tile, step):
+        for x0 in tile_origins(w, tile, step):
+            yield x0, y0, image[y0:y0 + tile, x0:x0 + tile]
+
+
+def _iou_one(box, boxes):
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+
+def merge_boxes(xyxy, scores, class_id, iou_threshold=0.5, mode="nms"):
+    """
+    跨块合并：按类别分组的贪心 NMS 或 WBF（同簇框按置信度加权平均）。
+    类别通过坐标平移隔开，每轮只算一行 IoU，内存随检测数线性增长。
+    返回 (xyxy, scores, class_id)。
+    """
+    if len(xyxy) == 0:
+        return xyxy, scores, class_id
+
+    offset = (xyxy.max() + 1) * class_id.astype(np.float64)[:, None]
+    shifted = xyxy.astype(np.float64) + offset
+    order = np.argsort(-scores)
+
+    out_boxes, out_scores, out_classes = [], [], []
+    while order.size:
+        i, rest = order[0], order[1:]
+        ious = _iou_one(shifted[i], shifted[rest])
+        cluster = np.concatenate(([i], rest[ious > iou_threshold]))
+        order = rest[ious <= iou_threshold]
+
+        if mode == "wbf":
+            weights = scores[cluster]
+            out_boxes.append((xyxy[cluster] * weights[:, None]).sum(axis=0) / weights.sum())
+            out_scores.append(weights.mean())
+        else:
+            out_boxes.append(xyxy[i])
+            out_scores.append(scores[i])
+        out_classes.append(class_id[i])
+
+    return (
+        np.asarray(out_boxes, dtype=np.float32),
+        np.asarray(out_scores, dtype=np.float32),
+        np.asarray(out_classes, dtype=int),
+    )
+
+
+def detect_tiled(model, image, tile=1024, overlap=0.2, batch=8, merge="nms", iou=0.5, extra=None):
+    """ 大图切块后按批推理，再把各块的检测平移回原图坐标并合并 """
+    boxes, scores, classes = [], [], []
+    pending = []
+
+    def flush():
+        results = model([view for _, _, view in pending], verbose=False, **(extra or {}))
+        for (x0, y0, _), result in zip(pending, results):
+            det = sv.Detections.from_ultralytics(result)
+            if len(det) == 0:
+                continue
+            boxes.append(det.xyxy + np.array([x0, y0, x0, y0], dtype=det.xyxy.dtype))
+            scores.append(det.confidence)
+            classes.append(det.class_id)
+        pending.clear()
+
+    for tile_info in iter_tiles(image, tile, overlap):
+        pending.append(tile_info)
+        if len(pending) >= batch:
+            flush()
+    if pending:
+        flush()
+
+    if not boxes:
+        return sv.Detections.empty()
+
+    xyxy, confidence, class_id = merge_boxes(
+        np.concatenate(boxes), np.concatenate(scores), np.concatenate(classes), iou, merge
+    )
+    names = model.names
+    return sv.Detections(
+        xyxy=xyxy, confidence=confidence, class_id=class_id,
+        data={"class_name": np.array([names[int(c)] for c in class_id])}
+    )
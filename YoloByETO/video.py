@@ -0,0 +1,118 @@
+import json
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from records import detections_record
+
+VIDEO_SUFFIXES = {".mp4", ".avi", ".mkv"}
+
+_FOURCC = {".mp4": "mp4v", ".avi": "XVID", ".mkv": "XVID"}
+
+
+def is_video(path):
+    return Path(path).suffix.lower() in VIDEO_SUFFIXES
+
+
+def iter_frames(path, stride=1, skip=0):
+    """ 解码生成器：跳过的帧只 grab 不 retrieve，内存只占当前一帧 """
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        raise FileNotFoundError(f"无法打开视频：{path}")
+    try:
+        index = 0
+        while True:
+            if index < skip or (index - skip) % stride:
+                if not cap.grab():
+                    break
+            else:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                yield index, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def iter_batches(frames, size):
+    batch = []
+    for item in frames:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ContactSheet:
+    """ 均匀抽取若干帧拼成预览图，只保留缩小后的帧 """
+
+    def __init__(self, count=9, total=0, width=320):
+        self.count = count
+        self.width = width
+        self.every = max(1, total // count) if total > 0 else 30
+        self.frames = []
+
+    def offer(self, index, frame):
+        if len(self.frames) >= self.count or index % self.every:
+            return
+        h, w = frame.shape[:2]
+        self.frames.append(cv2.resize(frame, (self.width, max(1, int(h * self.width / w))), interpolation=cv2.INTER_AREA))
+
+    def save(self, path):
+        if not self.frames:
+            return None
+        cols = int(np.ceil(np.sqrt(len(self.frames))))
+        height = max(f.shape[0] for f in self.frames)
+        blank = np.zeros((height, self.width, 3), dtype=np.uint8)
+        cells = [np.vstack([f, blank[:height - f.shape[0]]]) for f in self.frames]
+        cells += [blank] * (cols * int(np.ceil(len(cells) / cols)) - len(cells))
+        rows = [np.hstack(cells[i:i + cols]) for i in range(0, len(cells), cols)]
+        cv2.imwrite(str(path), np.vstack(rows))
+        return str(path)
+
+
+def preview_path(output_path):
+    return str(Path(output_path).with_suffix(".preview.jpg"))
+
+
+def run_video(detect, annotate, input_path, output_path, batch=8, stride=1, skip=0, jsonl=None, preview=9):
+    """
+    流式处理视频：解码 → 按批推理 → 标注 → 编码，逐帧写出 JSON lines。
+    detect(frames) 返回每帧的 sv.Detections，annotate(frame, detections) 返回标注后的帧。
+    """
+    cap = cv2.VideoCapture(str(input_path))
+    if not cap.isOpened():
+        raise FileNotFoundError(f"无法打开视频：{input_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25
+    size = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    stride = max(1, stride)
+    fourcc = cv2.VideoWriter_fourcc(*_FOURCC.get(Path(output_path).suffix.lower(), "mp4v"))
+    writer = cv2.VideoWriter(str(output_path), fourcc, fps / stride, size)
+    if not writer.isOpened():
+        raise IOError(f"无法写入视频：{output_path}")
+
+    jsonl = jsonl or str(Path(output_path).with_suffix(".jsonl"))
+    sheet = ContactSheet(preview, max(0, total - skip) // stride) if preview else None
+    frames = 0
+
+    try:
+        with open(jsonl, "w", encoding="utf-8") as records:
+            for chunk in iter_batches(iter_frames(input_path, stride, skip), max(1, batch)):
+                for (index, frame), detections in zip(chunk, detect([f for _, f in chunk])):
+                    annotated = annotate(frame, detections)
+                    writer.write(annotated)
+                    records.write(json.dumps(dict(frame=index, **detections_record(detections)), ensure_ascii=False) + "\n")
+                    if sheet is not None:
+                        sheet.offer(frames, annotated)
+                    frames += 1
+    finally:
+        writer.release()
+
+    return frames, sheet.save(preview_path(output_path)) if sheet is not None else None
@@ -0,0 +1,159 @@
+import os
+import glob
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+
+_MODEL_DIGESTS = {}
+_MODEL_LOCK = threading.Lock()
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_digest(path):
+    """ 模型文件很大，按 路径+mtime+大小 记住哈希，模型不变时只做一次 stat """
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    with _MODEL_LOCK:
+        if key in _MODEL_DIGESTS:
+            return _MODEL_DIGESTS[key]
+    digest = file_digest(path)
+    with _MODEL_LOCK:
+        _MODEL_DIGESTS[key] = digest
+    return digest
+
+
+def args_digest(args):
+    return hashlib.sha256(json.dumps(args, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def result_key(input_hash, model_hash, args_hash):
+    return hashlib.sha256(f"{input_hash}:{model_hash}:{args_hash}".encode("ascii")).hexdigest()
+
+
+def file_signature(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+class FileManifest:
+    """ 按 路径+mtime+大小 记住输入文件的内容哈希并持久化，未改动的文件重启后也不再重新读取 """
+
+    def __init__(self, path="./cache/manifest.json"):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def digest(self, path, signature=None):
+        mtime, size = signature or file_signature(path)
+        key = os.path.abspath(path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry[0] == mtime and entry[1] == size:
+            return entry[2]
+
+        digest = file_digest(path)
+        with self._lock:
+            self._entries[key] = [mtime, size, digest]
+            self._dirty = True
+        return digest
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._entries)
+            self._dirty = False
+        atomic_write_text(self.path, data)
+
+
+def atomic_copy(src, dst):
+    """ 先写同目录临时文件再 rename，中途崩溃不会留下半个文件 """
+    dst = Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=dst.parent)
+    try:
+        with os.fdopen(fd, "wb") as out, open(src, "rb") as f:
+            shutil.copyfileobj(f, out, 1 << 20)
+        os.replace(tmp, dst)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_text(path, text):
+    """ 同 atomic_copy：先写同目录临时文件再 rename，保存 JSON 索引时中途崩溃不会损坏旧文件 """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class ResultCache:
+    """
+    按 输入内容哈希 + 模型哈希 + 推理参数 寻址的持久结果缓存。
+    一个结果可以有多个文件（如视频及其预览图、逐帧 jsonl），以 <key><后缀> 存放。
+    """
+
+    def __init__(self, root="./cache/results"):
+        self.root = Path(root)
+
+    def _dir(self, key):
+        return self.root / key[:2]
+
+    def files(self, key):
+        folder = self._dir(key)
+        if not folder.exists():
+            return []
+        return [p for p in folder.iterdir() if p.name.startswith(key)]
+
+    def contains(self, key):
+        return bool(self.files(key))
+
+    def put(self, key, output_path):
+        """ 把 output_path 以及以其主干名开头的附属文件存入缓存 """
+        output = Path(output_path)
+        stem = output.name[:-len(output.suffix)] if output.suffix else output.name
+        for produced in output.parent.glob(glob.escape(stem) + ".*"):
+            if produced.is_file():
+                atomic_copy(produced, self._dir(key) / (key + produced.name[len(stem):]))
+
+    def restore(self, key, output_path):
+        """ 把缓存中的结果按 output_path 的主干名复制出来，命中返回 True """
+        cached = self.files(key)
+        if not cached:
+            return False
+
+        output = Path(output_path)
+        stem = output.name[:-len(output.suffix)] if output.suffix else output.name
+        for p in cached:
+            target = output.parent / (stem + p.name[len(key):])
+            if not target.exists():
+                atomic_copy(p, target)
+        return output.exists()
@@ -1,10 +1,9 @@
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap
 from PyQt5.QtWidgets import QWidget, QHBoxLayout, QFrame
 
 from qfluentwidgets import SmoothScrollArea, PixmapLabel
 
-from supervision.utils import resource_path
+from supervision.utils import resource_pixmap
 
 
 class DocumentUI(SmoothScrollArea):
@@ -12,7 +11,7 @@ class DocumentUI(SmoothScrollArea):
         super().__init__(parent=parent)
 
         self.label = PixmapLabel(self)
-        self.pixmap = QPixmap(resource_path(r".\src\dark.jpeg"))
+        self.pixmap = resource_pixmap(r".\src\dark.jpeg")
         self.setWidget(self.label)
 
     def resizeEvent(self, event):
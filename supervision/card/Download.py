@@ -1,6 +1,5 @@
 import os
 import time
-import httpx
 
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtWidgets import QHBoxLayout
@@ -9,6 +8,7 @@ from PyQt5.QtGui import QFont
 from qfluentwidgets import MessageBoxBase, SubtitleLabel, InfoBar, InfoBarPosition, ProgressBar, StrongBodyLabel
 
 from supervision.card.Setting import cfg
+from supervision.downloader import RangeDownloader, DownloadCancelled, release_digest
 
 
 class DownloadWorker(QThread):
@@ -18,46 +18,47 @@ class DownloadWorker(QThread):
     downloadFinished = pyqtSignal()
     downloadError = pyqtSignal(str)
 
-    def __init__(self, url, totalSize, fileName, parent=None):
+    def __init__(self, url, totalSize, fileName, sha256=None, parent=None):
         super().__init__(parent)
         self.url = url
         self.totalSize = totalSize
         self.fileName = fileName
+        self.sha256 = sha256
         self._is_running = True
 
     def run(self):
+        """ 分段下载到 .part，进度按固定频率回报；取消后保留已下载部分，下次从断点继续 """
+        # 没有指定哈希时从 release 元数据中取，取不到的只校验大小
+        sha256 = self.sha256 or release_digest(self.url)
+        if sha256 is None:
+            print(f"no published SHA-256 for {self.url}, checking size only")
+        downloader = RangeDownloader(
+            self.url, os.path.join(cfg.get(cfg.modelFolder), self.fileName), self.totalSize, sha256
+        )
+        start_time = time.time()
+        resumed = []
+
+        def report(downloaded_size, total_size):
+            # 断点续传时已有的部分不计入速度
+            if not resumed:
+                resumed.append(downloaded_size)
+            progress = int(100 * downloaded_size / total_size) if total_size > 0 else 0
+            self.progressChanged.emit(progress)
+
+            elapsed_time = max(1e-6, time.time() - start_time)
+            bytes_per_sec = (downloaded_size - resumed[0]) / elapsed_time
+            self.speedChanged.emit(format_speed(bytes_per_sec))
+
+            remaining = (total_size - downloaded_size) / bytes_per_sec if bytes_per_sec > 0 else 0
+            mins, secs = divmod(remaining, 60)
+            self.timeChanged.emit(f"{int(mins)}分{int(secs)}秒")
+
         try:
-            with httpx.stream("GET", self.url, follow_redirects=True) as response:
-                response.raise_for_status()
-                total_size = self.totalSize
-                downloaded_size = 0
-                start_time = time.time()
-
-                with open(os.path.join(cfg.get(cfg.modelFolder), self.fileName), 'wb') as f:
-                    for chunk in response.iter_bytes():
-                        if not self._is_running:
-                            break
-                        if chunk:
-                            f.write(chunk)
-                            downloaded_size += len(chunk)
-
-                            progress = int(100 * downloaded_size / total_size) if total_size > 0 else 0
-                            self.progressChanged.emit(progress)
-
-                            elapsed_time = time.time() - start_time
-                            elapsed_time = max(1e-6, elapsed_time)
-                            bytes_per_sec = downloaded_size / elapsed_time
-                            speed_text = format_speed(bytes_per_sec)
-                            self.speedChanged.emit(speed_text)
-
-                        remaining = (total_size - downloaded_size) / bytes_per_sec if bytes_per_sec > 0 else 0
-
-                        mins, secs = divmod(remaining, 60)
-                        time_text = f"{int(mins)}分{int(secs)}秒"
-                        self.timeChanged.emit(time_text)
-
-                if self._is_running:
-                    self.downloadFinished.emit()
+            downloader.run(report, lambda: not self._is_running)
+            self.downloadFinished.emit()
+
+        except DownloadCancelled:
+            pass
 
         except Exception as e:
             self.downloadError.emit(str(e))
@@ -75,6 +76,7 @@ class DownloadWindow(MessageBoxBase):
         self.url = None
         self.totalSize = None
         self.fileName = None
+        self.sha256 = None
 
         self.downloadThread = None
         self.download_success = False
@@ -117,13 +119,14 @@ class DownloadWindow(MessageBoxBase):
         self.viewLayout.addSpacing(10)
         self.viewLayout.addLayout(self.infoLayout)
 
-    def setDownloadUrl(self, url, totalSize, fileName):
+    def setDownloadUrl(self, url, totalSize, fileName, sha256=None):
         self.url = url
         self.totalSize = totalSize
         self.fileName = fileName
+        self.sha256 = sha256
 
     def startDownload(self):
-        self.downloadThread = DownloadWorker(self.url, self.totalSize, self.fileName)
+        self.downloadThread = DownloadWorker(self.url, self.totalSize, self.fileName, self.sha256)
         self.downloadThread.progressChanged.connect(self.progressBar.setValue)
         self.downloadThread.speedChanged.connect(lambda s: self.speedLabel.setText(f"{s}"))
         self.downloadThread.timeChanged.connect(lambda t: self.timeLabel.setText(f"{t}"))
@@ -141,7 +144,7 @@ class DownloadWindow(MessageBoxBase):
 
         InfoBar.warning(
             title="下载已取消",
-            content="用户中断了下载过程",
+            content="已下载的部分会保留，下次下载同一模型时继续",
             parent=self.parent(),
             duration=3000,
             position=InfoBarPosition.TOP
@@ -194,7 +197,7 @@ def format_speed(bytes_per_sec):
     return f"{fmt} {unit}/s"
 
 
-def show_download_dialog(parent, url, totalSize, fileName):
+def show_download_dialog(parent, url, totalSize, fileName, sha256=None):
     window = DownloadWindow(parent)
-    window.setDownloadUrl(url, totalSize, fileName)
+    window.setDownloadUrl(url, totalSize, fileName, sha256)
     return window.startDownload()
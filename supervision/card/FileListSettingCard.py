@@ -1,46 +1,193 @@
 from pathlib import Path
 
 from PyQt5 import QtCore, QtWidgets
-from PyQt5.QtCore import Qt, pyqtSignal, QSize
-from PyQt5.QtWidgets import QFileDialog, QFrame, QHBoxLayout, QLabel, QSizePolicy
+from PyQt5.QtCore import Qt, pyqtSignal, QSize, QRect, QEvent, QModelIndex, QAbstractListModel, QTimer
+from PyQt5.QtWidgets import QFileDialog, QListView
 
-from qfluentwidgets import ConfigItem, PushButton, FluentIcon, ToolButton, FluentStyleSheet
+from qfluentwidgets import ConfigItem, PushButton, TransparentToolButton, FluentIcon, ListView, ListItemDelegate
 from supervision.card.ExpandSettingCard import ExpandSettingCard
+from supervision.fenwick import Fenwick
+from supervision.utils import MEDIA_SUFFIXES
+from supervision.walker import FolderWalker, path_key
 
 
-class FileItem(QFrame):
-    removed = pyqtSignal(object)
-    clicked = pyqtSignal()
+class FileListModel(QAbstractListModel):
+    """
+    文件列表模型：每个文件有一个不复用的稳定 id（从 1 开始，与 files 的下标 + 1 对应）。
+    id 映射到只增不减的槽位，删除只把槽位标成空位；行号与槽位之间由按槽位记录存活状态的树状数组互相换算，
+    增删都是 O(log n)。空位过多时按当前行号重新分配槽位，id 保持不变。同一路径只保留一份。
+    """
+    IdRole = Qt.UserRole + 1
+    LinkRole = Qt.UserRole + 2
 
-    def __init__(self, path: str, parent=None):
-        super().__init__(parent=parent)
-        self.path = path
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._slotIds = []
+        self._paths = {}
+        self._keys = set()
+        self._links = {}
+        self._slots = {}
+        self._alive = Fenwick()
+        self._dead = 0
+        self._nextId = 1
 
-        self.pathLabel = QLabel(Path(path).name)
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
 
-        self.removeButton = ToolButton(FluentIcon.CLOSE, self)
-        self.removeButton.setFixedSize(32, 22)
-        self.removeButton.setIconSize(QSize(9, 9))
-        self.removeButton.clicked.connect(lambda: self.removed.emit(self))
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        file_id = self._slotIds[self._alive.find(index.row())]
+        if role == Qt.DisplayRole:
+            return Path(self._paths[file_id]).name
+        if role == Qt.ToolTipRole:
+            source = self._links.get(file_id)
+            if source in self._paths:
+                return f"{self._paths[file_id]}\n近似重复，沿用 {Path(self._paths[source]).name} 的检测结果"
+            return self._paths[file_id]
+        if role == self.IdRole:
+            return file_id
+        if role == self.LinkRole:
+            return self._links.get(file_id)
+        return None
 
-        self.hBoxLayout = QHBoxLayout(self)
-        self.hBoxLayout.setContentsMargins(24, 20, 26, 0)
-        self.hBoxLayout.addWidget(self.pathLabel, 0, Qt.AlignLeft)
-        self.hBoxLayout.addSpacing(30)
-        self.hBoxLayout.addWidget(self.removeButton, 0, Qt.AlignRight)
-        self.hBoxLayout.setAlignment(Qt.AlignVCenter)
+    def addPaths(self, paths):
+        """ 一次 beginInsertRows 插入整批文件（跳过已在列表中的路径），返回分配的 id """
+        fresh = []
+        for path in paths:
+            key = path_key(path)
+            if key not in self._keys:
+                self._keys.add(key)
+                fresh.append(path)
+        paths = fresh
+        if not paths:
+            return []
+        start = len(self._paths)
+        self.beginInsertRows(QModelIndex(), start, start + len(paths) - 1)
+        ids = []
+        for path in paths:
+            file_id = self._nextId
+            self._nextId += 1
+            self._slots[file_id] = self._alive.append(1)
+            self._paths[file_id] = path
+            self._slotIds.append(file_id)
+            ids.append(file_id)
+        self.endInsertRows()
+        return ids
 
-        self.setFixedHeight(45)
-        self.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Fixed)
-        FluentStyleSheet.SETTING_CARD.apply(self)
+    def rowOf(self, file_id):
+        slot = self._slots.get(file_id)
+        return -1 if slot is None else self._alive.prefix(slot)
 
-    def mousePressEvent(self, event):
-        self.clicked.emit()
-        super().mousePressEvent(event)
+    def removeId(self, file_id):
+        row = self.rowOf(file_id)
+        if row < 0:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        slot = self._slots.pop(file_id)
+        self._slotIds[slot] = None
+        self._keys.discard(path_key(self._paths.pop(file_id)))
+        self._links.pop(file_id, None)
+        self._alive.set(slot, 0)
+        self._dead += 1
+        self.endRemoveRows()
+        if self._dead > max(1024, len(self._alive) // 2):
+            self._compact()
+        return True
+
+    def _compact(self):
+        """ 去掉空位、按当前行号重新分配槽位，O(n)，删除过半时才触发 """
+        self._slotIds = [file_id for file_id in self._slotIds if file_id is not None]
+        self._slots = {file_id: row for row, file_id in enumerate(self._slotIds)}
+        self._alive = Fenwick([1] * len(self._slotIds))
+        self._dead = 0
+
+    def clear(self):
+        self.beginResetModel()
+        self._slotIds = []
+        self._paths = {}
+        self._keys = set()
+        self._links = {}
+        self._slots = {}
+        self._alive = Fenwick()
+        self._dead = 0
+        self._nextId = 1
+        self.endResetModel()
+
+    def setLink(self, file_id, source_id=None):
+        """ 标记 file_id 沿用了 source_id 的检测结果，source_id 为 None 时取消标记 """
+        if self._links.get(file_id) == source_id:
+            return
+        if source_id is None:
+            self._links.pop(file_id, None)
+        else:
+            self._links[file_id] = source_id
+        row = self.rowOf(file_id)
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [self.LinkRole, Qt.ToolTipRole])
+
+    def path(self, file_id):
+        return self._paths.get(file_id, '')
+
+    def entries(self):
+        """ 按显示顺序的 [(id, 路径)] """
+        return [(file_id, self._paths[file_id]) for file_id in self._slotIds if file_id is not None]
+
+    def files(self):
+        """ 兼容旧接口：下标为 id - 1，已删除的位置为空字符串；O(最大 id)，只在需要时调用 """
+        files = [''] * (self._nextId - 1)
+        for file_id, path in self._paths.items():
+            files[file_id - 1] = path
+        return files
+
+
+class FileItemDelegate(ListItemDelegate):
+    """
+    画文件名和右侧的删除按钮，近似重复的文件在按钮左侧多画一个链接图标；
+    点击删除区域发出 removeClicked(id)，其余区域发出 itemClicked(id)
+    """
+    removeClicked = pyqtSignal(int)
+    itemClicked = pyqtSignal(int)
+
+    ROW_HEIGHT = 45
+    BUTTON_SIZE = QSize(32, 22)
+
+    def _buttonRect(self, rect):
+        size = self.BUTTON_SIZE
+        return QRect(
+            rect.right() - 26 - size.width(), rect.top() + (rect.height() - size.height()) // 2,
+            size.width(), size.height()
+        )
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        link = 20 if index.data(FileListModel.LinkRole) else 0
+        option.rect.adjust(18, 0, -(self.BUTTON_SIZE.width() + 40 + link), 0)
+        option.textElideMode = Qt.ElideMiddle
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        icon = self._buttonRect(option.rect)
+        FluentIcon.CLOSE.render(painter, QRect(icon.center().x() - 4, icon.center().y() - 4, 9, 9))
+        if index.data(FileListModel.LinkRole):
+            FluentIcon.LINK.render(painter, QRect(icon.left() - 18, icon.center().y() - 7, 14, 14))
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            file_id = index.data(FileListModel.IdRole)
+            if self._buttonRect(option.rect).contains(event.pos()):
+                self.removeClicked.emit(file_id)
+            else:
+                self.itemClicked.emit(file_id)
+        return super().editorEvent(event, model, option, index)
 
 
 class FileListSettingCard(ExpandSettingCard):
-    filesChanged = pyqtSignal(list)
+    filesChanged = pyqtSignal()
     fileClicked = pyqtSignal(int)
 
     def __init__(self, configItem: ConfigItem, title: str, content: str = None, directory="./", parent=None):
@@ -50,6 +197,10 @@ class FileListSettingCard(ExpandSettingCard):
         self.addButton = PushButton(self.tr('打开'), self)
         self.addButton.setMaximumWidth(80)
         self.addButton.setMinimumWidth(80)
+        self.folderButton = TransparentToolButton(FluentIcon.FOLDER_ADD, self)
+        self.folderButton.setToolTip(self.tr('添加文件夹'))
+        self._content = content
+        self._walkers = []
         self.card.iconLabel.setFixedSize(20, 20)
         self.card.hBoxLayout.insertSpacing(0, 5)
 
@@ -57,76 +208,138 @@ class FileListSettingCard(ExpandSettingCard):
         self.setMaximumSize(QtCore.QSize(400, 5400))
         self.setFrameShape(QtWidgets.QFrame.NoFrame)
 
-        self.files = []
-        self.file_items = []
+        # 只为可见行绘制，不再为每个文件创建一个控件
+        self.model = FileListModel(self)
+        self.listView = ListView(self.view)
+        self.delegate = FileItemDelegate(self.listView)
+        self.listView.setItemDelegate(self.delegate)
+        self.listView.setModel(self.model)
+        self.listView.setUniformItemSizes(True)
+        # 分批布局，几万行时插入后也不会一次性阻塞事件循环
+        self.listView.setLayoutMode(QListView.Batched)
+        self.listView.setBatchSize(500)
+        self.listView.setSelectionMode(QListView.NoSelection)
+        self.listView.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+
+        # 同一轮事件循环里的多次增删只发一次 filesChanged，接收方需要时再读 entries()
+        self._changedTimer = QTimer(self)
+        self._changedTimer.setSingleShot(True)
+        self._changedTimer.setInterval(0)
+        self._changedTimer.timeout.connect(self.filesChanged)
 
         self.__initWidget()
 
     def __initWidget(self):
         self.card.expandButton.hide()
+        self.addWidget(self.folderButton)
         self.addWidget(self.addButton)
 
         self.viewLayout.setSpacing(1)
         self.viewLayout.setAlignment(Qt.AlignTop)
         self.viewLayout.setContentsMargins(0, 0, 0, 0)
+        self.viewLayout.addWidget(self.listView)
 
         self.addButton.clicked.connect(self.__showFileDialog)
+        self.folderButton.clicked.connect(self.__onFolderButtonClicked)
+        self.delegate.itemClicked.connect(lambda file_id: self.fileClicked.emit(file_id - 1))
+        # 删除放到下一轮事件循环，避免在视图处理本次点击时改动行
+        self.delegate.removeClicked.connect(self.removeFile, Qt.QueuedConnection)
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self.listView.setFixedHeight(max(0, self.height() - self.card.height()))
+
+    @property
+    def files(self):
+        """ 兼容旧接口：files[i] 对应 fileClicked 的 i，已删除的位置为空字符串 """
+        return self.model.files()
+
+    def path(self, index):
+        return self.model.path(index + 1)
+
+    def setLinked(self, index, source=None):
+        """ 标记为近似重复，索引与 fileClicked 一致 """
+        self.model.setLink(index + 1, None if source is None else source + 1)
+
+    def entries(self):
+        """ [(索引, 路径)]，索引与 fileClicked 一致 """
+        return [(file_id - 1, path) for file_id, path in self.model.entries()]
 
     def __showFileDialog(self):
         files, _ = QFileDialog.getOpenFileNames(
             self,
             self.tr("选择多个文件"),
             self._dialogDirectory,
-            self.tr("Image files (*.png *.jpg)")
+            self.tr("Media files ({})".format(" ".join("*" + s for s in MEDIA_SUFFIXES)))
         )
 
         if not files:
             return
 
-        for path in files:
-            self.updateFile(path)
-
-    def __addFileItem(self, path: str):
-        idx = len(self.file_items)
-        item = FileItem(path, self.view)
-        item.removed.connect(lambda itm=item: self.__removeFile(itm))
-        
-        item.clicked.connect(lambda i=idx: self.fileClicked.emit(i))
-        self.file_items.append(item)
-        self.files.append(path)
-        self.viewLayout.addWidget(item)
-        
-        item.show()
-        self.filesChanged.emit(self.files)
-
-    def __removeFile(self, item):
-        if item not in self.file_items:
+        self.addFiles(files)
+
+    def __onFolderButtonClicked(self):
+        if self._walkers:
+            self.cancelScan()
             return
-        idx = self.file_items.index(item)
 
-        self.files[idx] = ''
-        self.file_items[idx] = None
-        self.viewLayout.removeWidget(item)
+        folder = QFileDialog.getExistingDirectory(self, self.tr("选择文件夹"), self._dialogDirectory)
+        if folder:
+            self.addFolders([folder])
 
-        item.deleteLater()
-        self.filesChanged.emit(self.files)
+    def addFolders(self, folders):
+        """ 在后台线程递归扫描文件夹，找到的文件分块加入列表 """
+        walker = FolderWalker(folders, MEDIA_SUFFIXES, self)
+        walker.filesFound.connect(self.__onFilesFound)
+        walker.countChanged.connect(lambda _: self.__updateScanStatus())
+        walker.finished.connect(lambda: self.__onScanFinished(walker))
+        self._walkers.append(walker)
+        self.folderButton.setIcon(FluentIcon.CLOSE)
+        self.folderButton.setToolTip(self.tr('停止扫描'))
+        self.__updateScanStatus()
+        walker.start()
 
-    def clear_files(self):
-        for itm in list(self.file_items):
-            if itm:
-                try:
-                    self.viewLayout.removeWidget(itm)
-                    itm.deleteLater()
-                except Exception:
-                    pass
-        self.file_items = []
-        self.files = []
-        self.filesChanged.emit(self.files)
+    def cancelScan(self):
+        for walker in self._walkers:
+            walker.cancel()
 
-    def updateFile(self, path: str):
-        ext = Path(path).suffix.lower()
-        if ext not in ['.png', '.jpg']:
+    def __onFilesFound(self, paths):
+        # 扫描得到的已经是绝对路径并按后缀过滤过，不再逐个 resolve；filesChanged 等扫描结束后再发
+        if self.sender() in self._walkers:
+            self.model.addPaths(paths)
+
+    def __updateScanStatus(self):
+        if not self._walkers:
             return
+        found = sum(walker.count for walker in self._walkers)
+        self.card.setContent(self.tr(f"正在扫描… 已找到 {found} 个文件，列表共 {self.model.rowCount()} 个"))
+
+    def __onScanFinished(self, walker):
+        if walker in self._walkers:
+            self._walkers.remove(walker)
+        walker.deleteLater()
+        self._changedTimer.start()
+        if not self._walkers:
+            self.folderButton.setIcon(FluentIcon.FOLDER_ADD)
+            self.folderButton.setToolTip(self.tr('添加文件夹'))
+            self.card.setContent(self._content)
+
+    def removeFile(self, file_id):
+        if self.model.removeId(file_id):
+            self._changedTimer.start()
 
-        full_path = str(Path(path).resolve())
-        self.__addFileItem(full_path)
+    def clear_files(self):
+        self.cancelScan()
+        self._walkers.clear()
+        self.model.clear()
+        self._changedTimer.start()
+
+    def addFiles(self, paths):
+        """ 整批插入，只通知一次 """
+        accepted = [str(Path(p).resolve()) for p in paths if Path(p).suffix.lower() in MEDIA_SUFFIXES]
+        if accepted:
+            self.model.addPaths(accepted)
+            self._changedTimer.start()
+
+    def updateFile(self, path: str):
+        self.addFiles([path])
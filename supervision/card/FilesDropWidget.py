@@ -1,16 +1,19 @@
+import os
 from pathlib import Path
 
 from PyQt5.QtCore import Qt, pyqtSignal, QRectF
-from PyQt5.QtGui import QPainter, QPainterPath, QColor, QPen, QFont, QFontDatabase
+from PyQt5.QtGui import QPainter, QPainterPath, QColor, QPen
 from PyQt5.QtWidgets import QWidget, QLabel
 
 from qfluentwidgets import TeachingTip, TeachingTipTailPosition, InfoBarIcon, isDarkTheme
 
-from supervision.utils import resource_path
+from supervision.utils import app_font
 
 
 class FilesDropWidget(QWidget):
     pathChanged = pyqtSignal(str)
+    pathsDropped = pyqtSignal(list)
+    foldersDropped = pyqtSignal(list)
 
     def __init__(self, file_types, parent=None):
         super().__init__(parent)
@@ -21,13 +24,7 @@ class FilesDropWidget(QWidget):
         self.setFixedSize(360, 120)
         self.setObjectName("FilesDropWidget")
 
-        self.font_id = QFontDatabase.addApplicationFont(resource_path(r".\src\Lolita.ttf"))
-        if self.font_id != -1:
-            self.font_family = QFontDatabase.applicationFontFamilies(self.font_id)[0]
-            self.font_18 = QFont(self.font_family)
-            self.font_18.setPixelSize(18)
-        else:
-            print("Failed to load font")
+        self.font_18 = app_font(18)
 
         self.text_label = QLabel(self)
         self.text_label.setText("拖  放  文  件\n到  此  区  域")
@@ -79,14 +76,26 @@ class FilesDropWidget(QWidget):
 
     def dropEvent(self, event):
         if event.mimeData().hasUrls():
+            paths, folders = [], []
             for url in event.mimeData().urls():
                 path = url.toLocalFile()
+                if os.path.isdir(path):
+                    folders.append(path)
+                    continue
                 file_suffix = Path(path).suffix.lower()
 
                 if file_suffix not in self.file_types:
                     self._show_error_tip("无效文件类型", f"{file_suffix} 不是支持的文件类型")
                     continue
                 self.pathChanged.emit(path)
+                paths.append(path)
+
+            # 整批交给列表，一次插入、一次通知
+            if paths:
+                self.pathsDropped.emit(paths)
+            # 文件夹交给后台线程递归扫描
+            if folders:
+                self.foldersDropped.emit(folders)
 
             event.accept()
             self._hover = False
@@ -99,11 +108,16 @@ class FilesDropWidget(QWidget):
 
     def bindFileListSettingCard(self, card):
         self.target_card = card
-        self.pathChanged.connect(self.__update_file_list)
+        self.pathsDropped.connect(self.__update_file_list)
+        self.foldersDropped.connect(self.__scan_folders)
+
+    def __update_file_list(self, paths):
+        if self.target_card:
+            self.target_card.addFiles(paths)
 
-    def __update_file_list(self, path):
+    def __scan_folders(self, folders):
         if self.target_card:
-            self.target_card.updateFile(path)
+            self.target_card.addFolders(folders)
 
     def _show_error_tip(self, title, content):
         TeachingTip.create(
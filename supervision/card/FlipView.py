@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from functools import singledispatchmethod
 from typing import Union, List
 
@@ -8,6 +9,10 @@ from PyQt5.QtWidgets import QListWidgetItem, QListWidget
 from qfluentwidgets import FluentIcon, FluentStyleSheet, FlipImageDelegate, SmoothScrollBar
 from qfluentwidgets.components.widgets.flip_view import ScrollButton
 
+from supervision.fenwick import Fenwick
+
+SLOT_ROLE = Qt.UserRole + 2
+
 
 class FlipView(QListWidget):
     currentIndexChanged = pyqtSignal(int)
@@ -30,6 +35,21 @@ class FlipView(QListWidget):
         self._aspectRatioMode = Qt.AspectRatioMode.IgnoreAspectRatio
         self._itemSize = QSize(480, 270)  # 16:9
 
+        # 窗口化驻留：当前项前后 _window 个 + 最近用过的 _cacheSize 个保留解码后的图片
+        # 以 image_id 为键（QListWidgetItem 不可哈希，Python 包装对象也不稳定）
+        self._loader = None
+        self._window = 2
+        self._cacheSize = 16
+        self._resident = OrderedDict()
+        self._requested = set()
+
+        # 每一项占一个只增不减的槽位：image_id -> 槽位 的哈希索引，
+        # 加上 存活数 / 尺寸 两棵树状数组，查行号和滚动偏移都是 O(log n)；删除的槽位过多时整体压缩
+        self._slots = {}
+        self._alive = Fenwick()
+        self._extent = Fenwick()
+        self._dead = 0
+
         self.delegate = FlipImageDelegate(self)
         self.scrollBar = SmoothScrollBar(self.orientation, self)
 
@@ -60,6 +80,63 @@ class FlipView(QListWidget):
         self.preButton.clicked.connect(self.scrollPrevious)
         self.nextButton.clicked.connect(self.scrollNext)
 
+    def setImageLoader(self, loader, window=2, cacheSize=16):
+        """
+        loader(image_id) 负责异步取回图片并调用 setItemImage；设置后超出窗口和 LRU 的图片会被释放。
+        使用前每一项都需要有唯一的 image_id。
+        """
+        self._loader = loader
+        self._window = window
+        self._cacheSize = cacheSize
+        self._updateResidency()
+
+    def _updateResidency(self):
+        if self._loader is None or self.count() == 0:
+            return
+
+        current = max(0, self.currentIndex())
+        window = set()
+        for i in range(max(0, current - self._window), min(self.count(), current + self._window + 1)):
+            item = self.item(i)
+            key = item.data(Qt.UserRole + 1)
+            window.add(key)
+            image = item.data(Qt.UserRole)
+            if isinstance(image, QImage) and not image.isNull():
+                if key in self._resident:
+                    self._resident.move_to_end(key)
+            elif key not in self._requested:
+                self._requested.add(key)
+                self._loader(key)
+
+        self._trimResident(window)
+
+    def _windowKeys(self):
+        current = max(0, self.currentIndex())
+        lo, hi = max(0, current - self._window), min(self.count(), current + self._window + 1)
+        return {self.item(i).data(Qt.UserRole + 1) for i in range(lo, hi)}
+
+    def inResidencyWindow(self, image_id):
+        """ image_id 是否在当前项前后 _window 个之内，没有设置 loader 时都算在内 """
+        return self._loader is None or image_id in self._windowKeys()
+
+    def releaseImage(self, image_id):
+        """ 丢弃 image_id 已解码的图片和未完成的请求，下次进入驻留窗口时由 loader 重新取回 """
+        item = self._resident.pop(image_id, None)
+        if item is not None:
+            item.setData(Qt.UserRole, QImage())
+        self._requested.discard(image_id)
+
+    def _trimResident(self, window):
+        excess = len(self._resident) - len(window) - self._cacheSize
+        for key in list(self._resident):
+            if excess <= 0:
+                break
+            if key in window:
+                continue
+            item = self._resident.pop(key)
+            excess -= 1
+            item.setData(Qt.UserRole, QImage())
+
     def isHorizontal(self):
         return self.orientation == Qt.Horizontal
 
@@ -113,14 +190,11 @@ class FlipView(QListWidget):
 
         self._currentIndex = index
 
-        if self.isHorizontal():
-            value = sum(self.item(i).sizeHint().width() for i in range(index))
-        else:
-            value = sum(self.item(i).sizeHint().height() for i in range(index))
-
+        value = self._extent.prefix(self.item(index).data(SLOT_ROLE))
         value += (2 * index + 1) * self.spacing()
         self.scrollBar.setValue(value)
         self._updateScrollButtons()
+        self._updateResidency()
 
     def currentIndex(self):
         return self._currentIndex
@@ -141,6 +215,10 @@ class FlipView(QListWidget):
         N = self.count()
         self.addItems([''] * len(images))
 
+        for i in range(N, self.count()):
+            self._alive.append(1)
+            self.item(i).setData(SLOT_ROLE, self._extent.append(0))
+
         for i in range(N, self.count()):
             img = images[i - N]
             iid = image_ids[i - N] if image_ids else None
@@ -161,15 +239,31 @@ class FlipView(QListWidget):
         else:
             qimage = image
 
+        slot = item.data(SLOT_ROLE)
+        old_id = item.data(Qt.UserRole + 1)
+        if old_id != image_id and self._slots.get(old_id) == slot:
+            del self._slots[old_id]
+        if image_id is not None:
+            self._slots[image_id] = slot
+
         item.setData(Qt.UserRole, qimage)
         item.setData(Qt.UserRole + 1, image_id)
 
         self._adjustItemSize(item)
 
+        if self._loader is not None:
+            self._requested.discard(image_id)
+            self._resident[image_id] = item
+            self._resident.move_to_end(image_id)
+            self._trimResident(self._windowKeys())
+
     def _adjustItemSize(self, item: QListWidgetItem):
         image = self.itemImage(self.row(item))
 
         if self.aspectRatioMode == Qt.AspectRatioMode.KeepAspectRatio:
+            if image.isNull():
+                # 已释放的图片保持原有尺寸，重新加载后再调整
+                return
             if self.isHorizontal():
                 h = self.itemSize.height()
                 w = int(image.width() * h / image.height())
@@ -180,6 +274,7 @@ class FlipView(QListWidget):
             w, h = self.itemSize.width(), self.itemSize.height()
 
         item.setSizeHint(QSize(w, h))
+        self._extent.set(item.data(SLOT_ROLE), w if self.isHorizontal() else h)
 
     def itemImage(self, index: int) -> QImage:
         if not 0 <= index < self.count():
@@ -189,11 +284,10 @@ class FlipView(QListWidget):
         return data if isinstance(data, QImage) else QImage()
 
     def indexOfImageId(self, image_id) -> int:
-        for i in range(self.count()):
-            item = self.item(i)
-            if item.data(Qt.UserRole + 1) == image_id:
-                return i
-        return -1
+        slot = self._slots.get(image_id)
+        if slot is None:
+            return -1
+        return self._alive.prefix(slot)
 
     def resizeEvent(self, e):
         w, h = self.width(), self.height()
@@ -256,15 +350,26 @@ class FlipView(QListWidget):
     aspectRatioMode = pyqtProperty(bool, getAspectRatioMode, setAspectRatioMode)
 
     def removeImageAt(self, index: int):
-        if not 0 <= index < self.count():
+        self.removeImagesAt([index])
+
+    def removeImagesAt(self, indexes):
+        """ 批量删除，当前项和滚动位置只在最后调整一次 """
+        rows = sorted({i for i in indexes if 0 <= i < self.count()}, reverse=True)
+        if not rows:
             return
 
-        self.takeItem(index)
+        # 删掉的是当前项时停在原位置（即后一项），越界时再退回最后一项
+        current = self._currentIndex
+        for index in rows:
+            self._forget(self.takeItem(index))
+            if current > index:
+                current -= 1
 
-        if self._currentIndex >= index:
-            self._currentIndex = max(0, min(self._currentIndex - 1, self.count() - 1))
+        if self._dead > max(1024, len(self._alive) // 2):
+            self._compact()
 
         if self.count() > 0:
+            self._currentIndex = max(0, min(current, self.count() - 1))
             self.scrollToIndex(self._currentIndex)
         else:
             self._currentIndex = -1
@@ -272,6 +377,33 @@ class FlipView(QListWidget):
         self._updateScrollButtons()
         self.currentIndexChanged.emit(self._currentIndex)
 
+    def _forget(self, item: QListWidgetItem):
+        slot = item.data(SLOT_ROLE)
+        key = item.data(Qt.UserRole + 1)
+        if self._slots.get(key) == slot:
+            del self._slots[key]
+        self._alive.set(slot, 0)
+        self._extent.set(slot, 0)
+        self._dead += 1
+        self._resident.pop(key, None)
+        self._requested.discard(key)
+
+    def _compact(self):
+        """ 按当前行号重新分配槽位，O(n)，删除过半时才触发 """
+        extents = []
+        self._slots = {}
+        for i in range(self.count()):
+            item = self.item(i)
+            item.setData(SLOT_ROLE, i)
+            key = item.data(Qt.UserRole + 1)
+            if key is not None:
+                self._slots[key] = i
+            size = item.sizeHint()
+            extents.append(size.width() if self.isHorizontal() else size.height())
+        self._alive = Fenwick([1] * self.count())
+        self._extent = Fenwick(extents)
+        self._dead = 0
+
     def _updateScrollButtons(self):
         index = self.currentIndex()
         if index <= 0:
@@ -0,0 +1,35 @@
+from PyQt5.QtCore import Qt, pyqtSignal
+
+from qfluentwidgets import SettingCard, LineEdit, qconfig
+
+
+class LineEditSettingCard(SettingCard):
+    """ 单行文本设置卡片，编辑完成后写回配置项 """
+    textChanged = pyqtSignal(str)
+
+    def __init__(self, configItem, icon, title, content=None, placeholder="", parent=None):
+        super().__init__(icon, title, content, parent)
+        self.configItem = configItem
+
+        self.lineEdit = LineEdit(self)
+        self.lineEdit.setFixedWidth(200)
+        self.lineEdit.setClearButtonEnabled(True)
+        self.lineEdit.setPlaceholderText(placeholder)
+        self.lineEdit.setText(qconfig.get(configItem))
+
+        self.hBoxLayout.addWidget(self.lineEdit, 0, Qt.AlignRight)
+        self.hBoxLayout.addSpacing(16)
+
+        self.lineEdit.editingFinished.connect(self._onEditingFinished)
+        configItem.valueChanged.connect(self.setValue)
+
+    def _onEditingFinished(self):
+        text = self.lineEdit.text().strip()
+        if text == qconfig.get(self.configItem):
+            return
+        qconfig.set(self.configItem, text)
+        self.textChanged.emit(text)
+
+    def setValue(self, value):
+        if self.lineEdit.text() != value:
+            self.lineEdit.setText(value)
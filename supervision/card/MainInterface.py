@@ -1,41 +1,41 @@
-import os
 import time
-import zipfile
 import threading
 from pathlib import Path
 
-from PyQt5.QtCore import Qt, QSize, pyqtSignal
-from PyQt5.QtGui import QFont, QFontDatabase
-from PyQt5.QtWidgets import QGridLayout, QWidget, QVBoxLayout, QFileDialog
+from PyQt5.QtCore import Qt, QSize, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QGridLayout, QWidget, QVBoxLayout, QHBoxLayout, QFileDialog
 
 from qfluentwidgets import (
     ConfigItem, SimpleCardWidget, TeachingTip, TeachingTipTailPosition,
-    FluentIcon, InfoBar, InfoBarPosition, PushButton, ToolButton
+    FluentIcon, InfoBar, InfoBarPosition, PushButton, ToolButton, ProgressBar, CaptionLabel
 )
 
 from supervision.card.FileListSettingCard import FileListSettingCard
 from supervision.card.FilesDropWidget import FilesDropWidget
-from supervision.tool import process_files_threaded, clear_processed_cache
+from supervision.tool import (
+    iter_process_files, clear_processed_cache, rerender_results, stored_records, is_processed, linked_index,
+    prioritize, cancel_processing, stale_indices
+)
+from YoloByETO.labels import label_writer
+from supervision.export import ExportWorker, archive_format
+from supervision.dedup import image_size
 from supervision.card.PixmapShow import DIDshow
-from supervision.utils import resource_path
+from supervision.utils import app_font, display_path, MEDIA_SUFFIXES
 from supervision.card.Setting import cfg
 
 
 class MainInterface(QWidget):
-    processingFinished = pyqtSignal(list)
+    resultReady = pyqtSignal(int, str)
+    progressChanged = pyqtSignal(int, int)
+    processingFinished = pyqtSignal(int)
+    rerenderFinished = pyqtSignal(list)
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("MainInterface")
         self.resize(720, 560)
 
-        self.font_id = QFontDatabase.addApplicationFont(resource_path(r".\src\Lolita.ttf"))
-        if self.font_id != -1:
-            self.font_family = QFontDatabase.applicationFontFamilies(self.font_id)[0]
-            self.font_20 = QFont(self.font_family)
-            self.font_20.setPixelSize(20)
-        else:
-            print("Failed to load font")
+        self.font_20 = app_font(20)
 
         main_layout = QGridLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
@@ -53,7 +53,7 @@ class MainInterface(QWidget):
         main_layout.setColumnStretch(3, 0)
         main_layout.setColumnStretch(4, 1)
 
-        self.FilesDropWidget = FilesDropWidget(file_types=[".png", ".jpg"])
+        self.FilesDropWidget = FilesDropWidget(file_types=MEDIA_SUFFIXES)
         self.FilesDropWidget.setFixedSize(360, 120)
         self.FilesDropWidget.setObjectName("FilesDropWidget")
         main_layout.addWidget(self.FilesDropWidget, 3, 1, 1, 1, alignment=Qt.AlignCenter)
@@ -61,7 +61,7 @@ class MainInterface(QWidget):
         self.FileListSettingCardWidget = FileListSettingCard(
             ConfigItem("ModelFiles", "Path", ""),
             title="选择图片文件",
-            content="添加图片文件（*.png, *.jpg）",
+            content="添加图片或视频（*.png, *.jpg, *.mp4, *.avi, *.mkv）",
             directory="./"
         )
         self.FileListSettingCardWidget.setFixedSize(360, 420)
@@ -71,9 +71,6 @@ class MainInterface(QWidget):
         self.FilesDropWidget.bindFileListSettingCard(self.FileListSettingCardWidget)
         self.FileListSettingCardWidget.fileClicked.connect(self.on_file_clicked)
 
-        self._prev_files = []
-        self.FileListSettingCardWidget.filesChanged.connect(self.on_files_changed)
-
         self.rightCard1 = SimpleCardWidget()
         self.rightCard1.setFixedSize(360, 420)
         self.rightCard1.setObjectName("rightCard1")
@@ -119,68 +116,212 @@ class MainInterface(QWidget):
         card_layout2.addWidget(self.btn_start, 1, 2, alignment=Qt.AlignCenter)
         card_layout2.addWidget(self.btn_save, 1, 3, alignment=Qt.AlignCenter)
 
+        self.progressBar = ProgressBar(self)
+        self.progressBar.setFixedWidth(150)
+        self.progressLabel = CaptionLabel("", self)
+        self.progressLabel.setFixedWidth(170)
+        progress_layout = QHBoxLayout()
+        progress_layout.setSpacing(12)
+        progress_layout.addWidget(self.progressBar, alignment=Qt.AlignVCenter)
+        progress_layout.addWidget(self.progressLabel, alignment=Qt.AlignVCenter)
+        card_layout2.addLayout(progress_layout, 2, 1, 1, 3)
+        self.progressBar.hide()
+
         self.rightCard2.setLayout(card_layout2)
         main_layout.addWidget(self.rightCard2, 3, 3, 1, 1, alignment=Qt.AlignCenter)
 
         self.setLayout(main_layout)
 
+        self.resultReady.connect(self._on_result_ready)
+        self.progressChanged.connect(self._on_progress_changed)
         self.processingFinished.connect(self._on_processing_finished)
 
+        # 结果由后台逐个送达，先排队，再由定时器每次取一小批加入预览，避免事件循环被一次性卡住
+        self._pending_results = []
+        self._started_at = 0.0
+        self._processing = False
+        self._cancelled = False
+        self._export_worker = None
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(50)
+        self._flush_timer.timeout.connect(self._flush_results)
+        self.rerenderFinished.connect(self._on_rerender_finished)
+
+        # 标注样式/阈值/类别过滤连续变化时合并成一次重绘
+        self._rerender_busy = False
+        self._rerender_timer = QTimer(self)
+        self._rerender_timer.setSingleShot(True)
+        self._rerender_timer.setInterval(300)
+        self._rerender_timer.timeout.connect(self.rerender)
+        for item in (cfg.annotateStyle, cfg.confCutoff, cfg.classFilter):
+            item.valueChanged.connect(lambda _: self._rerender_timer.start())
+
+        # 切换模型后只把已处理、结果因此失效的文件重新排队
+        self._requeue_timer = QTimer(self)
+        self._requeue_timer.setSingleShot(True)
+        self._requeue_timer.setInterval(300)
+        self._requeue_timer.timeout.connect(self.requeue_processed)
+        cfg.modelChoice.valueChanged.connect(lambda _: self._requeue_timer.start())
+        # 开始监视模型目录，开始标注和重新排队前据此判断当前模型是否还在
+        cfg.model_index()
+
     def on_file_clicked(self, idx: int):
         self.didshow.go_to_by_id(idx + 1)
-        path = self.FileListSettingCardWidget.files[idx]
+        path = self.FileListSettingCardWidget.path(idx)
         print(f"Clicked index {idx}: {Path(path).name}")
-
-    def on_files_changed(self, new_files):
-        self._prev_files = new_files.copy()
+        # 批次进行中点到还没出结果的文件时，让它插队到最前面
+        if self._processing and not is_processed(idx + 1):
+            prioritize(idx + 1)
 
     def btn_start_clicked(self):
+        if self._processing:
+            self._cancelled = True
+            self.btn_start.setEnabled(False)
+            self.btn_start.setText("   停 止 中 ...")
+            threading.Thread(target=cancel_processing, daemon=True).start()
+            return
+
         indices = []
         files_payload = []
-        files = self.FileListSettingCardWidget.files
 
-        for i, p in enumerate(files):
-            if p:
-                indices.append(i + 1)
-                files_payload.append(p)
+        for i, p in self.FileListSettingCardWidget.entries():
+            indices.append(i + 1)
+            files_payload.append(p)
 
         if not indices:
             TeachingTip.create(target=self.btn_start, parent=self, title="提示", content="没有可处理的图片")
             return
 
-        self.btn_start.setEnabled(False)
+        if cfg.model_missing():
+            TeachingTip.create(target=self.btn_start, parent=self, title="提示", content="当前模型不在模型目录中，请先在设置中选择模型")
+            return
+
+        self.start_processing(indices, files_payload)
+
+    def requeue_processed(self):
+        """ 只重新提交结果因模型/参数变化而失效的已处理文件 """
+        if self._processing:
+            self._requeue_timer.start()
+            return
+        # 模型文件不在时取不到哈希，所有结果都会被当作失效；等重新选择模型后再排队
+        if cfg.model_missing():
+            return
+        stale = set(stale_indices())
+        pairs = [(i + 1, p) for i, p in self.FileListSettingCardWidget.entries() if i + 1 in stale]
+        if pairs:
+            self.start_processing([i for i, _ in pairs], [p for _, p in pairs])
+
+    def start_processing(self, indices, files_payload):
+        """ 增量处理：新增、改动过或模型/参数已变化的文件才会真正推理；处理中开始按钮变为停止按钮 """
+        self._processing = True
+        self._cancelled = False
         self.btn_clear.setEnabled(False)
         self.btn_save.setEnabled(False)
-        self.btn_start.setText("   处 理 中 ...")
+        self.btn_start.setIcon(FluentIcon.PAUSE)
+        self.btn_start.setText("   停 止 标 注")
+        self._started_at = time.perf_counter()
+        self.progressBar.setValue(0)
+        self.progressLabel.setText("")
+        self.progressBar.show()
+        self._flush_timer.start()
 
         def worker():
+            count = 0
             try:
-                result = process_files_threaded(indices, files_payload, max_workers=4, model=None, extra_args=None)
+                for ind, outp in iter_process_files(
+                    indices, files_payload, model=None, extra_args=None, on_progress=self.progressChanged.emit
+                ):
+                    self.resultReady.emit(ind, outp)
+                    count += 1
             except Exception as e:
-                result = []
-                print("process_files_threaded error:", e)
-            self.processingFinished.emit(result)
+                print("iter_process_files error:", e)
+            self.processingFinished.emit(count)
 
         threading.Thread(target=worker, daemon=True).start()
 
-    def _on_processing_finished(self, results):
-        for ind, outp in results:
-            try:
-                self.didshow.addImage(ind, outp)
-            except Exception as e:
-                print(f"Failed to add image {ind}: {e}")
-
-        if results:
+    def _on_result_ready(self, ind, outp):
+        self._pending_results.append((ind, outp))
+
+    def _flush_results(self, limit=64):
+        batch, self._pending_results = self._pending_results[:limit], self._pending_results[limit:]
+        added = []
+        for ind, outp in batch:
+            source = linked_index(ind)
+            self.FileListSettingCardWidget.setLinked(ind - 1, None if source is None else source - 1)
+            if ind in self.didshow.images:
+                self.didshow.replaceImage(ind, outp)
+            else:
+                added.append((ind, outp))
+        try:
+            self.didshow.addImages(added)
+        except Exception as e:
+            print(f"Failed to add images: {e}")
+
+    def _on_progress_changed(self, done, total):
+        self.progressBar.setRange(0, max(1, total))
+        self.progressBar.setValue(done)
+        elapsed = time.perf_counter() - self._started_at
+        if not done or elapsed <= 0:
+            self.progressLabel.setText(f"{done}/{total}")
+            return
+        rate = done / elapsed
+        eta = int((total - done) / rate)
+        self.progressLabel.setText(f"{done}/{total}  {rate:.1f} 张/秒  剩余 {eta // 60:02d}:{eta % 60:02d}")
+
+    def _on_processing_finished(self, count):
+        while self._pending_results:
+            self._flush_results(len(self._pending_results))
+        self._flush_timer.stop()
+        self.progressBar.hide()
+        self.progressLabel.setText("")
+
+        if self._cancelled:
+            TeachingTip.create(target=self.btn_start, parent=self, title="已停止", content=f"本次完成 {count} 个文件", duration=2000)
+        elif count:
             self.createSuccessInfoBar()
+        else:
+            TeachingTip.create(target=self.btn_start, parent=self, title="提示", content="没有新增或改动过的文件", duration=2000)
 
+        self._processing = False
         self.btn_start.setEnabled(True)
         self.btn_clear.setEnabled(True)
         self.btn_save.setEnabled(True)
+        self.btn_start.setIcon(FluentIcon.BRUSH)
         self.btn_start.setText("   开 始 标 注")
 
+    def rerender(self):
+        """ 只用检测库中的结果重绘，不重新推理 """
+        if self._processing or self._rerender_busy:
+            self._rerender_timer.start()
+            return
+        if not self.didshow.hasRealImages():
+            return
+
+        self._rerender_busy = True
+
+        def worker():
+            try:
+                result = rerender_results()
+            except Exception as e:
+                result = []
+                print("rerender_results error:", e)
+            self.rerenderFinished.emit(result)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_rerender_finished(self, results):
+        self._rerender_busy = False
+        for ind, outp in results:
+            if self.didshow.images.get(ind) == outp:
+                continue
+            try:
+                self.didshow.replaceImage(ind, outp)
+            except Exception as e:
+                print(f"Failed to replace image {ind}: {e}")
+
     def _on_didshow_right_click(self, image_path):
         TeachingTip.create(
-            target=self, parent=self, duration=-1, isClosable=True, image=image_path,
+            target=self, parent=self, duration=-1, isClosable=True, image=display_path(image_path),
             title=f"{Path(image_path).name}",
             content=f"标注使用模型：{cfg.get(cfg.modelChoice)}",
             tailPosition=TeachingTipTailPosition.BOTTOM,
@@ -203,13 +344,15 @@ class MainInterface(QWidget):
         TeachingTip.create(target=self.btn_clear, parent=self, title="数据清空", content="索引已重置", duration=2000)
 
     def btn_save_clicked(self):
+        if self._export_worker is not None:
+            self.btn_save.setEnabled(False)
+            self._export_worker.cancel()
+            return
+
         pairs = []
         missing = []
-        files = self.FileListSettingCardWidget.files
 
-        for i, src in enumerate(files):
-            if not src:
-                continue
+        for i, src in self.FileListSettingCardWidget.entries():
             ind = i + 1
             res = self.didshow.images.get(ind)
             if not res:
@@ -236,38 +379,53 @@ class MainInterface(QWidget):
             return
 
         f_name = f"output_{str(time.ctime()).replace(' ', '_').replace(':', '_')}.zip"
-        path, _ = QFileDialog.getSaveFileName(self, "保存为 ZIP 文件", str(Path.cwd() / f_name), "Zip Files (*.zip)")
+        path, selected = QFileDialog.getSaveFileName(
+            self, "保存压缩包", str(Path.cwd() / f_name),
+            "Zip Files (*.zip);;Tar Files (*.tar);;Zstandard Tar Files (*.tar.zst)"
+        )
 
         if not path:
             return
-        if not path.lower().endswith(".zip"):
-            path += ".zip"
-
-        try:
-            with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as z:
-                for ind, src, res in pairs:
-
-                    try:
-                        arc_src = os.path.join("src", Path(src).name)
-                        z.write(src, arcname=arc_src)
-                    except Exception as e:
-                        print(f"add src failed for {src}: {e}")
-
-                    try:
-                        arc_res = os.path.join("res", Path(res).name)
-                        z.write(res, arcname=arc_res)
-                    except Exception as e:
-                        print(f"add res failed for {res}: {e}")
-
-        except Exception as e:
-            TeachingTip.create(
-                target=self.btn_save, parent=self, title="打包失败",
-                content=f"保存 ZIP 失败：{e}",
-                tailPosition=TeachingTipTailPosition.BOTTOM,
-                duration=3000
-            )
-            return
+        if archive_format(path) is None:
+            path += ".tar.zst" if ".tar.zst" in selected else ".tar" if ".tar" in selected else ".zip"
+
+        # 递归添加的文件夹里常有同名文件，压缩包内统一用 <主干名>_<索引>，原图、结果和标注同名
+        members = []
+        names = {}
+        for ind, src, res in pairs:
+            stem = f"{Path(src).stem}_{ind}"
+            names[ind] = stem + Path(src).suffix
+            members.append((f"src/{names[ind]}", src))
+            members.append((f"res/{stem}{Path(res).suffix}", res))
+
+        fmt = cfg.get(cfg.exportFormat)
+        labels = (lambda opener: self._write_labels(opener, fmt, names)) if fmt != "none" else None
+        self.start_export(path, members, labels)
+
+    def start_export(self, path, members, labels=None):
+        """ 在后台线程打包；打包中保存按钮变为停止按钮 """
+        self._export_worker = ExportWorker(path, members, labels, self)
+        self._export_worker.exportProgress.connect(self._on_export_progress)
+        self._export_worker.exportFinished.connect(self._on_export_finished)
+        self._export_worker.exportError.connect(self._on_export_error)
+        self._export_worker.exportCancelled.connect(self._on_export_cancelled)
+        self._export_worker.finished.connect(self._on_export_done)
 
+        self.btn_start.setEnabled(False)
+        self.btn_clear.setEnabled(False)
+        self.btn_save.setIcon(FluentIcon.CLOSE)
+        self.btn_save.setToolTip("停止打包")
+        self.progressBar.setValue(0)
+        self.progressLabel.setText("")
+        self.progressBar.show()
+        self._export_worker.start()
+
+    def _on_export_progress(self, done, total):
+        self.progressBar.setRange(0, max(1, total))
+        self.progressBar.setValue(done)
+        self.progressLabel.setText(f"打包 {done}/{total}")
+
+    def _on_export_finished(self, path):
         TeachingTip.create(
             target=self.btn_save, parent=self, title="已保存",
             content=f"已保存至：{path}",
@@ -275,6 +433,43 @@ class MainInterface(QWidget):
             duration=3000
         )
 
+    def _on_export_error(self, message):
+        TeachingTip.create(
+            target=self.btn_save, parent=self, title="打包失败",
+            content=f"保存压缩包失败：{message}",
+            tailPosition=TeachingTipTailPosition.BOTTOM,
+            duration=3000
+        )
+
+    def _on_export_cancelled(self):
+        TeachingTip.create(target=self.btn_save, parent=self, title="已停止", content="打包已取消", duration=2000)
+
+    def _on_export_done(self):
+        self._export_worker.deleteLater()
+        self._export_worker = None
+        self.progressBar.hide()
+        self.progressLabel.setText("")
+        self.btn_save.setEnabled(True)
+        self.btn_save.setIcon(FluentIcon.SAVE)
+        self.btn_save.setToolTip("")
+        self.btn_start.setEnabled(True)
+        self.btn_clear.setEnabled(True)
+
+    @staticmethod
+    def _write_labels(opener, fmt, names):
+        """ 逐张从检测库取出结果写入压缩包的 labels/ 下，names 为 {索引: 压缩包内文件名}，COCO 文档同样流式写出 """
+        writer = label_writer(fmt, opener)
+        try:
+            for ind, src, record in stored_records(list(names)):
+                if record is None:
+                    continue
+                # 检测框是在按 EXIF 方向转正后的图上得到的，归一化也要用转正后的宽高
+                size = image_size(src)
+                if size is not None:
+                    writer.add(names[ind], size[0], size[1], record)
+        finally:
+            writer.close()
+
     def createSuccessInfoBar(self):
         InfoBar.success(
             title='Success',
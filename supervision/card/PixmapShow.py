@@ -1,11 +1,12 @@
-from PyQt5.QtCore import Qt, QSize, pyqtSignal
-from PyQt5.QtGui import QPainter, QPixmap, QContextMenuEvent
+from PyQt5.QtCore import Qt, QSize, QTimer, pyqtSignal
+from PyQt5.QtGui import QPainter, QPixmap, QImage, QContextMenuEvent
 from PyQt5.QtWidgets import QWidget, QGridLayout
 
 from qfluentwidgets import HorizontalPipsPager
 
 from supervision.card.FlipView import HorizontalFlipView
-from supervision.utils import resource_path
+from supervision.thumbnails import ThumbnailLoader
+from supervision.utils import resource_pixmap
 
 
 class DIDshow(QWidget):
@@ -24,9 +25,15 @@ class DIDshow(QWidget):
         self.pager._visibleNumber = 3
 
         self.images = {}
+        self._pagerDirty = False
 
         self.placeholder_pixmap = self._create_placeholder()
 
+        # 缩略图在后台线程解码并缓存到磁盘，这里只接收现成的 QImage
+        self.thumbnails = ThumbnailLoader(width, height, parent=self)
+        self.thumbnails.thumbnailReady.connect(self.setImage)
+        self.flipView.setImageLoader(self._loadImage)
+
         self._addPlaceholder()
 
         self.pager.setPageNumber(self.flipView.count())
@@ -64,7 +71,7 @@ class DIDshow(QWidget):
         # """)
 
     def _create_placeholder(self) -> QPixmap:
-        src = QPixmap(resource_path(r"./src/None.png"))
+        src = resource_pixmap(r"./src/None.png")
 
         canvas = QPixmap(self.width, self.height)
         canvas.fill(Qt.transparent)
@@ -88,7 +95,7 @@ class DIDshow(QWidget):
     def _addPlaceholder(self):
         self.flipView.addImages([self.placeholder_pixmap], image_ids=[self.PLACEHOLDER_ID])
         self.images[self.PLACEHOLDER_ID] = "placeholder"
-        self.pager.setPageNumber(self.flipView.count())
+        self._schedulePagerUpdate()
 
     def _removePlaceholder(self):
         if self.PLACEHOLDER_ID not in self.images:
@@ -98,78 +105,104 @@ class DIDshow(QWidget):
         if index != -1:
             self.flipView.removeImageAt(index)
             del self.images[self.PLACEHOLDER_ID]
-            self.pager.setPageNumber(self.flipView.count())
+            self._schedulePagerUpdate()
 
-    def addImage(self, ind, image_path):
-        if ind == self.PLACEHOLDER_ID:
+    def _schedulePagerUpdate(self):
+        """ 同一轮事件循环内的多次增删只更新一次页码指示器 """
+        if self._pagerDirty:
             return
+        self._pagerDirty = True
+        QTimer.singleShot(0, self._syncPager)
+
+    def _syncPager(self):
+        """ 只增删差额部分的圆点，不像 setPageNumber 那样整体重建 """
+        self._pagerDirty = False
+        pager, n = self.pager, self.flipView.count()
+        pager.blockSignals(True)
+        for i in range(pager.count() - 1, n - 1, -1):
+            pager.takeItem(i)
+        start = pager.count()
+        if n > start:
+            pager.addItems(['15555'] * (n - start))
+            for i in range(start, n):
+                item = pager.item(i)
+                item.setData(Qt.UserRole, i + 1)
+                item.setSizeHint(pager.gridSize())
+        pager.setCurrentIndex(self.flipView.currentIndex())
+        pager.blockSignals(False)
 
-        if ind in self.images:
-            self.deleteImage(ind)
-
-        if self.flipView.count() == 1 and self.PLACEHOLDER_ID in self.images:
-            self._removePlaceholder()
-
-        pixmap = QPixmap(image_path)
-        canvas = QPixmap(self.width, self.height)
-        canvas.fill(Qt.transparent)
-        scaled = pixmap.scaled(canvas.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-
-        x = (canvas.width() - scaled.width()) // 2
-        y = (canvas.height() - scaled.height()) // 2
+    def addImage(self, ind, image_path):
+        self.addImages([(ind, image_path)])
+
+    def addImages(self, pairs):
+        """
+        批量加入 [(ind, 路径)]：一次插入列表、一次更新页码。新项先不带图片，
+        只有落在 FlipView 驻留窗口内的由 _loadImage 请求缩略图，其余翻到时再取
+        """
+        pairs = {ind: path for ind, path in pairs if ind != self.PLACEHOLDER_ID}
+        if not pairs:
+            return
 
-        painter = QPainter(canvas)
-        painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
-        painter.drawPixmap(x, y, scaled)
-        painter.end()
+        self.deleteImages([ind for ind in pairs if ind in self.images])
+        self._removePlaceholder()
 
-        self.images[ind] = image_path
-        self.flipView.addImages([canvas], image_ids=[ind])
-        self.pager.setPageNumber(self.flipView.count())
+        self.images.update(pairs)
+        self.flipView.addImages([QImage()] * len(pairs), image_ids=list(pairs))
+        self._schedulePagerUpdate()
         self.flipView.setCurrentIndex(self.flipView.count() - 1)
+        # 当前项没变时 setCurrentIndex 不会刷新驻留窗口
+        self.flipView.scrollToIndex(self.flipView.currentIndex())
 
-    def deleteImage(self, ind):
-        if ind not in self.images or ind == self.PLACEHOLDER_ID:
+    def replaceImage(self, ind, image_path):
+        """ 原位替换已有结果（如重绘后），不改变顺序和当前页 """
+        if self.flipView.indexOfImageId(ind) == -1:
+            self.addImage(ind, image_path)
             return
+        self.images[ind] = image_path
+        if self.flipView.inResidencyWindow(ind):
+            self.thumbnails.request(ind, image_path)
+        else:
+            # 窗口外的旧图直接丢弃，翻到时再按新路径取
+            self.flipView.releaseImage(ind)
 
+    def _loadImage(self, ind):
+        """ FlipView 释放过的图片滚动回窗口内时重新取回，缩略图通常直接命中磁盘缓存 """
+        if ind == self.PLACEHOLDER_ID:
+            index = self.flipView.indexOfImageId(ind)
+            self.flipView.setItemImage(index, self.placeholder_pixmap, image_id=ind)
+        elif ind in self.images:
+            self.thumbnails.request(ind, self.images[ind])
+
+    def setImage(self, ind, image_path, image):
+        """ 缩略图回到 GUI 线程；结果已被替换或删除时丢弃 """
+        if self.images.get(ind) != image_path or image.isNull():
+            return
         index = self.flipView.indexOfImageId(ind)
         if index == -1:
-            del self.images[ind]
             return
+        self.flipView.setItemImage(index, image, image_id=ind)
+        self.flipView.viewport().update()
 
-        current_display = self.flipView.currentIndex()
-
-        current_count = self.flipView.count()
-
-        if index == current_display:
-            next_index = -1
-            if current_count > 1:
-                next_index = index if index < current_count - 1 else index - 1
-
-            self.flipView.removeImageAt(index)
-            del self.images[ind]
-            self.pager.setPageNumber(self.flipView.count())
+    def deleteImage(self, ind):
+        self.deleteImages([ind])
 
-            if self.flipView.count() == 0:
-                self._addPlaceholder()
-            else:
-                if next_index >= 0:
-                    self.pager.setCurrentIndex(next_index)
-        else:
-            self.flipView.removeImageAt(index)
+    def deleteImages(self, inds):
+        """ 批量删除；删掉当前项时停在后一项（已是最后一项则前一项） """
+        rows = []
+        for ind in inds:
+            if ind == self.PLACEHOLDER_ID or ind not in self.images:
+                continue
+            index = self.flipView.indexOfImageId(ind)
             del self.images[ind]
-            self.pager.setPageNumber(self.flipView.count())
+            if index != -1:
+                rows.append(index)
 
-            if index < current_display:
-                adjusted = max(0, current_display - 1)
-            else:
-                adjusted = current_display
-
-            if self.flipView.count() == 0:
-                self._addPlaceholder()
-            else:
-                adjusted = max(0, min(adjusted, self.flipView.count() - 1))
-                self.pager.setCurrentIndex(adjusted)
+        if not rows:
+            return
+        self.flipView.removeImagesAt(rows)
+        if self.flipView.count() == 0:
+            self._addPlaceholder()
+        self._schedulePagerUpdate()
 
     def hasRealImages(self):
         return self.flipView.count() > 0 and self.PLACEHOLDER_ID not in self.images
@@ -199,19 +232,6 @@ class DIDshow(QWidget):
         return super().eventFilter(obj, event)
 
     def clear_all(self):
-        for ind in list(self.images.keys()):
-            if ind == self.PLACEHOLDER_ID:
-                continue
-                
-            try:
-                self.deleteImage(ind)
-            except Exception:
-                try:
-                    del self.images[ind]
-                except Exception:
-                    pass
-
-        if self.FLACEHOLDER_ID if False else False:
-            pass
+        self.deleteImages([ind for ind in self.images if ind != self.PLACEHOLDER_ID])
         if self.PLACEHOLDER_ID not in self.images:
             self._addPlaceholder()
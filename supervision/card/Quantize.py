@@ -0,0 +1,47 @@
+import subprocess
+from pathlib import Path
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from supervision.worker import YOLO_EXE
+
+
+class QuantizeWorker(QThread):
+    quantizeFinished = pyqtSignal(str)
+    quantizeError = pyqtSignal(str)
+
+    CALIB_LIMIT = 64
+
+    def __init__(self, modelPath, mode, calibFiles, parent=None):
+        super().__init__(parent)
+        self.modelPath = Path(modelPath)
+        self.mode = mode
+        self.calibFiles = self._sample(calibFiles)
+
+    def _sample(self, files):
+        """ 从列表中均匀抽取校准图片，避免校准集过大 """
+        if len(files) <= self.CALIB_LIMIT:
+            return list(files)
+        step = len(files) / self.CALIB_LIMIT
+        return [files[int(i * step)] for i in range(self.CALIB_LIMIT)]
+
+    def run(self):
+        output = self.modelPath.with_name(self.modelPath.stem + "_int8.onnx")
+        cmd = [YOLO_EXE, "--quantize", self.mode, "-m", str(self.modelPath), "-o", str(output)]
+
+        listFile = Path("./cache/calib.txt")
+        if self.calibFiles:
+            listFile.parent.mkdir(parents=True, exist_ok=True)
+            listFile.write_text("\n".join(self.calibFiles), encoding="utf-8")
+            cmd += ["--calib", f"@{listFile}"]
+
+        try:
+            subprocess.run(cmd, check=True)
+        except Exception as e:
+            self.quantizeError.emit(str(e))
+            return
+
+        if not output.exists():
+            self.quantizeError.emit(f"未生成量化模型：{output}")
+            return
+        self.quantizeFinished.emit(output.name)
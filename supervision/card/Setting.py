@@ -1,3 +1,6 @@
+import sys
+import json
+from bisect import bisect_left
 from pathlib import Path
 
 from PyQt5.QtCore import Qt
@@ -5,25 +8,82 @@ from PyQt5.QtWidgets import QWidget, QFileDialog
 
 from qfluentwidgets import (
     SettingCardGroup, PushSettingCard, FluentIcon, ScrollArea, ExpandLayout,
-    qconfig, FolderValidator, QConfig, ConfigItem, OptionsConfigItem, OptionsValidator, ComboBoxSettingCard
+    qconfig, FolderValidator, QConfig, ConfigItem, OptionsConfigItem, OptionsValidator, ComboBoxSettingCard,
+    RangeConfigItem, RangeValidator, RangeSettingCard, BoolValidator, SwitchSettingCard, InfoBar, InfoBarPosition
 )
 
 from supervision.card.ExpandComboCard import ExpandComboCard
+from supervision.card.LineEditSettingCard import LineEditSettingCard
+from supervision.scheduler import POLICIES
+from supervision.worker import BACKENDS
+from supervision.models import ModelIndex, scan_models
 from supervision.utils import resource_path
 
 
+def list_models(model_dir):
+    """ 模型目录下的 .pt 权重以及量化/导出得到的 .onnx 模型 """
+    return sorted(scan_models(model_dir))
+
+
+def _quantize_report(model_dir, name):
+    report = (Path(model_dir) / name).with_suffix(".json")
+    if not name.endswith(".onnx") or not report.exists():
+        return None
+    try:
+        with open(report, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def model_text(model_dir, name, info=None):
+    """ 下拉框文字：附带已缓存的类别数、参数量，量化模型再附带实测加速比和检测一致率 """
+    parts = []
+    if info:
+        if info.get("names") is not None:
+            parts.append(f"{len(info['names'])} 类")
+        if info.get("params"):
+            parts.append(f"{info['params'] / 1e6:.1f}M 参数")
+    report = _quantize_report(model_dir, name)
+    if report and report.get("speedup") is not None and report.get("agreement") is not None:
+        parts.append(f"{report['speedup']}x，一致 {report['agreement']:.0%}")
+    return f"{name}（{'，'.join(parts)}）" if parts else name
+
+
+MODEL_BUDGET_TIP = '常驻进程中已加载模型的内存预算，超出后淘汰最久未用的模型'
+
+
 class Config(QConfig):
     saveFolder = ConfigItem("DirectoryGroup", "save", "./output", FolderValidator())
     modelFolder = ConfigItem("DirectoryGroup", "model", "./model", FolderValidator())
 
     model_dir = Path("./model")
-    pt_files = [f.name for f in model_dir.glob("*.pt")] if model_dir.exists() else []
+    pt_files = list_models(model_dir)
     default_model = pt_files[0] if pt_files else "NULL"
     modelChoice = OptionsConfigItem(
         "ModelGroup", "choice", default_model,
         OptionsValidator(pt_files if pt_files else ["NULL"])
     )
 
+    backend = OptionsConfigItem("ModelGroup", "backend", "torch", OptionsValidator(BACKENDS))
+    modelBudget = RangeConfigItem("ModelGroup", "budget", 2048, RangeValidator(256, 16384))
+
+    schedulePolicy = OptionsConfigItem("PerformanceGroup", "policy", "throughput", OptionsValidator(POLICIES))
+    pinAffinity = ConfigItem("PerformanceGroup", "affinity", False, BoolValidator())
+    dedupEnabled = ConfigItem("PerformanceGroup", "dedup", False, BoolValidator())
+    dedupDistance = RangeConfigItem("PerformanceGroup", "dedupDistance", 5, RangeValidator(0, 16))
+
+    quantizeMode = OptionsConfigItem("ModelGroup", "quantize", "dynamic", OptionsValidator(["dynamic", "static"]))
+
+    annotateStyle = OptionsConfigItem(
+        "AnnotateGroup", "style", "box", OptionsValidator(["box", "round_box", "corner", "box_label"])
+    )
+    confCutoff = RangeConfigItem("AnnotateGroup", "conf", 0, RangeValidator(0, 100))
+    classFilter = ConfigItem("AnnotateGroup", "classes", "")
+    exportFormat = OptionsConfigItem(
+        "AnnotateGroup", "export", "none", OptionsValidator(["none", "yolo", "coco", "jsonl"])
+    )
+
     models_db = {
         "YOLO11n": "https://github.com/ultralytics/assets/releases/download/v8.3.0/yolo11n.pt",
         "YOLO11s": "https://github.com/ultralytics/assets/releases/download/v8.3.0/yolo11s.pt",
@@ -46,18 +106,39 @@ class Config(QConfig):
         OptionsValidator(list(ultralytics_models.keys()))
     )
 
-    def refresh_local_models(self):
-        model_dir = Path(self.modelFolder.value) if hasattr(self.modelFolder, "value") else Path("./model")
-        pt_files = [p.name for p in model_dir.glob("*.pt")] if model_dir.exists() else []
-        self.modelChoice.validator.options = pt_files if pt_files else ["NULL"]
-        self.set(self.modelChoice, pt_files[0]) if pt_files else self.set(self.modelChoice, "NULL")
-        self.refresh_ultralytics_models()
-
-    def refresh_ultralytics_models(self):
-        model_dir = Path(self.modelFolder.value) if hasattr(self.modelFolder, "value") else Path("./model")
-        pt_files = [p.name.lower() for p in model_dir.glob("*.pt")] if model_dir.exists() else []
-        filtered = {k: v for k, v in self.models_db.items() if (k.lower() + ".pt") not in pt_files}
-        self.ultralytics_models = filtered
+    def set_local_models(self, names):
+        """
+        由 ModelIndex 报告的模型列表更新可选项。当前选择的模型被移除或改名时保留原值，
+        由设置页提示重新选择：改值会触发 valueChanged，让已处理的文件全部用别的模型重跑
+        """
+        names = sorted(names)
+        self.modelChoice.validator.options = names if names else ["NULL"]
+        if self.modelChoice.value == "NULL" and names:
+            self.set(self.modelChoice, names[0])
+        self.refresh_ultralytics_models(names)
+
+    _modelIndex = None
+
+    def model_index(self):
+        """ 设置页和管理页共用的 ModelIndex，第一次用到时创建并开始列出模型目录 """
+        if self._modelIndex is None:
+            self._modelIndex = ModelIndex(self.modelFolder.value, parent=self)
+            self._modelIndex.rescan()
+        return self._modelIndex
+
+    def model_missing(self):
+        """ 当前选择的模型不在 ModelIndex 列出的模型目录中；还没列出过时直接查看文件 """
+        model = self.modelChoice.value
+        if model == "NULL":
+            return True
+        index = self.model_index()
+        if index.scanned:
+            return model not in index.models
+        return not (Path(self.modelFolder.value) / model).is_file()
+
+    def refresh_ultralytics_models(self, names):
+        local = {name.lower() for name in names}
+        self.ultralytics_models = {k: v for k, v in self.models_db.items() if (k.lower() + ".pt") not in local}
 
 
 cfg = Config()
@@ -77,6 +158,8 @@ class Setting(ScrollArea):
 
         self.modelGroup = SettingCardGroup(self.tr('Model management'), self.scrollWidget)
         self.directoryGroup = SettingCardGroup(self.tr('Directory management'), self.scrollWidget)
+        self.performanceGroup = SettingCardGroup(self.tr('Performance'), self.scrollWidget)
+        self.annotateGroup = SettingCardGroup(self.tr('Annotation'), self.scrollWidget)
 
         self.modelFolderCard = PushSettingCard(
             self.tr('更改'),
@@ -102,6 +185,9 @@ class Setting(ScrollArea):
         self.saveFolderCard.button.setMinimumWidth(84)
         self.saveFolderCard.button.setStyleSheet("padding: 5px 0px;")
 
+        # 先用启动时的列表建卡片，之后由 ModelIndex 增量更新选项和元数据
+        self.modelIndex = cfg.model_index()
+        self._missingModel = None
         self.modelChoiceCard = ComboBoxSettingCard(
             cfg.modelChoice,
             FluentIcon.IOT,
@@ -111,6 +197,28 @@ class Setting(ScrollArea):
             parent=self.modelGroup
         )
 
+        self.quantizeModeCard = ComboBoxSettingCard(
+            cfg.quantizeMode,
+            FluentIcon.SPEED_MEDIUM,
+            self.tr("量化方式"),
+            self.tr('静态量化使用管理页列表中的图片做校准'),
+            texts=["动态量化", "静态量化"],
+            parent=self.modelGroup
+        )
+
+        self.quantizeCard = PushSettingCard(
+            self.tr('量化'),
+            FluentIcon.ALBUM,
+            self.tr("INT8 量化"),
+            self.tr('把当前选择的 .pt 模型量化为 INT8 ONNX 模型'),
+            parent=self.modelGroup
+        )
+        self.quantizeCard.button.setMaximumWidth(84)
+        self.quantizeCard.button.setMinimumWidth(84)
+        self.quantizeCard.button.setStyleSheet("padding: 5px 0px;")
+        self.quantizeWorker = None
+        self.calibrationSource = lambda: []
+
         self.modelDownloadCard = ExpandComboCard(
             cfg.modelDownload,
             FluentIcon.DOWNLOAD,
@@ -120,6 +228,93 @@ class Setting(ScrollArea):
             parent=self.modelGroup
         )
 
+        self.backendCard = ComboBoxSettingCard(
+            cfg.backend,
+            FluentIcon.CALORIES,
+            self.tr("推理后端"),
+            self.tr('ONNX Runtime / OpenVINO 首次使用时自动导出并缓存，CPU 推理更快'),
+            texts=["PyTorch", "ONNX Runtime", "OpenVINO"],
+            parent=self.modelGroup
+        )
+
+        self.modelBudgetCard = RangeSettingCard(
+            cfg.modelBudget,
+            FluentIcon.SPEED_HIGH,
+            self.tr("模型缓存上限（MB）"),
+            self.tr(MODEL_BUDGET_TIP),
+            parent=self.modelGroup
+        )
+
+        self.schedulePolicyCard = ComboBoxSettingCard(
+            cfg.schedulePolicy,
+            FluentIcon.DEVELOPER_TOOLS,
+            self.tr("调度策略"),
+            self.tr('吞吐优先：多进程少线程；延迟优先：少进程多线程'),
+            texts=["吞吐优先", "延迟优先"],
+            parent=self.performanceGroup
+        )
+
+        self.pinAffinityCard = SwitchSettingCard(
+            FluentIcon.PIN,
+            self.tr("绑定 CPU 核心"),
+            self.tr('将每个标注进程固定到各自分到的核心上'),
+            configItem=cfg.pinAffinity,
+            parent=self.performanceGroup
+        )
+        self.cnSwitchButton(self.pinAffinityCard.switchButton)
+
+        self.dedupEnabledCard = SwitchSettingCard(
+            FluentIcon.COPY,
+            self.tr("跳过近似重复"),
+            self.tr('连拍、重复导出的图片只推理一张，其余沿用它的检测结果'),
+            configItem=cfg.dedupEnabled,
+            parent=self.performanceGroup
+        )
+        self.cnSwitchButton(self.dedupEnabledCard.switchButton)
+
+        self.dedupDistanceCard = RangeSettingCard(
+            cfg.dedupDistance,
+            FluentIcon.ALIGNMENT,
+            self.tr("重复判定距离"),
+            self.tr('64 位感知哈希的汉明距离不超过该值视为近似重复，0 只合并几乎相同的图片'),
+            parent=self.performanceGroup
+        )
+
+        self.annotateStyleCard = ComboBoxSettingCard(
+            cfg.annotateStyle,
+            FluentIcon.PALETTE,
+            self.tr("标注样式"),
+            self.tr('修改后直接用已保存的检测结果重绘，不重新推理'),
+            texts=["方框", "圆角框", "角标框", "方框 + 标签"],
+            parent=self.annotateGroup
+        )
+
+        self.confCutoffCard = RangeSettingCard(
+            cfg.confCutoff,
+            FluentIcon.FILTER,
+            self.tr("置信度下限（%）"),
+            self.tr('只显示置信度不低于该值的检测框'),
+            parent=self.annotateGroup
+        )
+
+        self.classFilterCard = LineEditSettingCard(
+            cfg.classFilter,
+            FluentIcon.TAG,
+            self.tr("类别过滤"),
+            self.tr('只显示这些类别，多个类别用逗号分隔，留空显示全部'),
+            placeholder="person, car",
+            parent=self.annotateGroup
+        )
+
+        self.exportFormatCard = ComboBoxSettingCard(
+            cfg.exportFormat,
+            FluentIcon.DOCUMENT,
+            self.tr("导出标注格式"),
+            self.tr('保存 ZIP 时额外写入标注文件，便于直接导入标注平台'),
+            texts=["不导出", "YOLO txt", "COCO JSON", "JSON lines"],
+            parent=self.annotateGroup
+        )
+
         self.modelDownloadCard.optionSelected.connect(self.download_model)
 
         self.__initWidget()
@@ -137,14 +332,28 @@ class Setting(ScrollArea):
         self.__connectSignalToSlot()
 
     def __initLayout(self):
+        self.annotateGroup.addSettingCard(self.annotateStyleCard)
+        self.annotateGroup.addSettingCard(self.confCutoffCard)
+        self.annotateGroup.addSettingCard(self.classFilterCard)
+        self.annotateGroup.addSettingCard(self.exportFormatCard)
+        self.performanceGroup.addSettingCard(self.schedulePolicyCard)
+        self.performanceGroup.addSettingCard(self.pinAffinityCard)
+        self.performanceGroup.addSettingCard(self.dedupEnabledCard)
+        self.performanceGroup.addSettingCard(self.dedupDistanceCard)
         self.directoryGroup.addSettingCard(self.modelFolderCard)
         self.directoryGroup.addSettingCard(self.saveFolderCard)
         self.modelGroup.addSettingCard(self.modelChoiceCard)
         self.modelGroup.addSettingCard(self.modelDownloadCard)
+        self.modelGroup.addSettingCard(self.quantizeModeCard)
+        self.modelGroup.addSettingCard(self.quantizeCard)
+        self.modelGroup.addSettingCard(self.backendCard)
+        self.modelGroup.addSettingCard(self.modelBudgetCard)
 
         self.expandLayout.setSpacing(30)
         self.expandLayout.setContentsMargins(30, 15, 30, 15)
         self.expandLayout.addWidget(self.modelGroup)
+        self.expandLayout.addWidget(self.annotateGroup)
+        self.expandLayout.addWidget(self.performanceGroup)
         self.expandLayout.addWidget(self.directoryGroup)
 
     def __setQss(self):
@@ -169,6 +378,7 @@ class Setting(ScrollArea):
         cfg.set(cfg.modelFolder, folder)
         self.modelFolderCard.setContent(folder)
         qconfig.save()
+        self.modelIndex.setFolder(folder)
 
     def cnSwitchButton(self, switch):
         switch.setOnText("开启")
@@ -186,25 +396,111 @@ class Setting(ScrollArea):
     def __connectSignalToSlot(self):
         self.saveFolderCard.clicked.connect(self.__onSaveFolderCardClicked)
         self.modelFolderCard.clicked.connect(self.__onModelFolderCardClicked)
+        self.quantizeCard.clicked.connect(self.quantize_model)
+        self.modelIndex.modelsAdded.connect(self.__onModelsAdded)
+        self.modelIndex.modelsRemoved.connect(self.__onModelsRemoved)
+        self.modelIndex.modelsUpdated.connect(self.__onModelsUpdated)
+        self.__reconcileModels()
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        self.__updateModelStats()
+
+    def __updateModelStats(self):
+        """ 常驻进程已启动时，在缓存上限卡片中显示模型缓存的命中/未命中/淘汰计数，便于调整预算 """
+        # 还没有处理过文件时 tool 未导入，也不会有进程池
+        tool = sys.modules.get("supervision.tool")
+        stats = tool.model_stats() if tool is not None else {}
+        if not stats.get("workers"):
+            self.modelBudgetCard.setContent(self.tr(MODEL_BUDGET_TIP))
+            return
+        self.modelBudgetCard.setContent(
+            f"命中 {stats['hits']}，未命中 {stats['misses']}，淘汰 {stats['evictions']}；"
+            f"{stats['workers']} 个进程共缓存 {stats['models']} 个模型，{stats['bytes'] / 1024 / 1024:.0f} MB"
+        )
+
+    def __modelText(self, name):
+        return model_text(self.modelIndex.folder, name, self.modelIndex.info(name))
+
+    def __setModelItem(self, name):
+        """ 已有的选项只改文字，新选项按文件名顺序插入 """
+        combo = self.modelChoiceCard.comboBox
+        text = self.__modelText(name)
+        self.modelChoiceCard.optionToText[name] = text
+        index = combo.findData(name)
+        if index >= 0:
+            combo.setItemText(index, text)
+            return
+        options = [combo.itemData(i) for i in range(combo.count()) if combo.itemData(i) != "NULL"]
+        combo.insertItem(bisect_left(options, name), text, userData=name)
 
-    def refreshCards(self):
-        """ 刷新两个卡片的选项 """
-        new_texts = list(cfg.modelChoice.validator.options)
-        self.modelChoiceCard.comboBox.clear()
-        for text in new_texts:
-            self.modelChoiceCard.comboBox.addItem(text)
-
-        current = cfg.modelChoice.value
-        if current in new_texts:
-            self.modelChoiceCard.comboBox.setCurrentText(current)
-        else:
-            if new_texts:
-                cfg.set(cfg.modelChoice, new_texts[0])
-
-        new_download_texts = list(cfg.ultralytics_models.keys())
-        self.modelDownloadCard.setOptions(new_download_texts)
-        if self.modelDownloadCard.dropMenu:
-            self.modelDownloadCard._closeMenu()
+    def __reconcileModels(self):
+        """ 管理页先打开时共用的索引已经列出过目录，补上启动时的列表与当前目录的差异 """
+        if not self.modelIndex.scanned:
+            return
+        combo = self.modelChoiceCard.comboBox
+        shown = [combo.itemData(i) for i in range(combo.count()) if combo.itemData(i) != "NULL"]
+        removed = [name for name in shown if name not in self.modelIndex.models]
+        added = [name for name in self.modelIndex.names if name not in shown]
+        if removed:
+            self.__onModelsRemoved(removed)
+        if added:
+            self.__onModelsAdded(added)
+        self.__onModelsUpdated(self.modelIndex.names)
+        self.__syncModelChoice()
+
+    def __onModelsAdded(self, names):
+        combo = self.modelChoiceCard.comboBox
+        combo.blockSignals(True)
+        for name in names:
+            self.__setModelItem(name)
+        combo.removeItem(combo.findData("NULL"))
+        combo.blockSignals(False)
+        self.__syncModelChoice()
+
+    def __onModelsRemoved(self, names):
+        combo = self.modelChoiceCard.comboBox
+        combo.blockSignals(True)
+        for name in names:
+            combo.removeItem(combo.findData(name))
+            self.modelChoiceCard.optionToText.pop(name, None)
+        if combo.count() == 0:
+            combo.addItem("NULL", userData="NULL")
+            self.modelChoiceCard.optionToText["NULL"] = "NULL"
+        combo.blockSignals(False)
+        self.__syncModelChoice()
+
+    def __onModelsUpdated(self, names):
+        combo = self.modelChoiceCard.comboBox
+        combo.blockSignals(True)
+        for name in names:
+            self.__setModelItem(name)
+        combo.blockSignals(False)
+
+    def __syncModelChoice(self):
+        """ 选项变化后同步配置中的当前模型和下载列表 """
+        cfg.set_local_models(self.modelIndex.names)
+        combo = self.modelChoiceCard.comboBox
+        missing = cfg.modelChoice.value if cfg.modelChoice.value != "NULL" and cfg.model_missing() else None
+        index = combo.findData(cfg.modelChoice.value) if not missing else -1
+        if index != combo.currentIndex():
+            combo.blockSignals(True)
+            combo.setPlaceholderText("请选择模型")
+            combo.setCurrentIndex(index)
+            combo.blockSignals(False)
+
+        if missing and missing != self._missingModel:
+            InfoBar.warning(
+                title="模型已移除", content=f"{missing} 已不在模型目录中，请重新选择模型",
+                parent=self, duration=5000, position=InfoBarPosition.TOP
+            )
+        self._missingModel = missing
+
+        downloads = list(cfg.ultralytics_models.keys())
+        if downloads != self.modelDownloadCard.original_texts:
+            self.modelDownloadCard.setOptions(downloads)
+            if self.modelDownloadCard.dropMenu:
+                self.modelDownloadCard._closeMenu()
 
     def download_model(self, model_name):
         url = cfg.models_db[model_name]
@@ -214,5 +510,52 @@ class Setting(ScrollArea):
         from supervision.card.Download import show_download_dialog
         show_download_dialog(self, url, size, name)
 
-        cfg.refresh_local_models()
-        self.refreshCards()
+        self.modelIndex.rescan()
+
+    def quantize_model(self):
+        model = cfg.get(cfg.modelChoice)
+        if not model.endswith(".pt"):
+            InfoBar.warning(
+                title="无法量化", content="请先在模型选择中选中一个 .pt 模型",
+                parent=self, duration=3000, position=InfoBarPosition.TOP
+            )
+            return
+        if self.quantizeWorker and self.quantizeWorker.isRunning():
+            return
+
+        mode = cfg.get(cfg.quantizeMode)
+        calib = [f for f in self.calibrationSource() if f]
+        if mode == "static" and not calib:
+            InfoBar.warning(
+                title="缺少校准图片", content="静态量化需要先在管理页添加图片",
+                parent=self, duration=3000, position=InfoBarPosition.TOP
+            )
+            return
+
+        from supervision.card.Quantize import QuantizeWorker
+        self.quantizeWorker = QuantizeWorker(Path(cfg.get(cfg.modelFolder)) / model, mode, calib, self)
+        self.quantizeWorker.quantizeFinished.connect(self._on_quantize_finished)
+        self.quantizeWorker.quantizeError.connect(self._on_quantize_error)
+        self.quantizeCard.button.setEnabled(False)
+        self.quantizeCard.button.setText(self.tr('量化中'))
+        self.quantizeWorker.start()
+
+    def _on_quantize_finished(self, name):
+        self.quantizeCard.button.setEnabled(True)
+        self.quantizeCard.button.setText(self.tr('量化'))
+        # 量化报告在模型文件之后写入，目录监视可能已经先报告了新模型，这里补上报告中的数据
+        if name in self.modelIndex.models:
+            self.__onModelsUpdated([name])
+        self.modelIndex.rescan()
+        InfoBar.success(
+            title="量化完成", content=model_text(cfg.modelFolder.value, name),
+            parent=self, duration=5000, position=InfoBarPosition.TOP
+        )
+
+    def _on_quantize_error(self, message):
+        self.quantizeCard.button.setEnabled(True)
+        self.quantizeCard.button.setText(self.tr('量化'))
+        InfoBar.error(
+            title="量化失败", content=message,
+            parent=self, duration=5000, position=InfoBarPosition.TOP
+        )
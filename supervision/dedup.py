@@ -0,0 +1,155 @@
+import json
+import threading
+from pathlib import Path
+
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QImage, QImageReader, QImageIOHandler
+
+from supervision.cache import atomic_write_text
+
+
+def dhash(path, size=8):
+    """
+    差值哈希：先按约 64 像素缩小解码（JPEG 走 DCT 缩放），再平滑缩成 (size+1)×size 的灰度图，
+    每行相邻像素比较得到 size×size 位整数。只用 QImage，可在非 GUI 线程调用；解码失败返回 None。
+    """
+    reader = QImageReader(str(path))
+    reader.setAutoTransform(True)
+    full = reader.size()
+    if full.isValid() and full.width() > 64 and full.height() > 64:
+        reader.setScaledSize(full.scaled(QSize(64, 64), Qt.KeepAspectRatioByExpanding))
+    image = reader.read()
+    if image.isNull():
+        return None
+    image = image.scaled(size + 1, size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    image = image.convertToFormat(QImage.Format_Grayscale8)
+
+    value = 0
+    for y in range(size):
+        row = bytes(image.constScanLine(y).asarray(size + 1))
+        for x in range(size):
+            value = (value << 1) | (row[x] > row[x + 1])
+    return value
+
+
+def image_size(path):
+    """ 只读文件头得到 (宽, 高)，按 EXIF 方向交换宽高；读不出时返回 None """
+    reader = QImageReader(str(path))
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if not size.isValid():
+        return None
+    if reader.transformation() & QImageIOHandler.TransformationRotate90:
+        return size.height(), size.width()
+    return size.width(), size.height()
+
+
+def scale_record(record, source_size, target_size, tolerance=0.02):
+    """
+    把 source_size 图上的检测框换算到 target_size 图上（缩放后重新导出的近似重复）。
+    两图宽高比相差超过 tolerance 时不是单纯缩放（如裁剪），返回 None。
+    """
+    (sw, sh), (tw, th) = source_size, target_size
+    sx, sy = tw / sw, th / sh
+    if abs(sx - sy) > tolerance * max(sx, sy):
+        return None
+    if (sw, sh) == (tw, th):
+        return record
+    scaled = dict(record)
+    scaled["xyxy"] = [
+        [round(x1 * sx, 2), round(y1 * sy, 2), round(x2 * sx, 2), round(y2 * sy, 2)]
+        for x1, y1, x2, y2 in record.get("xyxy", [])
+    ]
+    return scaled
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """ 按汉明距离组织的 BK 树，半径查询只访问满足三角不等式的子树 """
+
+    def __init__(self):
+        self._root = None
+
+    def add(self, value, item):
+        node = [value, item, {}]
+        if self._root is None:
+            self._root = node
+            return
+        current = self._root
+        while True:
+            distance = hamming(value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def find(self, value, radius):
+        """ 返回距离最近的 (距离, item)，半径内没有时返回 None """
+        best = None
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius and (best is None or distance < best[0]):
+                best = (distance, node[1])
+            for d, child in node[2].items():
+                if distance - radius <= d <= distance + radius:
+                    stack.append(child)
+        return best
+
+
+def group_duplicates(hashes, radius):
+    """
+    hashes 为按提交顺序排列的 [(key, 哈希或 None)]。
+    每项与已有代表比较，半径内的挂到最近的代表下，否则自己成为代表。
+    返回 {代表 key: [重复 key, ...]}，按提交顺序。
+    """
+    tree = BKTree()
+    groups = {}
+    for key, value in hashes:
+        if value is None:
+            groups[key] = []
+            continue
+        match = tree.find(value, radius)
+        if match is None:
+            tree.add(value, key)
+            groups[key] = []
+        else:
+            groups[match[1]].append(key)
+    return groups
+
+
+class HashIndex:
+    """ 按文件内容哈希持久化感知哈希，重启后同一文件不必再解码 """
+
+    def __init__(self, path="./cache/dhash.json"):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, digest, path):
+        with self._lock:
+            if digest in self._entries:
+                return self._entries[digest]
+        value = dhash(path)
+        with self._lock:
+            self._entries[digest] = value
+            self._dirty = True
+        return value
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._entries)
+            self._dirty = False
+        atomic_write_text(self.path, data)
@@ -0,0 +1,246 @@
+import os
+import re
+import json
+import time
+import threading
+from pathlib import Path
+
+import httpx
+
+from supervision.cache import file_digest
+
+
+GITHUB_API = "https://api.github.com"
+_RELEASE_URL = re.compile(r"https://github\.com/([^/]+)/([^/]+)/releases/download/([^/]+)/([^/?#]+)$")
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+def release_digest(url, api=GITHUB_API, client=None, timeout=10.0):
+    """
+    GitHub release 附件的 SHA-256，取自 release 元数据中附件的 digest 字段（"sha256:<hex>"）。
+    不是 release 下载链接、元数据中没有 digest 或请求失败时返回 None
+    """
+    match = _RELEASE_URL.match(url)
+    if not match:
+        return None
+    owner, repo, tag, name = match.groups()
+    own = client is None
+    client = client or httpx.Client(follow_redirects=True, timeout=timeout)
+    try:
+        response = client.get(f"{api}/repos/{owner}/{repo}/releases/tags/{tag}")
+        response.raise_for_status()
+        assets = response.json().get("assets", [])
+    except (httpx.HTTPError, ValueError) as e:
+        print(f"read release metadata failed for {url}: {e}")
+        return None
+    finally:
+        if own:
+            client.close()
+
+    for asset in assets:
+        if asset.get("name") == name:
+            algorithm, _, digest = (asset.get("digest") or "").partition(":")
+            return digest.lower() if algorithm == "sha256" and digest else None
+    return None
+
+
+class RangeDownloader:
+    """
+    多连接分段下载：文件按字节区间分给 N 个连接，写入预分配的 <文件名>.part，
+    各段进度记在 <文件名>.part.json 中，取消或崩溃后再次下载从断点继续。
+    全部完成后校验大小（给出 sha256 时再校验哈希），通过后原子 rename 为目标文件。
+    """
+
+    CHUNK_SIZE = 1 << 16
+    SAVE_INTERVAL = 1.0
+    RETRIES = 3
+
+    def __init__(self, url, path, size=None, sha256=None, connections=4, client=None, timeout=30.0):
+        self.url = url
+        self.path = Path(path)
+        self.part = self.path.with_name(self.path.name + ".part")
+        self.sidecar = self.path.with_name(self.path.name + ".part.json")
+        self.size = size
+        self.sha256 = sha256.lower() if sha256 else None
+        self.connections = max(1, connections)
+        self._owns_client = client is None
+        self.client = client or httpx.Client(follow_redirects=True, timeout=timeout)
+        self._validator = None
+        self._lock = threading.Lock()
+        self._segments = []
+        self._errors = []
+
+    def _probe(self):
+        """ 用 bytes=0-0 的请求同时拿到总大小、服务器是否支持 Range 以及 ETag/Last-Modified """
+        with self.client.stream("GET", self.url, headers={"Range": "bytes=0-0"}) as response:
+            response.raise_for_status()
+            self._validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+            if response.status_code == 206:
+                total = response.headers.get("Content-Range", "").rpartition("/")[2]
+                if total.isdigit():
+                    return int(total), True
+            length = response.headers.get("Content-Length")
+            return (int(length) if length and length.isdigit() else self.size), False
+
+    def _load_progress(self, total):
+        """ 旁车文件与本次的 URL、大小、ETag 一致且 .part 还在时沿用其中的分段进度 """
+        try:
+            with open(self.sidecar, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (state.get("url"), state.get("size"), state.get("validator")) != (self.url, total, self._validator):
+            return None
+        if not self.part.exists() or self.part.stat().st_size != total:
+            return None
+        return [list(segment) for segment in state.get("segments", [])]
+
+    def _save_progress(self, total):
+        with self._lock:
+            segments = [list(s) for s in self._segments]
+        state = {"url": self.url, "size": total, "validator": self._validator, "segments": segments}
+        tmp = self.sidecar.with_name(self.sidecar.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.sidecar)
+
+    def _plan(self, total, ranged):
+        segments = self._load_progress(total) if ranged else None
+        if segments is None:
+            if total:
+                step = -(-total // (self.connections if ranged else 1))
+                segments = [[start, min(start + step, total) - 1, 0] for start in range(0, total, step)]
+            else:
+                segments = [[0, -1, 0]]
+            with open(self.part, "wb") as f:
+                f.truncate(total)
+        return segments
+
+    def downloaded(self):
+        with self._lock:
+            return sum(done for _, _, done in self._segments)
+
+    def _fetch(self, index, ranged, cancelled):
+        """ 下载第 index 段；连接中断后从断点重试，连续 RETRIES 次没有进展才放弃 """
+        failures = 0
+        while True:
+            with self._lock:
+                start, end, done = self._segments[index]
+            if end >= 0 and start + done > end:
+                return
+            headers = {"Range": f"bytes={start + done}-{end}"} if ranged else {}
+            try:
+                with self.client.stream("GET", self.url, headers=headers) as response:
+                    response.raise_for_status()
+                    if ranged and response.status_code != 206:
+                        raise IOError("服务器没有按 Range 返回分段内容")
+                    with open(self.part, "r+b") as f:
+                        f.seek(start + done)
+                        for chunk in response.iter_bytes(self.CHUNK_SIZE):
+                            if cancelled():
+                                raise DownloadCancelled()
+                            f.write(chunk)
+                            with self._lock:
+                                self._segments[index][2] += len(chunk)
+                if end < 0:
+                    return
+                with self._lock:
+                    if start + self._segments[index][2] > end:
+                        return
+                error = IOError(f"第 {index + 1} 段下载不完整")
+            except DownloadCancelled:
+                raise
+            except (httpx.HTTPError, OSError) as e:
+                if not ranged:
+                    raise
+                error = e
+
+            with self._lock:
+                progressed = self._segments[index][2] > done
+            failures = 0 if progressed else failures + 1
+            if failures >= self.RETRIES:
+                raise error
+            print(f"segment {index} retry: {error}")
+            time.sleep(0.5 * failures)
+
+    def _worker(self, index, ranged, cancelled):
+        try:
+            self._fetch(index, ranged, cancelled)
+        except BaseException as e:
+            with self._lock:
+                self._errors.append(e)
+
+    def run(self, on_progress=None, cancelled=lambda: False, interval=0.2):
+        """
+        下载到 path 并返回它；on_progress(已下载, 总大小) 只按 interval 的固定频率调用。
+        取消时保留 .part 和进度并抛出 DownloadCancelled。
+        """
+        try:
+            return self._run(on_progress, cancelled, interval)
+        finally:
+            if self._owns_client:
+                self.client.close()
+
+    def _run(self, on_progress, cancelled, interval):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        total, ranged = self._probe()
+        total = total or 0
+        # 服务器不报告大小时，进度按调用方给出的大小估算
+        expected = total or self.size or 0
+        self._segments = self._plan(total, ranged)
+        self._errors = []
+
+        failed = lambda: bool(self._errors)
+        threads = [
+            threading.Thread(target=self._worker, args=(i, ranged, lambda: cancelled() or failed()), daemon=True)
+            for i in range(len(self._segments))
+        ]
+        for t in threads:
+            t.start()
+
+        last_save = time.perf_counter()
+        while any(t.is_alive() for t in threads):
+            for t in threads:
+                t.join(interval / len(threads))
+            if on_progress is not None:
+                on_progress(self.downloaded(), expected)
+            if ranged and time.perf_counter() - last_save >= self.SAVE_INTERVAL:
+                self._save_progress(total)
+                last_save = time.perf_counter()
+
+        if ranged:
+            self._save_progress(total)
+        if on_progress is not None:
+            on_progress(self.downloaded(), expected)
+
+        errors = [e for e in self._errors if not isinstance(e, DownloadCancelled)]
+        if errors:
+            raise errors[0]
+        if self._errors or cancelled():
+            raise DownloadCancelled()
+        return self._finish(total)
+
+    def _discard(self):
+        for p in (self.part, self.sidecar):
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+    def _finish(self, total):
+        size = self.part.stat().st_size
+        if total and size != total:
+            self._discard()
+            raise IOError(f"文件大小不符：{size} 字节，应为 {total} 字节")
+        if self.sha256 and file_digest(self.part) != self.sha256:
+            self._discard()
+            raise IOError("SHA-256 校验失败，文件已损坏")
+        os.replace(self.part, self.path)
+        try:
+            self.sidecar.unlink()
+        except OSError:
+            pass
+        return self.path
@@ -0,0 +1,190 @@
+import io
+import os
+import time
+import tarfile
+import zipfile
+import tempfile
+from pathlib import Path
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+# 已经压缩过的格式按原样存入 ZIP，再 deflate 只浪费 CPU
+STORED_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".mp4", ".avi", ".mkv", ".zip", ".gz", ".zst"}
+
+ARCHIVE_FORMATS = {"zip": ".zip", "tar": ".tar", "tar.zst": ".tar.zst"}
+
+COPY_BUFFER = 4 << 20
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def archive_format(path):
+    name = str(path).lower()
+    for fmt, suffix in sorted(ARCHIVE_FORMATS.items(), key=lambda item: -len(item[1])):
+        if name.endswith(suffix):
+            return fmt
+    return None
+
+
+class _TarText(io.TextIOWrapper):
+    """ 标注文件先写到临时文件，关闭时作为一个成员加入 tar（tar 需要事先知道成员大小） """
+
+    def __init__(self, tar, arcname):
+        self._tar = tar
+        self._arcname = arcname
+        super().__init__(tempfile.TemporaryFile(), encoding="utf-8")
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        raw = self.buffer
+        info = tarfile.TarInfo(self._arcname)
+        info.size = raw.tell()
+        info.mtime = int(time.time())
+        raw.seek(0)
+        self._tar.addfile(info, raw)
+        super().close()
+
+
+class _ZipSink:
+    def __init__(self, fh):
+        self.zip = zipfile.ZipFile(fh, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+
+    def add(self, arcname, path, cancelled):
+        info = zipfile.ZipInfo.from_file(path, arcname)
+        stored = Path(path).suffix.lower() in STORED_SUFFIXES
+        info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+        # file_size 已知，超过 4 GB 时 zipfile 会自动写 ZIP64 头
+        with open(path, "rb") as src, self.zip.open(info, "w") as dst:
+            _copy(src, dst, cancelled)
+
+    def open_text(self, arcname):
+        return io.TextIOWrapper(self.zip.open(arcname, "w", force_zip64=True), encoding="utf-8")
+
+    def close(self):
+        self.zip.close()
+
+
+class _TarSink:
+    def __init__(self, fh):
+        self.tar = tarfile.open(fileobj=fh, mode="w|", format=tarfile.PAX_FORMAT, bufsize=COPY_BUFFER)
+        self.tar.copybufsize = COPY_BUFFER
+
+    def add(self, arcname, path, cancelled):
+        info = self.tar.gettarinfo(path, arcname)
+        with open(path, "rb") as src:
+            self.tar.addfile(info, _CancellableReader(src, cancelled))
+
+    def open_text(self, arcname):
+        return _TarText(self.tar, arcname)
+
+    def close(self):
+        self.tar.close()
+
+
+class _CancellableReader:
+    def __init__(self, src, cancelled):
+        self.src = src
+        self.cancelled = cancelled
+
+    def read(self, size=-1):
+        if self.cancelled():
+            raise ExportCancelled()
+        return self.src.read(size)
+
+
+def _copy(src, dst, cancelled):
+    while True:
+        if cancelled():
+            raise ExportCancelled()
+        chunk = src.read(COPY_BUFFER)
+        if not chunk:
+            return
+        dst.write(chunk)
+
+
+def _zstd_writer(fh):
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("导出 .tar.zst 需要安装 zstandard")
+    # threads=-1：按 CPU 核心数多线程压缩
+    return zstandard.ZstdCompressor(level=3, threads=-1).stream_writer(fh)
+
+
+def export_archive(path, members, labels=None, on_progress=None, cancelled=lambda: False):
+    """
+    把 [(成员名, 文件路径)] 流式写入 zip / tar / tar.zst。
+    labels(opener) 用 opener(成员名) 打开文本流写标注。先写同目录临时文件，完成后再 rename，
+    取消或失败时不会留下半个压缩包。任一文件读取失败时整个导出失败：tar 成员头已经写出，跳过只会得到损坏的压缩包。
+    """
+    path = Path(path)
+    fmt = archive_format(path)
+    if fmt is None:
+        raise ValueError(f"不支持的压缩包格式：{path.name}")
+
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_", suffix=ARCHIVE_FORMATS[fmt], dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb", buffering=COPY_BUFFER) as fh:
+            stream = _zstd_writer(fh) if fmt == "tar.zst" else fh
+            sink = _ZipSink(stream) if fmt == "zip" else _TarSink(stream)
+            try:
+                for done, (arcname, source) in enumerate(members, 1):
+                    try:
+                        sink.add(arcname, source, cancelled)
+                    except OSError as e:
+                        raise OSError(f"无法读取 {source}：{e}") from e
+                    if on_progress is not None:
+                        on_progress(done, len(members))
+                if labels is not None:
+                    if cancelled():
+                        raise ExportCancelled()
+                    labels(lambda name: sink.open_text(f"labels/{name}"))
+            finally:
+                sink.close()
+                if stream is not fh:
+                    stream.close()
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class ExportWorker(QThread):
+    """
+    后台打包，exportProgress(已完成, 总数)；
+    结束时发出 exportFinished(路径) / exportError(信息)，取消后发出 exportCancelled
+    """
+    exportProgress = pyqtSignal(int, int)
+    exportFinished = pyqtSignal(str)
+    exportError = pyqtSignal(str)
+    exportCancelled = pyqtSignal()
+
+    def __init__(self, path, members, labels=None, parent=None):
+        super().__init__(parent)
+        self.path = str(path)
+        self.members = list(members)
+        self.labels = labels
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            export_archive(
+                self.path, self.members, self.labels, self.exportProgress.emit, lambda: self._cancelled
+            )
+        except ExportCancelled:
+            self.exportCancelled.emit()
+            return
+        except Exception as e:
+            self.exportError.emit(str(e))
+            return
+        self.exportFinished.emit(self.path)
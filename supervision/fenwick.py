@@ -0,0 +1,53 @@
+class Fenwick:
+    """ 支持末尾追加的树状数组：单点修改、前缀和均为 O(log n) """
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.tree = [0] + self.values
+        n = len(self.tree)
+        for i in range(1, n):
+            j = i + (i & -i)
+            if j < n:
+                self.tree[j] += self.tree[i]
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        """ 追加到末尾并返回其下标 """
+        i = len(self.values) + 1
+        self.tree.append(value + self.prefix(i - 1) - self.prefix(i - (i & -i)))
+        self.values.append(value)
+        return i - 1
+
+    def add(self, index, delta):
+        self.values[index] += delta
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def set(self, index, value):
+        delta = value - self.values[index]
+        if delta:
+            self.add(index, delta)
+
+    def prefix(self, count):
+        """ 前 count 个元素之和 """
+        total = 0
+        while count > 0:
+            total += self.tree[count]
+            count -= count & -count
+        return total
+
+    def find(self, total):
+        """ 前缀和首次超过 total 的元素下标（元素均非负），O(log n)；元素为 0/1 时即第 total 个 1 的位置 """
+        pos = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self.tree) and self.tree[nxt] <= total:
+                pos = nxt
+                total -= self.tree[nxt]
+            step >>= 1
+        return pos
@@ -0,0 +1,87 @@
+import heapq
+import itertools
+import threading
+from queue import Queue
+
+
+class JobQueue:
+    """
+    可取消、可插队的任务队列：固定数量的线程按优先级从堆中取任务，
+    boost 过的任务排到最前面（后提升的更靠前），cancel 后不再开始新任务。
+    """
+
+    def __init__(self, run, workers=1):
+        self.run = run
+        self.workers = max(1, workers)
+        self.cancelled = False
+        self._heap = []
+        self._jobs = {}
+        self._priority = {}
+        self._order = itertools.count()
+        self._boosts = itertools.count(-1, -1)
+        self._cond = threading.Condition()
+        self._results = Queue()
+        self._threads = []
+
+    def submit(self, key, *args):
+        with self._cond:
+            if self.cancelled:
+                return
+            priority = next(self._order)
+            self._jobs[key] = args
+            self._priority[key] = priority
+            heapq.heappush(self._heap, (priority, key))
+            self._cond.notify()
+
+    def boost(self, key):
+        """ 尚未开始的任务提到队首，返回是否成功 """
+        with self._cond:
+            if key not in self._jobs:
+                return False
+            priority = next(self._boosts)
+            self._priority[key] = priority
+            heapq.heappush(self._heap, (priority, key))
+            return True
+
+    def cancel(self):
+        with self._cond:
+            self.cancelled = True
+            self._heap.clear()
+            self._jobs.clear()
+            self._cond.notify_all()
+
+    def _next(self):
+        with self._cond:
+            while self._heap:
+                priority, key = heapq.heappop(self._heap)
+                # 被 boost 过的任务在堆里留有旧条目，按当前优先级过滤掉
+                if key in self._jobs and self._priority[key] == priority:
+                    del self._priority[key]
+                    return key, self._jobs.pop(key)
+            return None
+
+    def _loop(self):
+        while True:
+            job = self._next()
+            if job is None:
+                break
+            key, args = job
+            try:
+                self._results.put((key, self.run(key, *args), None))
+            except Exception as e:
+                self._results.put((key, None, e))
+        self._results.put(None)
+
+    def results(self):
+        """ 启动工作线程，按完成顺序产出 (key, result, error)，队列取空或取消后结束 """
+        self._threads = [threading.Thread(target=self._loop, daemon=True) for _ in range(self.workers)]
+        for t in self._threads:
+            t.start()
+
+        running = len(self._threads)
+        while running:
+            item = self._results.get()
+            if item is None:
+                running -= 1
+                continue
+            yield item
@@ -1,29 +1,32 @@
 import os
 import sys
 
+from supervision import startup
+
 if getattr(sys, 'frozen', False):
     if sys.stdout is None:
         sys.stdout = open(os.devnull, 'w')
     if sys.stderr is None:
         sys.stderr = open(os.devnull, 'w')
 
+import time
 import shutil
+import threading
 from pathlib import Path
 
-from PyQt5 import QtGui, QtCore
-from PyQt5.QtCore import Qt, QUrl, QTimer, QSize
-from PyQt5.QtGui import QDesktopServices, QIcon
-from PyQt5.QtWidgets import QApplication, QFrame, QHBoxLayout
+with startup.timed("导入 PyQt5"):
+    from PyQt5 import QtGui, QtCore
+    from PyQt5.QtCore import Qt, QUrl, QTimer, QSize, QEvent
+    from PyQt5.QtGui import QDesktopServices, QIcon
+    from PyQt5.QtWidgets import QApplication, QFrame, QHBoxLayout, QWidget, QVBoxLayout
 
-from qfluentwidgets import (
-    NavigationItemPosition, setTheme, Theme, MSFluentWindow, SubtitleLabel,
-    setFont, setThemeColor, FluentIcon, SplashScreen
-)
+with startup.timed("导入 qfluentwidgets"):
+    from qfluentwidgets import (
+        NavigationItemPosition, setTheme, Theme, MSFluentWindow, SubtitleLabel,
+        setFont, setThemeColor, FluentIcon, SplashScreen
+    )
 
 from supervision.utils import resource_path
-from card.MainInterface import MainInterface
-from card.Document import Document
-from card.Setting import Setting
 
 
 class Widget(QFrame):
@@ -38,19 +41,82 @@ class Widget(QFrame):
         self.setObjectName(text.replace(' ', '-'))
 
 
+class LazyInterface(QWidget):
+    """ 导航占位页：第一次显示时才导入并构建真正的界面 """
+
+    def __init__(self, factory, objectName, onBuilt=None, parent=None):
+        super().__init__(parent=parent)
+        self.factory = factory
+        self.onBuilt = onBuilt
+        self.widget = None
+        self.vBoxLayout = QVBoxLayout(self)
+        self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
+        self.setObjectName(objectName)
+
+    def ensure(self):
+        if self.widget is None:
+            with startup.timed(f"构建 {self.objectName()}"):
+                self.widget = self.factory()
+                self.vBoxLayout.addWidget(self.widget)
+            if self.onBuilt:
+                self.onBuilt(self.widget)
+            startup.report()
+        return self.widget
+
+    def showEvent(self, e):
+        self.ensure()
+        super().showEvent(e)
+
+
+# 与 tool.py 等模块一样按 supervision.card.* 导入，否则 Setting 会以两个模块名加载出两份 cfg
+def createMainInterface():
+    from supervision.card.MainInterface import MainInterface
+    return MainInterface()
+
+
+def createSetting():
+    from supervision.card.Setting import Setting
+    return Setting()
+
+
+def createDocument():
+    from supervision.card.Document import Document
+    return Document()
+
+
 class Window(MSFluentWindow):
     def __init__(self):
         super().__init__()
 
         self.titleInterface = Widget("这是预留的标题页喵\n建议是改成模型训练页喵", self)
-        self.mainInterface = MainInterface()
-        self.settingInterface = Setting()
-        self.documentInterface = Document()
+        self.mainInterface = LazyInterface(createMainInterface, "MainInterface")
+        self.settingInterface = LazyInterface(createSetting, "SettingInterface", self._bindSetting)
+        self.documentInterface = LazyInterface(createDocument, "DocumentInterface")
 
         self.initNavigation()
         self.initWindow()
 
-        QTimer.singleShot(2500, self.splashScreen.finish)
+        # 首页第一次绘制完成后再关闭启动图，而不是固定等待
+        self._ready = False
+        self.titleInterface.installEventFilter(self)
+
+    def _bindSetting(self, setting):
+        setting.calibrationSource = lambda: (
+            [p for _, p in self.mainInterface.widget.FileListSettingCardWidget.entries()] if self.mainInterface.widget else []
+        )
+
+    def eventFilter(self, obj, e):
+        # 基类在构造期间就会收到事件，此时 _ready 还不存在
+        if e.type() == QEvent.Paint and not getattr(self, '_ready', True) and obj is self.titleInterface:
+            self._ready = True
+            startup.mark("首页首次绘制")
+            QTimer.singleShot(0, self._onReady)
+        return super().eventFilter(obj, e)
+
+    def _onReady(self):
+        self.splashScreen.finish()
+        startup.mark("关闭启动图")
+        startup.report()
 
     def initNavigation(self):
         self.addSubInterface(
@@ -123,10 +189,20 @@ if __name__ == '__main__':
     setTheme(Theme.DARK)
     setThemeColor("#ffffbfbf")
 
+    # 上次的输出先改名再在后台删除，文件很多时不拖慢启动
     out_dir = Path('./output')
-    shutil.rmtree(out_dir)
+    if out_dir.exists():
+        try:
+            out_dir.rename(out_dir.with_name(f".output_{time.time_ns()}"))
+        except OSError:
+            shutil.rmtree(out_dir, ignore_errors=True)
+    for stale in Path('.').glob(".output_*"):
+        threading.Thread(target=shutil.rmtree, args=(stale, True), daemon=True).start()
     out_dir.mkdir(parents=True, exist_ok=True)
+    startup.mark("QApplication 就绪")
 
-    w = Window()
+    with startup.timed("构建主窗口"):
+        w = Window()
     w.show()
+    startup.mark("主窗口 show")
     app.exec_()
@@ -0,0 +1,245 @@
+import os
+import json
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+from PyQt5.QtCore import QObject, QThread, QTimer, QFileSystemWatcher, pyqtSignal
+
+from supervision.cache import atomic_write_text
+from supervision.worker import YOLO_EXE
+
+MODEL_SUFFIXES = (".pt", ".onnx")
+
+
+def scan_models(folder):
+    """ 一次 os.scandir 列出模型文件及其 (mtime_ns, 大小)，目录不存在时返回空字典 """
+    models = {}
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if not entry.name.lower().endswith(MODEL_SUFFIXES):
+                    continue
+                try:
+                    if entry.is_file():
+                        st = entry.stat()
+                        models[entry.name] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return models
+
+
+class ModelInfoCache:
+    """ 按 路径+mtime+大小 持久化模型元数据，模型文件不变时打开设置页不需要再加载模型 """
+
+    def __init__(self, path="./cache/models.json"):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, path, signature):
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(path))
+        if entry is None or (entry["mtime"], entry["size"]) != tuple(signature):
+            return None
+        return entry["info"]
+
+    def put(self, path, signature, info):
+        with self._lock:
+            self._entries[os.path.abspath(path)] = {"mtime": signature[0], "size": signature[1], "info": info}
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._entries, ensure_ascii=False)
+            self._dirty = False
+        atomic_write_text(self.path, data)
+
+
+class ModelScanner(QThread):
+    """ 在后台列出模型目录，网络共享盘上也不阻塞界面 """
+    scanned = pyqtSignal(str, dict)
+
+    def __init__(self, folder, parent=None):
+        super().__init__(parent)
+        self.folder = folder
+
+    def run(self):
+        self.scanned.emit(self.folder, scan_models(self.folder))
+
+
+class ModelInfoFetcher(QThread):
+    """
+    用一个短时运行的 YoloByETO --info 进程读取缺少元数据的模型，不启动常驻进程池；
+    进程每读完一个模型输出一行 JSON，这里随即发出 infoReady(文件名, 元数据)
+    """
+    infoReady = pyqtSignal(str, dict)
+
+    def __init__(self, folder, models, exe=YOLO_EXE, parent=None):
+        super().__init__(parent)
+        self.folder = folder
+        self.models = list(models)
+        self.exe = exe
+        self._process = None
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+        if self._process is not None:
+            self._process.kill()
+
+    def run(self):
+        paths = {os.path.abspath(os.path.join(self.folder, name)): name for name in self.models}
+        listDir = Path("./cache")
+        listDir.mkdir(parents=True, exist_ok=True)
+        fd, listFile = tempfile.mkstemp(prefix=".models_", suffix=".txt", dir=listDir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("\n".join(paths))
+
+        try:
+            self._process = subprocess.Popen(
+                [self.exe, "--info", f"@{listFile}"], stdout=subprocess.PIPE, encoding="utf-8", errors="replace"
+            )
+            if self._cancelled:
+                self._process.kill()
+            for line in self._process.stdout:
+                try:
+                    reply = json.loads(line)
+                except ValueError:
+                    # 模型加载时的其他输出
+                    continue
+                if not isinstance(reply, dict) or reply.get("model") not in paths:
+                    continue
+                if reply.get("ok"):
+                    self.infoReady.emit(paths[reply["model"]], reply["info"])
+                else:
+                    print(f"read model info failed for {reply['model']}: {reply.get('error')}")
+            self._process.wait()
+        except OSError as e:
+            print(f"read model info failed: {e}")
+        finally:
+            os.remove(listFile)
+
+
+class ModelIndex(QObject):
+    """
+    监视模型目录（QFileSystemWatcher），目录变化后重新列出并与上次比较，
+    只通过 modelsAdded / modelsRemoved / modelsUpdated 报告变化的文件名。
+    元数据先查 ModelInfoCache，fetchInfo 为真时缺少的由 ModelInfoFetcher 在后台读取。
+    """
+    modelsAdded = pyqtSignal(list)
+    modelsRemoved = pyqtSignal(list)
+    modelsUpdated = pyqtSignal(list)
+
+    RESCAN_DELAY = 300
+
+    def __init__(self, folder, fetchInfo=True, cache=None, parent=None):
+        super().__init__(parent)
+        self.folder = str(folder)
+        self.fetchInfo = fetchInfo
+        self.cache = cache or ModelInfoCache()
+        self.models = {}
+        self.scanned = False
+        self._scanner = None
+        self._fetcher = None
+        self._pending = False
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._scheduleRescan)
+
+        # 下载、复制大文件时目录会连续变化，合并成一次重新扫描
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.RESCAN_DELAY)
+        self._timer.timeout.connect(self.rescan)
+
+    @property
+    def names(self):
+        return sorted(self.models)
+
+    def info(self, name):
+        signature = self.models.get(name)
+        return self.cache.get(os.path.join(self.folder, name), signature) if signature else None
+
+    def setFolder(self, folder):
+        folder = str(folder)
+        if folder == self.folder and self.models:
+            return
+        self._stopFetch()
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        removed, self.models = sorted(self.models), {}
+        self.folder = folder
+        self.scanned = False
+        if removed:
+            self.modelsRemoved.emit(removed)
+        self.rescan()
+
+    def rescan(self):
+        if self._scanner is not None and self._scanner.isRunning():
+            self._pending = True
+            return
+        self._pending = False
+        self._scanner = ModelScanner(self.folder, self)
+        self._scanner.scanned.connect(self._onScanned)
+        self._scanner.start()
+
+    def _scheduleRescan(self, _path):
+        self._timer.start()
+
+    def _onScanned(self, folder, models):
+        if self._pending or folder != self.folder:
+            self.rescan()
+            return
+
+        # 目录在监视开始后才创建，或被删除重建时，重新加入监视
+        if folder not in self.watcher.directories() and os.path.isdir(folder):
+            self.watcher.addPath(folder)
+
+        added = sorted(name for name in models if name not in self.models)
+        removed = sorted(name for name in self.models if name not in models)
+        updated = sorted(name for name in models if name in self.models and models[name] != self.models[name])
+        self.models = models
+        self.scanned = True
+
+        if removed:
+            self.modelsRemoved.emit(removed)
+        if added:
+            self.modelsAdded.emit(added)
+        if updated:
+            self.modelsUpdated.emit(updated)
+        self._startFetch()
+
+    def _startFetch(self):
+        if not self.fetchInfo or (self._fetcher is not None and self._fetcher.isRunning()):
+            return
+        missing = [name for name in self.names if self.info(name) is None]
+        if not missing:
+            return
+        self._fetcher = ModelInfoFetcher(self.folder, missing, parent=self)
+        self._fetcher.infoReady.connect(self._onInfoReady)
+        self._fetcher.start()
+
+    def _stopFetch(self):
+        if self._fetcher is not None:
+            self._fetcher.cancel()
+            self._fetcher.infoReady.disconnect(self._onInfoReady)
+            self._fetcher = None
+
+    def _onInfoReady(self, name, info):
+        signature = self.models.get(name)
+        if signature is None:
+            return
+        self.cache.put(os.path.join(self.folder, name), signature, info)
+        self.cache.save()
+        self.modelsUpdated.emit([name])
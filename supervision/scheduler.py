@@ -0,0 +1,38 @@
+import os
+from collections import namedtuple
+
+POLICIES = ["throughput", "latency"]
+
+WorkerSlot = namedtuple("WorkerSlot", ["threads", "cpus"])
+
+
+def available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_workers(policy="throughput", cpus=None, max_workers=8, pin=False):
+    """
+    把可用核心切分给各个常驻进程，每个进程的 intra-op 线程数等于分到的核心数，
+    避免 N 个进程各自按全部核心开线程池造成超额订阅。
+    throughput：多进程、每进程 2 线程，适合大批量；latency：少进程、每进程多线程，单张更快。
+    """
+    cpus = list(cpus) if cpus is not None else available_cpus()
+    cores = max(1, len(cpus))
+
+    if policy == "latency":
+        workers = 1 if cores <= 8 else 2
+    else:
+        per_worker = 1 if cores < 4 else 2
+        workers = max(1, cores // per_worker)
+    workers = max(1, min(workers, max_workers or workers, cores))
+
+    slots = []
+    base, extra = divmod(cores, workers)
+    start = 0
+    for i in range(workers):
+        count = base + (1 if i < extra else 0)
+        slots.append(WorkerSlot(count, tuple(cpus[start:start + count]) if pin else ()))
+        start += count
+    return slots
@@ -0,0 +1,37 @@
+import sys
+import time
+from contextlib import contextmanager
+
+# 尽早导入本模块，时间线从这里开始计时
+_START = time.perf_counter()
+_MARKS = []
+_last = _START
+
+enabled = "--profile-startup" in sys.argv
+
+
+def mark(label):
+    """ 记录一个启动阶段的结束时刻，未开启 --profile-startup 时什么也不做 """
+    if enabled:
+        _MARKS.append((time.perf_counter(), label))
+
+
+@contextmanager
+def timed(label):
+    """ with timed("构建 管理"): ... 记录一段导入/构建的耗时 """
+    begin = time.perf_counter()
+    yield
+    if enabled:
+        _MARKS.append((time.perf_counter(), f"{label}（{(time.perf_counter() - begin) * 1000:.0f} ms）"))
+
+
+def report():
+    """ 打印从进程启动到当前的时间线：累计时间、与上一项的间隔、阶段名 """
+    global _last
+    if not enabled or not _MARKS:
+        return
+    print("startup timeline:")
+    for at, label in _MARKS:
+        print(f"  {(at - _START) * 1000:8.1f} ms  +{(at - _last) * 1000:7.1f} ms  {label}")
+        _last = at
+    _MARKS.clear()
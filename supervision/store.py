@@ -0,0 +1,88 @@
+import json
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+
+
+def _pack(typecode, values):
+    return array(typecode, values).tobytes()
+
+
+def _unpack(typecode, blob):
+    values = array(typecode)
+    values.frombytes(blob or b"")
+    return values.tolist()
+
+
+class DetectionStore:
+    """
+    嵌入式 SQLite 检测结果库：框坐标、类别、置信度以紧凑的二进制数组保存，
+    以 (输入哈希, 模型哈希, 参数哈希) 为主键，改变标注样式/阈值/类别过滤时直接从这里重绘。
+    """
+
+    def __init__(self, path="./cache/detections.db"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS detections (
+                input_hash  TEXT NOT NULL,
+                model_hash  TEXT NOT NULL,
+                args_hash   TEXT NOT NULL,
+                count       INTEGER NOT NULL,
+                xyxy        BLOB,
+                class_id    BLOB,
+                confidence  BLOB,
+                class_names TEXT,
+                PRIMARY KEY (input_hash, model_hash, args_hash)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_detections_model ON detections (model_hash)")
+        self._conn.commit()
+
+    def put(self, input_hash, model_hash, args_hash, record):
+        xyxy = [v for box in record.get("xyxy", []) for v in box]
+        class_id = record.get("class_id", [])
+        names = {}
+        for cid, name in zip(class_id, record.get("class_name", [])):
+            names[str(cid)] = name
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO detections VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    input_hash, model_hash, args_hash, len(class_id),
+                    _pack("f", xyxy), _pack("i", class_id), _pack("f", record.get("confidence", [])),
+                    json.dumps(names, ensure_ascii=False),
+                )
+            )
+            self._conn.commit()
+
+    def get(self, input_hash, model_hash, args_hash):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT xyxy, class_id, confidence, class_names FROM detections "
+                "WHERE input_hash = ? AND model_hash = ? AND args_hash = ?",
+                (input_hash, model_hash, args_hash)
+            ).fetchone()
+        if row is None:
+            return None
+
+        flat = _unpack("f", row[0])
+        class_id = _unpack("i", row[1])
+        names = json.loads(row[3] or "{}")
+        return {
+            "xyxy": [flat[i:i + 4] for i in range(0, len(flat), 4)],
+            "class_id": class_id,
+            "confidence": _unpack("f", row[2]),
+            "class_name": [names.get(str(c), str(c)) for c in class_id],
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,100 @@
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import Qt, QObject, QSize, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QPainter
+
+from supervision.cache import FileManifest
+from supervision.utils import display_path
+
+
+def make_thumbnail(path, width, height):
+    """
+    按目标尺寸直接解码（JPEG 走 DCT 缩放），再居中画到透明画布上。
+    只用 QImage，可以在非 GUI 线程中调用。
+    """
+    reader = QImageReader(str(path))
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid():
+        reader.setScaledSize(size.scaled(QSize(width, height), Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return QImage()
+    if image.width() > width or image.height() > height:
+        image = image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    canvas = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    canvas.fill(Qt.transparent)
+    painter = QPainter(canvas)
+    painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+    painter.drawImage((width - image.width()) // 2, (height - image.height()) // 2, image)
+    painter.end()
+    return canvas
+
+
+class ThumbnailCache:
+    """ 磁盘缩略图缓存，按 文件内容哈希 + 目标尺寸 寻址，重启后不必再解码原图 """
+
+    def __init__(self, root="./cache/thumbs"):
+        self.root = Path(root)
+        self.manifest = FileManifest(self.root / "manifest.json")
+
+    def _path(self, source, width, height):
+        digest = self.manifest.digest(source)
+        key = hashlib.sha256(f"{digest}:{width}x{height}".encode("ascii")).hexdigest()
+        return self.root / key[:2] / f"{key}.png"
+
+    def get(self, source, width, height):
+        source = display_path(source)
+        cached = self._path(source, width, height)
+        if cached.exists():
+            image = QImage(str(cached))
+            if not image.isNull():
+                return image
+
+        image = make_thumbnail(source, width, height)
+        if not image.isNull():
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_name(f".tmp_{threading.get_ident()}_{cached.name}")
+            if image.save(str(tmp), "PNG"):
+                tmp.replace(cached)
+        return image
+
+    def save(self):
+        self.manifest.save()
+
+
+class ThumbnailLoader(QObject):
+    """ 在后台线程生成缩略图，完成后通过 thumbnailReady(id, 源路径, QImage) 回到 GUI 线程 """
+    thumbnailReady = pyqtSignal(object, str, QImage)
+
+    def __init__(self, width, height, cache=None, workers=2, parent=None):
+        super().__init__(parent)
+        self.width = width
+        self.height = height
+        self.cache = cache or ThumbnailCache()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def request(self, image_id, path):
+        with self._lock:
+            self._pending += 1
+        self._executor.submit(self._load, image_id, path)
+
+    def _load(self, image_id, path):
+        try:
+            image = self.cache.get(path, self.width, self.height)
+            self.thumbnailReady.emit(image_id, str(path), image)
+        except Exception as e:
+            print(f"thumbnail failed for {path}: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+                idle = not self._pending
+            # 一批缩略图全部完成后再写一次哈希清单
+            if idle:
+                self.cache.save()
@@ -1,10 +1,44 @@
-import subprocess
+import atexit
+import hashlib
+import threading
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 from supervision.card.Setting import cfg
+from supervision.worker import WorkerPool
+from supervision.jobs import JobQueue
+from supervision.scheduler import plan_workers
+from supervision.cache import (
+    ResultCache, FileManifest, file_signature, model_digest, args_digest, result_key
+)
+from supervision.store import DetectionStore
+from supervision.dedup import HashIndex, group_duplicates, image_size, scale_record
+from supervision.utils import is_video
 
-_PROCESSED_INDICES = set()
+ResultId = namedtuple("ResultId", ["key", "input_hash", "model_hash", "args_hash"])
+Processed = namedtuple("Processed", ["rid", "input_path", "output_path", "signature"])
+
+# 本次会话中每个索引当前展示的结果，文件未改动且模型/参数不变时不重新提交
+_PROCESSED = {}
+_CACHE = ResultCache()
+_MANIFEST = FileManifest()
+_STORE = None
+_STORE_LOCK = threading.Lock()
+_HASHES = HashIndex()
+
+# 近似重复的索引 → 沿用其检测结果的代表索引
+_LINKS = {}
+
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+# 当前正在运行的批次，用于停止和插队；_ACTIVE_REPS 记录本批次中重复文件所属的代表
+_ACTIVE = None
+_ACTIVE_REPS = {}
 
 
 def _ensure_dir(p):
@@ -12,80 +46,423 @@ def _ensure_dir(p):
         p.mkdir(parents=True, exist_ok=True)
 
 
-def is_processed(index):
-    return index in _PROCESSED_INDICES
+def is_processed(index, key=None):
+    if key is None:
+        return index in _PROCESSED
+    return index in _PROCESSED and _PROCESSED[index].rid.key == key
+
+
+def _fingerprint(extra_args):
+    return args_digest({"args": extra_args or {}, "backend": cfg.get(cfg.backend)})
+
+
+def is_up_to_date(index, input_path, model, extra_args=None):
+    """ 只做一次 stat：路径、mtime、大小、模型和参数都没变时不需要重新处理 """
+    entry = _PROCESSED.get(index)
+    if entry is None or entry.input_path != input_path:
+        return False
+    try:
+        if file_signature(input_path) != entry.signature:
+            return False
+        model_hash = model_digest(_model_path(model))
+    except OSError:
+        return False
+    return entry.rid.model_hash == model_hash and entry.rid.args_hash == _fingerprint(extra_args)
+
+
+def stale_indices(model=None, extra_args=None):
+    """ 已处理但模型或参数已变化的索引，切换模型后只需重新排队这些 """
+    if model is None:
+        model = cfg.get(cfg.modelChoice)
+    return [i for i, entry in list(_PROCESSED.items()) if not is_up_to_date(i, entry.input_path, model, extra_args)]
+
+
+def linked_index(index):
+    """ 沿用了其他文件检测结果的近似重复文件，返回代表的索引，否则返回 None """
+    return _LINKS.get(index)
+
+
+def detection_store():
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = DetectionStore()
+        return _STORE
 
 
 def clear_processed_cache():
-    _PROCESSED_INDICES.clear()
+    """ 只清空会话内的索引记录，磁盘上的结果缓存保留 """
+    _PROCESSED.clear()
+    _LINKS.clear()
 
 
-def _build_output_path(input_path):
+def _build_output_path(input_path, key):
+    """ 输出名带上结果 key 前缀，不同目录下的同名文件不会互相覆盖 """
     inp = Path(input_path)
     out_dir = Path(cfg.get(cfg.saveFolder))
     _ensure_dir(out_dir)
-    return out_dir / inp.name
+    return out_dir / f"{inp.stem}_{key[:8]}{inp.suffix}"
+
 
+def _result_id(input_path, model, extra_args, signature=None):
+    input_hash = _MANIFEST.digest(input_path, signature)
+    model_hash, args_hash = model_digest(_model_path(model)), _fingerprint(extra_args)
+    return ResultId(result_key(input_hash, model_hash, args_hash), input_hash, model_hash, args_hash)
 
-def _run_sv(input_path, model, output_path, extra_args):
-    cmd = [r"./bin/YoloByETO.exe", "-i", str(input_path)]
-    if model:
-        cmd += ["-m", Path(cfg.get(cfg.modelFolder)) / str(model)]
 
-    cmd += ["-o", str(output_path)]
-    if extra_args:
-        cmd += ["-j", str(extra_args)]
+# 与推理时直接输出的标注图相同的样式
+DEFAULT_STYLE = {"style": "box", "conf": 0.0, "classes": []}
+
+
+def render_options():
+    """ 当前标注样式/置信度下限/类别过滤，全部为默认值时返回 None（直接使用推理时的标注图） """
+    classes = [c.strip() for c in cfg.get(cfg.classFilter).split(",") if c.strip()]
+    options = {"style": cfg.get(cfg.annotateStyle), "conf": cfg.get(cfg.confCutoff) / 100, "classes": classes}
+    if options["style"] == "box" and options["conf"] <= 0 and not classes:
+        return None
+    return options
 
+
+def _model_path(model):
+    return str(Path(cfg.get(cfg.modelFolder)) / str(model))
+
+
+def plan_pool(max_workers=None):
+    return plan_workers(
+        cfg.get(cfg.schedulePolicy), max_workers=max_workers or 8, pin=cfg.get(cfg.pinAffinity)
+    )
+
+
+def get_worker_pool(model, max_workers=None):
+    """ 复用常驻进程池，只有核心划分、缓存预算或推理后端变化时才重建；切换模型由进程内的模型缓存处理 """
+    global _POOL
+    budget = cfg.get(cfg.modelBudget)
+    backend = cfg.get(cfg.backend)
+    slots = plan_pool(max_workers)
+
+    with _POOL_LOCK:
+        if _POOL is not None and (_POOL.slots != slots or _POOL.budget != budget or _POOL.backend != backend):
+            _POOL.close()
+            _POOL = None
+        if _POOL is None:
+            _POOL = WorkerPool(_model_path(model), slots, budget, backend)
+        else:
+            _POOL.model = _model_path(model)
+        return _POOL
+
+
+def model_stats():
+    """ 各常驻进程模型缓存的 hit/miss/eviction 计数（随推理回复更新的快照），用于调整内存预算 """
+    with _POOL_LOCK:
+        pool = _POOL
+    return pool.stats() if pool is not None else {}
+
+
+def shutdown_workers():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.close()
+            _POOL = None
+
+
+atexit.register(shutdown_workers)
+
+
+def _run_sv(pool, input_path, model, output_path, extra_args, rid=None):
     try:
-        subprocess.run(cmd, check=True)
-        return True
+        reply = pool.infer(input_path, output_path, extra_args, _model_path(model))
     except Exception as e:
         print(f"YoloByETO.exe failed for {input_path}: {e}")
         return False
 
+    if rid is not None and "detections" in reply:
+        try:
+            detection_store().put(rid.input_hash, rid.model_hash, rid.args_hash, reply["detections"])
+        except Exception as e:
+            print(f"store detections failed for {input_path}: {e}")
+    return True
+
+
+def _styled_path(out_path, options):
+    """ 默认样式就是 out_path，其他样式按选项哈希另存一份 """
+    if options is None:
+        return out_path
+    tag = hashlib.sha256(args_digest(options).encode("ascii")).hexdigest()[:6]
+    return out_path.with_name(f"{out_path.stem}_{tag}{out_path.suffix}")
+
+
+def _render(pool, rid, input_path, out_path, options):
+    """
+    用检测库里的结果按当前样式重绘，不经过模型；视频或没有记录时返回原标注图。
+    近似重复的文件只画过当前样式，切回默认样式时同样从检测库补画 out_path。
+    """
+    if is_video(input_path) or (options is None and out_path.exists()):
+        return str(out_path)
+
+    record = detection_store().get(rid.input_hash, rid.model_hash, rid.args_hash)
+    if record is None:
+        return str(out_path)
+
+    target = _styled_path(out_path, options)
+    if target.exists():
+        return str(target)
+    try:
+        pool.render(input_path, target, record, options or DEFAULT_STYLE)
+    except Exception as e:
+        print(f"render failed for {input_path}: {e}")
+        return str(out_path)
+    return str(target)
+
 
-def process_file_once(index, input_path, model=None, extra_args=None):
+def _produce(rid, pool, input_path, model, out_path, extra_args):
+    """ 同一个 key 同时只推理一次，重复文件等待第一份结果后直接从缓存取 """
+    key = rid.key
+    while True:
+        if _CACHE.restore(key, out_path):
+            return True
+
+        with _INFLIGHT_LOCK:
+            event = _INFLIGHT.get(key)
+            owner = event is None
+            if owner:
+                event = _INFLIGHT[key] = threading.Event()
+
+        if not owner:
+            event.wait()
+            if _CACHE.contains(key):
+                continue
+            return _run_sv(pool, input_path, model, str(out_path), extra_args, rid)
+
+        try:
+            success = _run_sv(pool, input_path, model, str(out_path), extra_args, rid)
+            if success:
+                _CACHE.put(key, out_path)
+            return success
+        finally:
+            with _INFLIGHT_LOCK:
+                del _INFLIGHT[key]
+            event.set()
+
+
+def process_file_once(index, input_path, model=None, extra_args=None, pool=None):
     if not input_path:
         return None
-    if is_processed(index):
-        return None
     if model is None:
         model = cfg.get(cfg.modelChoice)
 
-    out_path = _build_output_path(input_path)
-    success = _run_sv(input_path, model, str(out_path), extra_args)
-    if success:
-        _PROCESSED_INDICES.add(index)
-        return index, str(out_path)
+    try:
+        signature = file_signature(input_path)
+        rid = _result_id(input_path, model, extra_args, signature)
+    except OSError as e:
+        print(f"hash failed for {input_path}: {e}")
+        return None
+    if is_processed(index, rid.key):
+        return None
+
+    if pool is None:
+        pool = get_worker_pool(model)
+
+    out_path = _build_output_path(input_path, rid.key)
+    if _produce(rid, pool, input_path, model, out_path, extra_args):
+        _PROCESSED[index] = Processed(rid, input_path, out_path, signature)
+        _LINKS.pop(index, None)
+        return index, _render(pool, rid, input_path, out_path, render_options())
     return None
 
 
-def process_files_threaded(indices, files, max_workers=4, model=None, extra_args=None):
+def process_duplicate(index, input_path, source, model=None, extra_args=None, pool=None, cancelled=lambda: False):
+    """
+    近似重复的文件不推理：把代表 source 的检测结果按两图尺寸换算后记到自己名下，再按当前样式画到自己的图上。
+    自己已有精确结果缓存、代表没有可用的检测记录、或两图不是单纯缩放关系时按普通文件处理。
+    cancelled() 为真时批次已停止、进程刚被结束，不再占用进程（会重新启动进程），直接返回 None。
+    """
     if model is None:
         model = cfg.get(cfg.modelChoice)
 
-    futures = {}
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        for idx, i in enumerate(indices):
-            key = i
-            try:
-                input_path = files[idx]
-            except Exception:
-                input_path = ''
-            if not input_path or is_processed(key):
-                continue
-            futures[ex.submit(process_file_once, key, input_path, model, extra_args)] = key
+    try:
+        signature = file_signature(input_path)
+        rid = _result_id(input_path, model, extra_args, signature)
+    except OSError as e:
+        print(f"hash failed for {input_path}: {e}")
+        return None
+
+    entry = _PROCESSED.get(source)
+    record = None
+    if entry is not None and (entry.rid.model_hash, entry.rid.args_hash) == (rid.model_hash, rid.args_hash):
+        record = detection_store().get(entry.rid.input_hash, entry.rid.model_hash, entry.rid.args_hash)
+    if record is not None:
+        # 感知哈希与尺寸无关，检测框是代表图上的像素坐标，要换算到本图的尺寸
+        source_size, target_size = image_size(entry.input_path), image_size(input_path)
+        record = scale_record(record, source_size, target_size) if source_size and target_size else None
+    if record is None or _CACHE.contains(rid.key):
+        return None if cancelled() else process_file_once(index, input_path, model, extra_args, pool)
+
+    if cancelled():
+        return None
+    if pool is None:
+        pool = get_worker_pool(model)
+
+    out_path = _build_output_path(input_path, rid.key)
+    options = render_options()
+    target = _styled_path(out_path, options)
+    try:
+        detection_store().put(rid.input_hash, rid.model_hash, rid.args_hash, record)
+        pool.render(input_path, target, record, options or DEFAULT_STYLE)
+    except Exception as e:
+        print(f"reuse detections failed for {input_path}: {e}")
+        return None if cancelled() else process_file_once(index, input_path, model, extra_args, pool)
+
+    _PROCESSED[index] = Processed(rid, input_path, out_path, signature)
+    _LINKS[index] = source
+    return index, str(target)
+
 
-    results_map = {}
-    for fut in as_completed(futures):
-        res = fut.result()
-        if res:
-            k, outp = res
-            results_map[k] = outp
+def _group_jobs(jobs, workers, queue):
+    """
+    按感知哈希把本批图片分组，返回 [(代表索引, 路径, [(重复索引, 路径), ...])]：
+    每组只推理代表，其余沿用代表的检测结果。未开启去重时每个文件自成一组，视频和无法解码的图片也是。
+    """
+    if not cfg.get(cfg.dedupEnabled) or len(jobs) < 2:
+        return [(key, input_path, []) for key, input_path in jobs]
 
-    out_list = []
+    def phash(job):
+        key, input_path = job
+        if queue.cancelled or is_video(input_path):
+            return key, None
+        try:
+            return key, _HASHES.get(_MANIFEST.digest(input_path), input_path)
+        except OSError:
+            return key, None
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        hashes = list(ex.map(phash, jobs))
+    _HASHES.save()
+
+    paths = dict(jobs)
+    groups = group_duplicates(hashes, cfg.get(cfg.dedupDistance))
+    return [(key, paths[key], [(dup, paths[dup]) for dup in dups]) for key, dups in groups.items()]
+
+
+def _process_group(queue, key, input_path, duplicates, model, extra_args, pool):
+    """ 先处理代表，成功后重复文件直接沿用其检测结果；代表失败时重复文件各自推理 """
+    result = process_file_once(key, input_path, model, extra_args, pool)
+    results = [(key, result)]
+    for dup, dup_path in duplicates:
+        if queue.cancelled:
+            break
+        if result is not None:
+            results.append((dup, process_duplicate(dup, dup_path, key, model, extra_args, pool, lambda: queue.cancelled)))
+        else:
+            results.append((dup, process_file_once(dup, dup_path, model, extra_args, pool)))
+    return results
+
+
+def iter_process_files(indices, files, max_workers=None, model=None, extra_args=None, on_progress=None):
+    """
+    增量处理的生成器版本：只提交新增、内容有变化、或模型/参数已变化的文件，
+    每完成一个就立即产出 (index, output)。on_progress(done, total) 在每个任务结束时调用（含失败）。
+    开启去重时近似重复的图片与代表同组提交，不单独推理。
+    """
+    if model is None:
+        model = cfg.get(cfg.modelChoice)
+
+    jobs = []
     for idx, key in enumerate(indices):
-        if key in results_map:
-            out_list.append((key, results_map[key]))
+        try:
+            input_path = files[idx]
+        except Exception:
+            input_path = ''
+        if input_path and not is_up_to_date(key, input_path, model, extra_args):
+            jobs.append((key, input_path))
+    if on_progress is not None:
+        on_progress(0, len(jobs))
+    if not jobs:
+        return
+
+    global _ACTIVE, _ACTIVE_REPS
+    pool = get_worker_pool(model, max_workers)
+    queue = JobQueue(
+        lambda key, path, duplicates: _process_group(queue, key, path, duplicates, model, extra_args, pool), pool.size
+    )
+    _ACTIVE = queue
+    done = 0
+    try:
+        groups = _group_jobs(jobs, pool.size, queue)
+        if queue.cancelled:
+            return
+        sizes = {}
+        for key, input_path, duplicates in groups:
+            sizes[key] = 1 + len(duplicates)
+            queue.submit(key, input_path, duplicates)
+        _ACTIVE_REPS = {dup: key for key, _, duplicates in groups for dup, _ in duplicates}
+
+        for key, results, error in queue.results():
+            if error is not None:
+                print(f"process failed for index {key}: {error}")
+            done += sizes[key]
+            if on_progress is not None:
+                on_progress(done, len(jobs))
+            for _, res in results or []:
+                if res:
+                    yield res
+    finally:
+        # 调用方提前停止迭代时，尚未开始的任务不再执行
+        queue.cancel()
+        if _ACTIVE is queue:
+            _ACTIVE = None
+            _ACTIVE_REPS = {}
+        _MANIFEST.save()
+
+
+def prioritize(index):
+    """ 当前批次中尚未开始的 index 提到队首，用户正在查看的文件优先出结果 """
+    queue = _ACTIVE
+    return queue is not None and queue.boost(_ACTIVE_REPS.get(index, index))
+
+
+def cancel_processing():
+    """ 停止当前批次：不再开始新任务，并结束正在推理的进程 """
+    queue = _ACTIVE
+    if queue is None:
+        return False
+    queue.cancel()
+    with _POOL_LOCK:
+        pool = _POOL
+    if pool is not None:
+        pool.kill()
+    return True
+
+
+def process_files_threaded(indices, files, max_workers=None, model=None, extra_args=None):
+    """ 等全部完成后按 indices 的顺序返回 [(index, output)] """
+    results_map = dict(iter_process_files(indices, files, max_workers, model, extra_args))
+    return [(key, results_map[key]) for key in indices if key in results_map]
+
+
+def stored_records(indices):
+    """ 已处理索引对应的 (输入路径, 检测结果)，检测库中没有记录（如视频）时为 None """
+    for index in indices:
+        if index not in _PROCESSED:
+            continue
+        rid, input_path = _PROCESSED[index].rid, _PROCESSED[index].input_path
+        if is_video(input_path):
+            yield index, input_path, None
+            continue
+        yield index, input_path, detection_store().get(rid.input_hash, rid.model_hash, rid.args_hash)
+
+
+def rerender_results(indices=None, max_workers=None):
+    """ 标注样式、置信度下限或类别过滤变化后，用检测库重绘已处理的结果，不重新推理 """
+    entries = [(i, _PROCESSED[i]) for i in (indices if indices is not None else list(_PROCESSED)) if i in _PROCESSED]
+    if not entries:
+        return []
 
-    return out_list
+    options = render_options()
+    pool = get_worker_pool(cfg.get(cfg.modelChoice), max_workers)
+    with ThreadPoolExecutor(max_workers=pool.size) as ex:
+        futures = [
+            (index, ex.submit(_render, pool, entry.rid, entry.input_path, entry.output_path, options))
+            for index, entry in entries
+        ]
+    return [(index, fut.result()) for index, fut in futures]
@@ -1,4 +1,44 @@
 import sys
 from pathlib import Path
 
+from PyQt5.QtGui import QFont, QFontDatabase, QPixmap
+
 resource_path = lambda path: str(((Path(sys._MEIPASS) if hasattr(sys, '_MEIPASS') else Path(__file__).parent) / path).resolve())
+
+IMAGE_SUFFIXES = [".png", ".jpg"]
+VIDEO_SUFFIXES = [".mp4", ".avi", ".mkv"]
+MEDIA_SUFFIXES = IMAGE_SUFFIXES + VIDEO_SUFFIXES
+
+
+def is_video(path):
+    return Path(path).suffix.lower() in VIDEO_SUFFIXES
+
+
+def display_path(path):
+    """ 视频结果用 YoloByETO 生成的抽帧预览图展示 """
+    return str(Path(path).with_suffix(".preview.jpg")) if is_video(path) else path
+
+
+_FONT_FAMILIES = {}
+_PIXMAPS = {}
+
+
+def app_font(pixel_size, name=r".\src\Lolita.ttf"):
+    """ 应用字体只向字体库注册一次，各界面共用同一个字体族 """
+    if name not in _FONT_FAMILIES:
+        font_id = QFontDatabase.addApplicationFont(resource_path(name))
+        families = QFontDatabase.applicationFontFamilies(font_id) if font_id != -1 else []
+        if not families:
+            print("Failed to load font")
+        _FONT_FAMILIES[name] = families[0] if families else None
+
+    font = QFont(_FONT_FAMILIES[name]) if _FONT_FAMILIES[name] else QFont()
+    font.setPixelSize(pixel_size)
+    return font
+
+
+def resource_pixmap(name):
+    """ src 下的图片资源只解码一次 """
+    if name not in _PIXMAPS:
+        _PIXMAPS[name] = QPixmap(resource_path(name))
+    return _PIXMAPS[name]
@@ -0,0 +1,88 @@
+import os
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+def path_key(path):
+    """ 去重用的键：Windows 下大小写、分隔符不同的同一路径视为一个 """
+    return os.path.normcase(os.path.normpath(path))
+
+
+def iter_media_files(roots, suffixes, cancelled=lambda: False):
+    """
+    用 os.scandir 显式栈遍历目录（不递归调用、不跟随目录符号链接），
+    只按文件名后缀过滤，不做 stat / resolve；同一路径只产出一次。
+    """
+    suffixes = tuple(s.lower() for s in suffixes)
+    seen = set()
+    stack = [os.path.abspath(root) for root in reversed(roots)]
+
+    while stack and not cancelled():
+        top = stack.pop()
+        if os.path.isfile(top):
+            if top.lower().endswith(suffixes) and path_key(top) not in seen:
+                seen.add(path_key(top))
+                yield top
+            continue
+
+        dirs = []
+        try:
+            with os.scandir(top) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.path)
+                        elif entry.name.lower().endswith(suffixes) and entry.is_file():
+                            key = path_key(entry.path)
+                            if key not in seen:
+                                seen.add(key)
+                                yield entry.path
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"scan failed for {top}: {e}")
+            continue
+
+        # 按名称顺序深度优先
+        dirs.sort(reverse=True)
+        stack.extend(dirs)
+
+
+class FolderWalker(QThread):
+    """ 后台遍历文件夹，按块（数量或时间先到者）通过 filesFound 交给 GUI 线程 """
+    filesFound = pyqtSignal(list)
+    countChanged = pyqtSignal(int)
+
+    CHUNK_SIZE = 1000
+    CHUNK_INTERVAL = 0.1
+
+    def __init__(self, roots, suffixes, parent=None):
+        super().__init__(parent)
+        self.roots = list(roots)
+        self.suffixes = suffixes
+        self.count = 0
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        chunk = []
+        last = time.perf_counter()
+        for path in iter_media_files(self.roots, self.suffixes, lambda: self._cancelled):
+            if self._cancelled:
+                return
+            chunk.append(path)
+            now = time.perf_counter()
+            if len(chunk) >= self.CHUNK_SIZE or now - last >= self.CHUNK_INTERVAL:
+                self._flush(chunk)
+                chunk = []
+                last = now
+        if chunk and not self._cancelled:
+            self._flush(chunk)
+
+    def _flush(self, chunk):
+        self.count += len(chunk)
+        self.filesFound.emit(chunk)
+        self.countChanged.emit(self.count)
@@ -0,0 +1,241 @@
+import os
+import json
+import socket
+import secrets
+import threading
+import subprocess
+from queue import Queue, Empty
+
+YOLO_EXE = r"./bin/YoloByETO.exe"
+
+BACKENDS = ["torch", "onnx", "openvino"]
+
+
+class WorkerError(RuntimeError):
+    pass
+
+
+class YoloWorker:
+    """ 常驻的 YoloByETO --serve 进程，已加载的模型由进程内的 ModelRegistry 复用 """
+
+    def __init__(self, model, budget=2048, slot=None, backend="torch", exe=YOLO_EXE, connect_timeout=120):
+        self.model = str(model)
+        self.slot = slot
+        self.broken = False
+        # 模型缓存计数随每次推理的回复带回，查看时不需要再向进程发请求
+        self.last_stats = {}
+        self._seq = 0
+        self._token = secrets.token_hex(8)
+
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        server.settimeout(connect_timeout)
+        host, port = server.getsockname()
+
+        cmd = [exe, "--serve", f"{host}:{port}", "--token", self._token, "-m", self.model,
+               "--model-budget", str(budget), "--backend", backend]
+        env = None
+        if slot is not None:
+            cmd += ["--threads", str(slot.threads)]
+            if slot.cpus:
+                cmd += ["--cpus", ",".join(map(str, slot.cpus))]
+            threads = str(slot.threads)
+            env = dict(os.environ, OMP_NUM_THREADS=threads, MKL_NUM_THREADS=threads, OPENBLAS_NUM_THREADS=threads)
+
+        self.process = subprocess.Popen(cmd, env=env)
+
+        try:
+            self._sock, _ = server.accept()
+        except OSError as e:
+            self.process.kill()
+            raise WorkerError(f"YoloByETO 未能连接：{e}")
+        finally:
+            server.close()
+
+        self._sock.settimeout(None)
+        self._stream = self._sock.makefile("rwb")
+
+        hello = self._recv()
+        if hello.get("token") != self._token:
+            self.close()
+            raise WorkerError("YoloByETO 握手失败")
+        if not hello.get("ok"):
+            self.close()
+            raise WorkerError(hello.get("error", "模型加载失败"))
+        self.last_stats = hello.get("stats") or {}
+
+    def _recv(self):
+        try:
+            line = self._stream.readline()
+            reply = json.loads(line) if line else None
+        except (OSError, ValueError) as e:
+            self.broken = True
+            raise WorkerError(f"与 YoloByETO 通信失败：{e}")
+
+        if reply is None:
+            self.broken = True
+            raise WorkerError("YoloByETO 进程已退出")
+        return reply
+
+    def request(self, op, **payload):
+        self._seq += 1
+        message = dict(payload, id=self._seq, op=op)
+        try:
+            self._stream.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+            self._stream.flush()
+        except OSError as e:
+            self.broken = True
+            raise WorkerError(f"与 YoloByETO 通信失败：{e}")
+
+        reply = self._recv()
+        if not reply.get("ok"):
+            raise WorkerError(reply.get("error", "未知错误"))
+        if "stats" in reply:
+            self.last_stats = reply["stats"]
+        return reply
+
+    def infer(self, input_path, output_path, extra_args=None, model=None):
+        return self.request(
+            "infer", input=str(input_path), output=str(output_path), args=extra_args, model=model or self.model
+        )
+
+    def render(self, input_path, output_path, detections, style):
+        return self.request("render", input=str(input_path), output=str(output_path), detections=detections, style=style)
+
+    def stats(self):
+        return self.request("stats")["stats"]
+
+    def alive(self):
+        return not self.broken and self.process.poll() is None
+
+    def kill(self):
+        """ 立即结束进程，正在等待的 request 会以 WorkerError 返回 """
+        self.broken = True
+        try:
+            self.process.kill()
+        except OSError:
+            pass
+
+    def close(self):
+        try:
+            self._stream.write(b'{"op": "exit"}\n')
+            self._stream.flush()
+        except Exception:
+            pass
+        try:
+            self._sock.close()
+        except Exception:
+            pass
+        try:
+            self.process.wait(3)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class WorkerPool:
+    """ 按需启动、可复用的 YoloWorker 池，一个线程同一时刻只占用一个进程；每个进程占用一个 WorkerSlot """
+
+    def __init__(self, model, slots, budget=2048, backend="torch"):
+        self.model = str(model)
+        self.slots = list(slots)
+        self.budget = budget
+        self.backend = backend
+        self._idle = Queue()
+        self._workers = []
+        self._free_slots = list(self.slots)
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return len(self.slots)
+
+    def acquire(self):
+        timeout = 0
+        while True:
+            try:
+                worker = self._idle.get(timeout=timeout) if timeout else self._idle.get_nowait()
+            except Empty:
+                worker = None
+            if worker is not None:
+                if worker.alive():
+                    return worker
+                self.release(worker)
+                continue
+
+            with self._lock:
+                slot = self._free_slots.pop() if self._free_slots else None
+                if slot is not None:
+                    self._workers.append(None)
+
+            if slot is not None:
+                break
+            timeout = 0.5
+
+        try:
+            worker = YoloWorker(self.model, self.budget, slot, self.backend)
+        except Exception:
+            with self._lock:
+                self._workers.remove(None)
+                self._free_slots.append(slot)
+            raise
+
+        with self._lock:
+            self._workers[self._workers.index(None)] = worker
+        return worker
+
+    def release(self, worker):
+        if worker.alive():
+            self._idle.put(worker)
+            return
+
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+                self._free_slots.append(worker.slot)
+        worker.close()
+
+    def infer(self, input_path, output_path, extra_args=None, model=None):
+        worker = self.acquire()
+        try:
+            return worker.infer(input_path, output_path, extra_args, model or self.model)
+        finally:
+            self.release(worker)
+
+    def render(self, input_path, output_path, detections, style):
+        worker = self.acquire()
+        try:
+            return worker.render(input_path, output_path, detections, style)
+        finally:
+            self.release(worker)
+
+    def stats(self):
+        """
+        汇总各进程最近一次回复带回的模型缓存命中/未命中/淘汰计数。
+        不发请求、也不动空闲队列，批次进行中在 GUI 线程调用也不会阻塞
+        """
+        with self._lock:
+            workers = [w for w in self._workers if w is not None and w.alive()]
+
+        total = {"workers": 0, "hits": 0, "misses": 0, "evictions": 0, "models": 0, "bytes": 0}
+        for worker in workers:
+            total["workers"] += 1
+            for k in ("hits", "misses", "evictions", "models", "bytes"):
+                total[k] += worker.last_stats.get(k, 0)
+        return total
+
+    def kill(self):
+        """ 停止按钮：结束所有进程（包括正在推理的），之后 acquire 会按需重新启动 """
+        with self._lock:
+            workers = [w for w in self._workers if w is not None]
+        for worker in workers:
+            worker.kill()
+
+    def close(self):
+        with self._lock:
+            workers = [w for w in self._workers if w is not None]
+            self._workers = []
+            self._free_slots = list(self.slots)
+        for worker in workers:
+            worker.close()
+        self._idle = Queue()
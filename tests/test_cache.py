@@ -0,0 +1,129 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# 优先导入仓库内的 supervision，而不是 pip 安装的同名包
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from supervision import cache
+from supervision.cache import (
+    FileManifest, ResultCache, args_digest, atomic_copy, atomic_write_text, file_digest, result_key,
+)
+
+
+class DigestTest(unittest.TestCase):
+
+    def test_keys(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.bin"
+            path.write_bytes(b"abc")
+            self.assertEqual(
+                file_digest(path, chunk_size=2),
+                "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad",
+            )
+
+        self.assertEqual(args_digest({"conf": 0.25, "iou": 0.7}), args_digest({"iou": 0.7, "conf": 0.25}))
+        self.assertNotEqual(args_digest({"conf": 0.25}), args_digest({"conf": 0.3}))
+        self.assertEqual(result_key("i", "m", "a"), result_key("i", "m", "a"))
+        self.assertNotEqual(result_key("i", "m", "a"), result_key("i", "m2", "a"))
+
+
+class FileManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.image = self.dir / "a.jpg"
+        self.image.write_bytes(b"first")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_reuses_digest_until_file_changes(self):
+        manifest = FileManifest(self.dir / "cache" / "manifest.json")
+        with mock.patch.object(cache, "file_digest", wraps=file_digest) as digest:
+            first = manifest.digest(self.image)
+            self.assertEqual(manifest.digest(self.image), first)
+            self.assertEqual(digest.call_count, 1)
+
+            # 内容变了：大小不同
+            self.image.write_bytes(b"second")
+            self.assertNotEqual(manifest.digest(self.image), first)
+            self.assertEqual(digest.call_count, 2)
+
+            # 大小相同但 mtime 不同
+            self.assertEqual(manifest.digest(self.image, signature=(1, 6)), file_digest(self.image))
+            self.assertEqual(digest.call_count, 3)
+
+    def test_persists_between_runs(self):
+        path = self.dir / "cache" / "manifest.json"
+        manifest = FileManifest(path)
+        value = manifest.digest(self.image)
+        manifest.save()
+        self.assertTrue(path.exists())
+
+        with mock.patch.object(cache, "file_digest") as digest:
+            self.assertEqual(FileManifest(path).digest(self.image), value)
+            digest.assert_not_called()
+
+    def test_corrupt_manifest_is_ignored(self):
+        path = self.dir / "manifest.json"
+        path.write_text("{broken", encoding="utf-8")
+        self.assertEqual(FileManifest(path).digest(self.image), file_digest(self.image))
+
+
+class AtomicWriteTest(unittest.TestCase):
+
+    def test_no_temp_files_left(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp) / "out"
+            atomic_write_text(folder / "index.json", "{}")
+            atomic_write_text(folder / "index.json", '{"a": 1}')
+            atomic_copy(folder / "index.json", folder / "copy.json")
+            self.assertEqual((folder / "copy.json").read_text(encoding="utf-8"), '{"a": 1}')
+            self.assertEqual(sorted(p.name for p in folder.iterdir()), ["copy.json", "index.json"])
+
+    def test_failure_keeps_old_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index.json"
+            atomic_write_text(path, "old")
+            with mock.patch.object(cache.os, "replace", side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    atomic_write_text(path, "new")
+            self.assertEqual(path.read_text(encoding="utf-8"), "old")
+            self.assertEqual([p.name for p in Path(tmp).iterdir()], ["index.json"])
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def test_put_and_restore_with_sidecars(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            results = ResultCache(tmp / "cache")
+            key = result_key("input", "model", "args")
+            self.assertFalse(results.contains(key))
+            self.assertFalse(results.restore(key, tmp / "out" / "x.mp4"))
+
+            produced = tmp / "run"
+            produced.mkdir()
+            (produced / "clip.mp4").write_bytes(b"video")
+            (produced / "clip.jpg").write_bytes(b"preview")
+            (produced / "clip.frames.jsonl").write_text("{}\n", encoding="utf-8")
+            (produced / "clipper.mp4").write_bytes(b"unrelated")
+            results.put(key, produced / "clip.mp4")
+            self.assertEqual(len(results.files(key)), 3)
+
+            out = tmp / "out"
+            out.mkdir()
+            self.assertTrue(results.restore(key, out / "renamed.mp4"))
+            self.assertEqual(
+                sorted(p.name for p in out.iterdir()),
+                ["renamed.frames.jsonl", "renamed.jpg", "renamed.mp4"],
+            )
+            self.assertEqual((out / "renamed.mp4").read_bytes(), b"video")
+
+
+if __name__ == "__main__":
+    unittest.main()
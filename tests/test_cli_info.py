@@ -0,0 +1,52 @@
+import sys
+import json
+import tempfile
+import unittest
+import subprocess
+import importlib.util
+from pathlib import Path
+
+MAIN = Path(__file__).resolve().parents[1] / "YoloByETO" / "main.py"
+
+
+@unittest.skipUnless(importlib.util.find_spec("ultralytics"), "需要 ultralytics")
+class InfoCommandTest(unittest.TestCase):
+    """ 设置页用 YoloByETO --info @列表文件 读取模型元数据，不能被 -m/-i/-o 的必填检查拦下 """
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def run_info(self, spec):
+        result = subprocess.run(
+            [sys.executable, str(MAIN), "--info", spec], cwd=self.dir.name,
+            capture_output=True, encoding="utf-8", timeout=300
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        replies = []
+        for line in result.stdout.splitlines():
+            try:
+                replies.append(json.loads(line))
+            except ValueError:
+                continue
+        return replies
+
+    def test_single_model(self):
+        missing = str(Path(self.dir.name) / "missing.pt")
+        replies = self.run_info(missing)
+        self.assertEqual(len(replies), 1)
+        self.assertEqual(replies[0]["model"], missing)
+        self.assertFalse(replies[0]["ok"])
+
+    def test_list_file(self):
+        models = [str(Path(self.dir.name) / name) for name in ("a.pt", "模型 b.pt")]
+        listFile = Path(self.dir.name) / "models.txt"
+        listFile.write_text("\n".join(models) + "\n\n", encoding="utf-8")
+
+        replies = self.run_info(f"@{listFile}")
+        self.assertEqual([reply["model"] for reply in replies], models)
+        self.assertTrue(all(not reply["ok"] and reply["error"] for reply in replies))
+
+
+if __name__ == "__main__":
+    unittest.main()
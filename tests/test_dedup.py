@@ -0,0 +1,128 @@
+import sys
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# 优先导入仓库内的 supervision，而不是 pip 安装的同名包
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from supervision.dedup import dhash, hamming, image_size, scale_record, BKTree, group_duplicates, HashIndex
+
+
+def _pattern(width, height, seed):
+    """ 平滑的随机图案，缩放后感知哈希应基本不变 """
+    rnd = np.random.default_rng(seed)
+    coarse = rnd.integers(0, 256, (6, 6, 3), dtype=np.uint8)
+    return Image.fromarray(coarse).resize((width, height), Image.BILINEAR)
+
+
+class DHashTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def save(self, image, name, **kwargs):
+        path = self.dir / name
+        image.save(path, **kwargs)
+        return path
+
+    def test_near_duplicates_are_close(self):
+        original = _pattern(640, 480, 1)
+        a = self.save(original, "a.png")
+        copy = self.save(original, "copy.png")
+        small = self.save(original.resize((320, 240), Image.BILINEAR), "small.jpg", quality=90)
+        other = self.save(_pattern(640, 480, 2), "other.png")
+
+        self.assertIsInstance(dhash(a), int)
+        self.assertEqual(dhash(a), dhash(copy))
+        self.assertLessEqual(hamming(dhash(a), dhash(small)), 6)
+        self.assertGreater(hamming(dhash(a), dhash(other)), 10)
+
+    def test_unreadable_file(self):
+        broken = self.dir / "broken.jpg"
+        broken.write_bytes(b"not an image")
+        self.assertIsNone(dhash(broken))
+        self.assertIsNone(image_size(broken))
+        self.assertIsNone(dhash(self.dir / "missing.png"))
+
+    def test_image_size_follows_exif_rotation(self):
+        plain = self.save(_pattern(64, 32, 3), "plain.jpg")
+        self.assertEqual(image_size(plain), (64, 32))
+
+        exif = Image.Exif()
+        exif[0x0112] = 6  # 顺时针旋转 90°
+        rotated = self.save(_pattern(64, 32, 3), "rotated.jpg", exif=exif.tobytes())
+        self.assertEqual(image_size(rotated), (32, 64))
+
+    def test_hash_index_persists(self):
+        path = self.save(_pattern(100, 100, 4), "a.png")
+        index = HashIndex(self.dir / "cache" / "dhash.json")
+        value = index.get("digest", path)
+        self.assertEqual(value, dhash(path))
+        index.save()
+
+        path.unlink()
+        self.assertEqual(HashIndex(self.dir / "cache" / "dhash.json").get("digest", path), value)
+
+
+class GroupingTest(unittest.TestCase):
+
+    def test_bk_tree_matches_brute_force(self):
+        rnd = random.Random(5)
+        values = [rnd.getrandbits(64) for _ in range(300)]
+        # 加入一些近似值，保证半径内确实有命中
+        values += [value ^ (1 << rnd.randrange(64)) for value in values[:50]]
+        tree = BKTree()
+        for i, value in enumerate(values):
+            tree.add(value, i)
+
+        for _ in range(200):
+            query = rnd.choice(values) ^ rnd.getrandbits(64) & rnd.getrandbits(64) & rnd.getrandbits(64)
+            radius = rnd.randint(0, 12)
+            expected = min((hamming(query, value) for value in values), default=None)
+            found = tree.find(query, radius)
+            if expected > radius:
+                self.assertIsNone(found)
+            else:
+                self.assertEqual(found[0], expected)
+                self.assertEqual(hamming(query, values[found[1]]), expected)
+
+    def test_group_duplicates(self):
+        hashes = [
+            ("a", 0b0000), ("b", 0b1111_0000), ("c", 0b0001), ("d", None),
+            ("e", 0b1111_0001), ("f", 0b0011), ("g", None),
+        ]
+        groups = group_duplicates(hashes, radius=1)
+        self.assertEqual(list(groups), ["a", "b", "d", "f", "g"])
+        self.assertEqual(groups, {"a": ["c"], "b": ["e"], "d": [], "f": [], "g": []})
+        self.assertEqual(group_duplicates([], radius=4), {})
+
+
+class ScaleRecordTest(unittest.TestCase):
+
+    RECORD = {"xyxy": [[10, 20, 110, 220]], "class_id": [0], "confidence": [0.9]}
+
+    def test_scales_boxes(self):
+        scaled = scale_record(self.RECORD, (400, 300), (200, 150))
+        self.assertEqual(scaled["xyxy"], [[5.0, 10.0, 55.0, 110.0]])
+        self.assertEqual(scaled["class_id"], [0])
+        self.assertEqual(self.RECORD["xyxy"], [[10, 20, 110, 220]])
+
+    def test_same_size_returns_record(self):
+        self.assertIs(scale_record(self.RECORD, (400, 300), (400, 300)), self.RECORD)
+
+    def test_cropped_is_rejected(self):
+        self.assertIsNone(scale_record(self.RECORD, (400, 300), (300, 300)))
+        self.assertIsNotNone(scale_record(self.RECORD, (400, 300), (201, 150)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import io
+import os
+import re
+import json
+import sys
+import hashlib
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from contextlib import redirect_stdout
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 优先导入仓库内的 supervision，而不是 pip 安装的同名包
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from supervision.downloader import RangeDownloader, DownloadCancelled, release_digest
+
+DATA = os.urandom(3_000_017)
+CHUNK = 1 << 16
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """ 本地替身服务器：可关闭 Range 支持，或让前几个请求中途断开 """
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if self.path.startswith("/repos/"):
+            self.send_release()
+            return
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if server.ranged and match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(DATA) - 1
+            body = DATA[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(DATA)}")
+        else:
+            body = DATA
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+
+        with server.lock:
+            drop = len(body) > 1 and server.drops > 0
+            if drop:
+                server.drops -= 1
+        limit = len(body) // 2 if drop else len(body)
+        try:
+            for i in range(0, limit, CHUNK):
+                chunk = body[i:min(i + CHUNK, limit)]
+                self.wfile.write(chunk)
+                with server.lock:
+                    server.served += len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+    def send_release(self):
+        """ GitHub release 元数据的替身，只有 /repos/o/r/releases/tags/v1 存在 """
+        if self.path != "/repos/o/r/releases/tags/v1":
+            self.send_error(404)
+            return
+        body = json.dumps({"assets": self.server.assets}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class RangeDownloaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.ranged = True
+        self.server.drops = 0
+        self.server.served = 0
+        self.server.assets = []
+        self.server.lock = threading.Lock()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/model.pt"
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.dir.name) / "model.pt"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.dir.cleanup()
+
+    def download(self, **kwargs):
+        kwargs.setdefault("sha256", hashlib.sha256(DATA).hexdigest())
+        return RangeDownloader(self.url, self.path, **kwargs)
+
+    def assertComplete(self):
+        self.assertEqual(self.path.read_bytes(), DATA)
+        self.assertEqual(sorted(os.listdir(self.dir.name)), ["model.pt"])
+
+    def test_download_without_retries(self):
+        log = io.StringIO()
+        with redirect_stdout(log):
+            self.download().run()
+        self.assertComplete()
+        self.assertNotIn("retry", log.getvalue())
+
+    def test_cancel_and_resume(self):
+        first = self.download()
+        with self.assertRaises(DownloadCancelled):
+            first.run(cancelled=lambda: first.downloaded() > len(DATA) // 2)
+        self.assertTrue(first.part.exists())
+        self.assertTrue(first.sidecar.exists())
+        self.assertFalse(self.path.exists())
+
+        self.server.served = 0
+        self.download().run()
+        self.assertComplete()
+        self.assertLess(self.server.served, len(DATA))
+
+    def test_dropped_connections_are_retried(self):
+        self.server.drops = 4
+        with redirect_stdout(io.StringIO()):
+            self.download().run()
+        self.assertComplete()
+
+    def test_server_without_range(self):
+        self.server.ranged = False
+        self.download().run()
+        self.assertComplete()
+
+    def test_bad_hash_discards_partial_file(self):
+        with self.assertRaises(IOError):
+            self.download(sha256="0" * 64).run()
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+    def test_release_digest(self):
+        api = f"http://127.0.0.1:{self.server.server_port}"
+        digest = hashlib.sha256(DATA).hexdigest()
+        self.server.assets = [
+            {"name": "other.pt", "digest": "sha256:" + "0" * 64},
+            {"name": "model.pt", "digest": "sha256:" + digest.upper()},
+            {"name": "old.pt", "digest": None},
+        ]
+        release = "https://github.com/o/r/releases/download/v1/"
+
+        self.assertEqual(release_digest(release + "model.pt", api), digest)
+        self.assertIsNone(release_digest(release + "old.pt", api))
+        self.assertIsNone(release_digest(release + "missing.pt", api))
+        self.assertIsNone(release_digest(self.url, api))
+        with redirect_stdout(io.StringIO()):
+            self.assertIsNone(release_digest("https://github.com/o/r/releases/download/v2/model.pt", api))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import sys
+import random
+import unittest
+from pathlib import Path
+
+# 优先导入仓库内的 supervision，而不是 pip 安装的同名包
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from supervision.fenwick import Fenwick
+
+
+class FenwickTest(unittest.TestCase):
+
+    def assertMatches(self, tree, values):
+        self.assertEqual(len(tree), len(values))
+        for count in range(len(values) + 1):
+            self.assertEqual(tree.prefix(count), sum(values[:count]))
+
+    def test_build_and_prefix(self):
+        values = [3, 0, 5, 1, 1, 0, 7, 2, 4]
+        self.assertMatches(Fenwick(values), values)
+        self.assertMatches(Fenwick(), [])
+
+    def test_append_matches_build(self):
+        rnd = random.Random(1)
+        values = [rnd.randint(0, 9) for _ in range(100)]
+        tree = Fenwick()
+        for i, value in enumerate(values):
+            self.assertEqual(tree.append(value), i)
+        self.assertMatches(tree, values)
+
+    def test_set_and_add(self):
+        rnd = random.Random(2)
+        values = [rnd.randint(0, 9) for _ in range(64)]
+        tree = Fenwick(values)
+        for _ in range(200):
+            i = rnd.randrange(len(values))
+            if rnd.random() < 0.5:
+                values[i] = rnd.randint(0, 9)
+                tree.set(i, values[i])
+            else:
+                delta = rnd.randint(-values[i], 9)
+                values[i] += delta
+                tree.add(i, delta)
+        self.assertMatches(tree, values)
+
+    def test_find_kth_alive(self):
+        rnd = random.Random(3)
+        for n in range(40):
+            alive = [rnd.randint(0, 1) for _ in range(n)]
+            tree = Fenwick(alive)
+            slots = [i for i, value in enumerate(alive) if value]
+            for k, slot in enumerate(slots):
+                self.assertEqual(tree.find(k), slot)
+            self.assertEqual(tree.find(len(slots)), n)
+
+    def test_find_inverts_prefix_after_removals(self):
+        tree = Fenwick([1] * 10)
+        for slot in (0, 4, 5, 9):
+            tree.set(slot, 0)
+        rows = [tree.find(k) for k in range(tree.prefix(10))]
+        self.assertEqual(rows, [1, 2, 3, 6, 7, 8])
+        self.assertEqual([tree.prefix(slot) for slot in rows], list(range(6)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+# 优先导入仓库内的 supervision，而不是 pip 安装的同名包
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from supervision.jobs import JobQueue
+
+
+class JobQueueTest(unittest.TestCase):
+
+    def test_runs_in_submission_order(self):
+        queue = JobQueue(lambda key, value: value * 2, workers=1)
+        for key in range(5):
+            queue.submit(key, key + 10)
+        self.assertEqual(list(queue.results()), [(key, (key + 10) * 2, None) for key in range(5)])
+
+    def test_boost_moves_to_front_latest_first(self):
+        queue = JobQueue(lambda key: key, workers=1)
+        for key in range(1, 6):
+            queue.submit(key)
+        self.assertTrue(queue.boost(4))
+        self.assertTrue(queue.boost(2))
+        self.assertFalse(queue.boost(99))
+        self.assertEqual([key for key, _, _ in queue.results()], [2, 4, 1, 3, 5])
+
+    def test_boost_started_job_fails(self):
+        started = threading.Event()
+        release = threading.Event()
+        boosted = []
+
+        def run(key):
+            if key == 1:
+                started.set()
+                release.wait(5)
+            return key
+
+        queue = JobQueue(run, workers=1)
+        for key in (1, 2, 3):
+            queue.submit(key)
+        results = queue.results()
+
+        def check():
+            started.wait(5)
+            boosted.append(queue.boost(1))
+            boosted.append(queue.boost(3))
+            release.set()
+
+        threading.Thread(target=check).start()
+        self.assertEqual([key for key, _, _ in results], [1, 3, 2])
+        self.assertEqual(boosted, [False, True])
+
+    def test_cancel_stops_pending_jobs(self):
+        ran = []
+
+        def run(key):
+            ran.append(key)
+            if key == 2:
+                queue.cancel()
+            return key
+
+        queue = JobQueue(run, workers=1)
+        for key in range(1, 6):
+            queue.submit(key)
+        self.assertEqual([key for key, _, _ in queue.results()], [1, 2])
+        self.assertEqual(ran, [1, 2])
+        self.assertTrue(queue.cancelled)
+
+        queue.submit(9)
+        self.assertFalse(queue.boost(9))
+
+    def test_errors_are_reported_per_job(self):
+        def run(key):
+            if key == 2:
+                raise ValueError("bad")
+            return key
+
+        queue = JobQueue(run, workers=3)
+        for key in range(1, 5):
+            queue.submit(key)
+        results = {key: (result, error) for key, result, error in queue.results()}
+        self.assertEqual(sorted(results), [1, 2, 3, 4])
+        self.assertIsNone(results[2][0])
+        self.assertIsInstance(results[2][1], ValueError)
+        self.assertEqual([results[key] for key in (1, 3, 4)], [(1, None), (3, None), (4, None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import io
+import sys
+import json
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from YoloByETO.labels import label_writer
+
+RECORD = {
+    "xyxy": [[10, 20, 50, 60], [0, 0, 200, 100]],
+    "class_id": [2, 0],
+    "class_name": ["car", "person"],
+    "confidence": [0.91234, 0.5],
+}
+
+
+class _Opener:
+    """ 把写入的文本按成员名收集起来，代替磁盘目录或压缩包 """
+
+    def __init__(self):
+        self.files = {}
+
+    def __call__(self, name):
+        files = self.files
+
+        class Member(io.StringIO):
+            def close(self):
+                files[name] = self.getvalue()
+                super().close()
+
+        return Member()
+
+
+class LabelWriterTest(unittest.TestCase):
+
+    def write(self, fmt, images):
+        opener = _Opener()
+        writer = label_writer(fmt, opener)
+        for name, width, height, record in images:
+            writer.add(name, width, height, record)
+        writer.close()
+        return opener.files
+
+    def test_yolo(self):
+        files = self.write("yolo", [("src/a_1.jpg", 200, 100, RECORD), ("b.png", 10, 10, {})])
+        self.assertEqual(files["a_1.txt"].splitlines(), [
+            "2 0.150000 0.400000 0.200000 0.400000",
+            "0 0.500000 0.500000 1.000000 1.000000",
+        ])
+        self.assertEqual(files["b.txt"], "")
+        self.assertEqual(files["classes.txt"].splitlines(), ["person", "1", "car"])
+
+    def test_coco(self):
+        files = self.write("coco", [("a.jpg", 200, 100, RECORD), ("b.jpg", 10, 10, {})])
+        doc = json.loads(files["annotations.json"])
+        self.assertEqual([image["file_name"] for image in doc["images"]], ["a.jpg", "b.jpg"])
+        self.assertEqual([image["id"] for image in doc["images"]], [1, 2])
+        first = doc["annotations"][0]
+        self.assertEqual(first["bbox"], [10, 20, 40, 40])
+        self.assertEqual((first["image_id"], first["category_id"], first["area"]), (1, 3, 1600))
+        self.assertEqual(first["score"], 0.9123)
+        self.assertEqual(doc["categories"], [{"id": 1, "name": "person"}, {"id": 3, "name": "car"}])
+
+    def test_coco_without_images(self):
+        doc = json.loads(self.write("coco", [])["annotations.json"])
+        self.assertEqual((doc["images"], doc["annotations"], doc["categories"]), ([], [], []))
+
+    def test_jsonl(self):
+        files = self.write("jsonl", [("dir/a.jpg", 200, 100, RECORD), ("b.jpg", 10, 10, {})])
+        lines = [json.loads(line) for line in files["detections.jsonl"].splitlines()]
+        self.assertEqual(lines[0], dict(file_name="a.jpg", width=200, height=100, **RECORD))
+        self.assertEqual(lines[1], {"file_name": "b.jpg", "width": 10, "height": 10})
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            label_writer("voc", _Opener())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import sys
+import unittest
+from pathlib import Path
+
+# 优先导入仓库内的 supervision，而不是 pip 安装的同名包
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from supervision.scheduler import plan_workers
+
+
+class PlanWorkersTest(unittest.TestCase):
+
+    def assertCovers(self, slots, cores):
+        """ 各进程的线程数之和等于核心数，不超额订阅 """
+        self.assertEqual(sum(slot.threads for slot in slots), cores)
+        self.assertTrue(all(slot.threads >= 1 for slot in slots))
+
+    def test_throughput_uses_two_threads_per_worker(self):
+        slots = plan_workers("throughput", cpus=range(8))
+        self.assertEqual([slot.threads for slot in slots], [2, 2, 2, 2])
+        self.assertCovers(slots, 8)
+
+    def test_throughput_on_few_cores(self):
+        slots = plan_workers("throughput", cpus=range(3))
+        self.assertEqual([slot.threads for slot in slots], [1, 1, 1])
+
+    def test_uneven_split(self):
+        slots = plan_workers("throughput", cpus=range(7))
+        self.assertEqual([slot.threads for slot in slots], [3, 2, 2])
+        self.assertCovers(slots, 7)
+
+    def test_latency_uses_few_workers(self):
+        self.assertEqual([slot.threads for slot in plan_workers("latency", cpus=range(8))], [8])
+        slots = plan_workers("latency", cpus=range(16))
+        self.assertEqual([slot.threads for slot in slots], [8, 8])
+
+    def test_max_workers(self):
+        slots = plan_workers("throughput", cpus=range(32), max_workers=4)
+        self.assertEqual(len(slots), 4)
+        self.assertCovers(slots, 32)
+        self.assertEqual(len(plan_workers("throughput", cpus=range(1), max_workers=8)), 1)
+
+    def test_pinning_splits_cores(self):
+        cpus = [0, 2, 4, 6, 8, 10]
+        slots = plan_workers("throughput", cpus=cpus, pin=True)
+        self.assertEqual([list(slot.cpus) for slot in slots], [[0, 2], [4, 6], [8, 10]])
+        self.assertTrue(all(slot.cpus == () for slot in plan_workers("throughput", cpus=cpus)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# 优先导入仓库内的 supervision，而不是 pip 安装的同名包
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PyQt5.QtWidgets import QApplication
+
+_cwd = os.getcwd()
+_dir = tempfile.TemporaryDirectory()
+
+
+def setUpModule():
+    # Setting 导入时会在当前目录下写 config/config.json、列出 ./model，放到临时目录里
+    os.chdir(_dir.name)
+    os.mkdir("model")
+    for name in ("a.pt", "b.pt"):
+        Path("model", name).write_bytes(b"")
+
+
+def tearDownModule():
+    os.chdir(_cwd)
+    _dir.cleanup()
+
+
+def spin(app, seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        app.processEvents()
+        time.sleep(0.01)
+
+
+class SettingsWiringTest(unittest.TestCase):
+    """ 设置页和管理页由 main.py 的延迟工厂构建，两边必须共用同一个 cfg """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+        from supervision import main
+        from supervision.card.MainInterface import MainInterface
+
+        cls.rerender = mock.patch.object(MainInterface, "rerender")
+        cls.requeue = mock.patch.object(MainInterface, "requeue_processed")
+        cls.rerenderMock = cls.rerender.start()
+        cls.requeueMock = cls.requeue.start()
+
+        # 先打开设置页，再打开管理页
+        cls.setting = main.createSetting()
+        cls.main = main.createMainInterface()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.rerender.stop()
+        cls.requeue.stop()
+
+    def setUp(self):
+        self.rerenderMock.reset_mock()
+        self.requeueMock.reset_mock()
+
+    def test_single_config(self):
+        from qfluentwidgets import qconfig
+        from supervision import tool
+
+        self.assertIs(self.setting.annotateStyleCard.configItem, tool.cfg.annotateStyle)
+        self.assertIs(qconfig._cfg, tool.cfg)
+        self.assertNotIn("card.Setting", sys.modules)
+
+    def test_style_change_rerenders(self):
+        from supervision.tool import render_options
+
+        combo = self.setting.annotateStyleCard.comboBox
+        combo.setCurrentIndex(combo.findText("角标框"))
+        self.assertEqual(render_options()["style"], "corner")
+
+        spin(self.app, 0.5)
+        self.rerenderMock.assert_called_once()
+        self.requeueMock.assert_not_called()
+
+        combo.setCurrentIndex(combo.findText("方框"))
+        self.assertIsNone(render_options())
+
+    def test_model_switch_requeues(self):
+        from supervision import tool
+
+        spin(self.app, 0.5)
+        combo = self.setting.modelChoiceCard.comboBox
+        self.assertEqual(tool.cfg.get(tool.cfg.modelChoice), "a.pt")
+        combo.setCurrentIndex(combo.findData("b.pt"))
+        self.assertEqual(tool.cfg.get(tool.cfg.modelChoice), "b.pt")
+
+        spin(self.app, 0.5)
+        self.requeueMock.assert_called_once()
+        self.rerenderMock.assert_not_called()
+
+    def test_removed_model_is_kept_and_not_requeued(self):
+        from supervision import tool
+        from supervision.card.MainInterface import MainInterface
+
+        Path("model", "c.pt").write_bytes(b"")
+        spin(self.app, 1)
+        combo = self.setting.modelChoiceCard.comboBox
+        combo.setCurrentIndex(combo.findData("c.pt"))
+        spin(self.app, 0.5)
+        self.requeueMock.reset_mock()
+
+        os.remove(Path("model", "c.pt"))
+        spin(self.app, 1)
+        self.assertEqual(tool.cfg.get(tool.cfg.modelChoice), "c.pt")
+        self.assertTrue(tool.cfg.model_missing())
+        self.assertEqual(combo.currentIndex(), -1)
+        self.requeueMock.assert_not_called()
+
+        # 即使被别的设置触发，模型不在时也不会把全部结果当作失效重新排队
+        with mock.patch("supervision.card.MainInterface.stale_indices") as stale:
+            self.requeue.temp_original(self.main)
+        stale.assert_not_called()
+
+        combo.setCurrentIndex(combo.findData("a.pt"))
+        self.assertFalse(tool.cfg.model_missing())
+        spin(self.app, 0.5)
+        self.requeueMock.assert_called_once()
+
+    def test_performance_settings_reach_tool(self):
+        from supervision import tool
+        from supervision.scheduler import plan_workers
+
+        self.setting.backendCard.comboBox.setCurrentIndex(1)
+        self.setting.schedulePolicyCard.comboBox.setCurrentIndex(1)
+        self.setting.dedupEnabledCard.switchButton.setChecked(True)
+        self.setting.modelBudgetCard.slider.setValue(4096)
+
+        self.assertEqual(tool.cfg.get(tool.cfg.backend), "onnx")
+        self.assertEqual(tool.plan_pool(), plan_workers("latency", pin=tool.cfg.get(tool.cfg.pinAffinity)))
+        self.assertTrue(tool.cfg.get(tool.cfg.dedupEnabled))
+        self.assertEqual(tool.cfg.get(tool.cfg.modelBudget), 4096)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from YoloByETO.tiling import tile_origins, iter_tiles, merge_boxes
+
+
+class TilesTest(unittest.TestCase):
+
+    def test_origins_cover_the_edge(self):
+        self.assertEqual(tile_origins(500, 1024, 819), [0])
+        self.assertEqual(tile_origins(2000, 1024, 819), [0, 819, 976])
+        self.assertEqual(tile_origins(1024, 1024, 819), [0])
+
+    def test_tiles_are_views_covering_the_image(self):
+        image = np.zeros((300, 500, 3), dtype=np.uint8)
+        covered = np.zeros(image.shape[:2], dtype=bool)
+        for x0, y0, view in iter_tiles(image, tile=200, overlap=0.25):
+            self.assertTrue(np.shares_memory(view, image))
+            self.assertLessEqual(view.shape[0], 200)
+            self.assertLessEqual(view.shape[1], 200)
+            covered[y0:y0 + view.shape[0], x0:x0 + view.shape[1]] = True
+        self.assertTrue(covered.all())
+
+
+class MergeBoxesTest(unittest.TestCase):
+
+    def setUp(self):
+        # 两块重叠区域里的同一目标（0、1），另一个类别的重叠框（2），以及远处的独立目标（3）
+        self.xyxy = np.array([
+            [100, 100, 200, 200],
+            [104, 102, 204, 202],
+            [100, 100, 200, 200],
+            [500, 500, 560, 580],
+        ], dtype=np.float32)
+        self.scores = np.array([0.6, 0.9, 0.8, 0.5], dtype=np.float32)
+        self.class_id = np.array([0, 0, 1, 0])
+
+    def test_nms_keeps_best_per_class(self):
+        xyxy, scores, class_id = merge_boxes(self.xyxy, self.scores, self.class_id, 0.5, "nms")
+        self.assertEqual(len(xyxy), 3)
+        np.testing.assert_allclose(scores, [0.9, 0.8, 0.5])
+        np.testing.assert_array_equal(class_id, [0, 1, 0])
+        np.testing.assert_allclose(xyxy[0], self.xyxy[1])
+
+    def test_wbf_averages_clusters_by_score(self):
+        xyxy, scores, class_id = merge_boxes(self.xyxy, self.scores, self.class_id, 0.5, "wbf")
+        self.assertEqual(len(xyxy), 3)
+        expected = (self.xyxy[0] * 0.6 + self.xyxy[1] * 0.9) / 1.5
+        np.testing.assert_allclose(xyxy[0], expected, rtol=1e-5)
+        np.testing.assert_allclose(scores[0], 0.75, rtol=1e-5)
+        np.testing.assert_allclose(xyxy[2], self.xyxy[3])
+
+    def test_threshold(self):
+        xyxy, _, _ = merge_boxes(self.xyxy, self.scores, self.class_id, 0.99, "nms")
+        self.assertEqual(len(xyxy), 4)
+
+    def test_empty(self):
+        empty = np.zeros((0, 4), dtype=np.float32)
+        xyxy, scores, class_id = merge_boxes(empty, np.zeros(0), np.zeros(0, dtype=int))
+        self.assertEqual(len(xyxy), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()